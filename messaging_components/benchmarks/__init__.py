@@ -0,0 +1,5 @@
+from .storm import ArtemisMonitor, ConnectionStorm, CoreStormDriver, ExternalStormDriver, ResourceMonitor, \
+    RouterMonitor, StormDriver, StormReport, StormStep
+from .transactions import TransactionConfig, TransactionReport, TransactionResult, TransactionSweep, format_table
+from .capacity import CapacityResult, CapacityStore, CapacityTrial, CapacityTuner, ExternalCapacityTrial
+from .orchestrator import ClientGroup, LoadOrchestrator, OrchestrationResult, Placement, node_cpus, place
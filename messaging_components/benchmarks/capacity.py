@@ -0,0 +1,248 @@
+"""
+Receiver capacity (prefetch / credit window) tuning: short receiver trials are run
+with capacities chosen by a golden-section search over a logarithmic scale, so the
+throughput-optimal capacity of each client implementation is found within a bounded
+number of trials. Best values are persisted by (implementation, broker) and applied
+to receivers of later runs.
+"""
+
+import json
+import logging
+import math
+import os
+import time
+from typing import Callable, Dict, List, Tuple
+
+from messaging_abstract.component import Executor, Node
+from messaging_abstract.message import Message
+
+from messaging_components.clients.external import ClientFactory
+from messaging_components.clients.external.client_external import ClientExternal
+
+_GOLDEN = (math.sqrt(5) - 1) / 2
+
+
+def golden_section_search(objective: Callable[[int], float], low: int, high: int, max_trials: int=10,
+                          log_scale: bool=True) -> Tuple[int, float, Dict[int, float]]:
+    """
+    Searches the integer maximizing a unimodal objective in [low, high], evaluating
+    it at most max_trials times (values are evaluated once).
+    :param objective:
+    :param low:
+    :param high:
+    :param max_trials:
+    :param log_scale: Search over log2 of the values (for ranges spanning orders of magnitude)
+    :return: Tuple (best value, its objective, all evaluations)
+    """
+    def to_scale(value: float) -> float:
+        return math.log2(value) if log_scale else float(value)
+
+    def from_scale(position: float) -> int:
+        return min(high, max(low, int(round(2 ** position if log_scale else position))))
+
+    evaluations = {}
+
+    def evaluate(position: float) -> float:
+        value = from_scale(position)
+        if value not in evaluations:
+            evaluations[value] = objective(value)
+        return evaluations[value]
+
+    start, end = to_scale(low), to_scale(high)
+    left = end - _GOLDEN * (end - start)
+    right = start + _GOLDEN * (end - start)
+    left_value, right_value = evaluate(left), evaluate(right)
+
+    while len(evaluations) < max_trials and from_scale(end) - from_scale(start) > 1:
+        if left_value >= right_value:
+            end, right, right_value = right, left, left_value
+            left = end - _GOLDEN * (end - start)
+            left_value = evaluate(left)
+        else:
+            start, left, left_value = left, right, right_value
+            right = start + _GOLDEN * (end - start)
+            right_value = evaluate(right)
+
+    best = max(evaluations, key=evaluations.get)
+    return best, evaluations[best], evaluations
+
+
+class CapacityTrial:
+    """
+    Measures the throughput of a receiver implementation with a given capacity.
+    """
+    def run(self, implementation: str, capacity: int) -> float:
+        """
+        :param implementation:
+        :param capacity:
+        :return: Messages per second (0 when the trial failed)
+        """
+        raise NotImplementedError()
+
+
+class ExternalCapacityTrial(CapacityTrial):
+    """
+    Fills the target queue with a sender, then times an external receiver draining it.
+    The time measured includes the receiver startup, so trials should be long enough
+    for it to be negligible (or Java receivers should use a warm worker).
+    """
+    def __init__(self, node: Node, executor: Executor, url: str, message: Message, messages: int=10000,
+                 sender_implementation: str='python'):
+        self.node = node
+        self.executor = executor
+        self.url = url
+        self.message = message
+        self.messages = messages
+        self.sender_implementation = sender_implementation
+        self._logger = logging.getLogger(self.__module__)
+
+    def _fill(self):
+        sender = ClientFactory.create_client(self.sender_implementation, 'sender', self.node, self.executor,
+                                             url=self.url)
+        sender.command.control.count = self.messages
+        sender.send(self.message)
+        sender.execution.wait()
+        if not sender.execution.completed_successfully():
+            raise RuntimeError('Unable to fill %s with %d messages' % (self.url, self.messages))
+
+    def run(self, implementation: str, capacity: int) -> float:
+        self._fill()
+        receiver = ClientFactory.create_client(implementation, 'receiver', self.node, self.executor, url=self.url)
+        receiver.command.control.count = self.messages
+        receiver.command.control.capacity = capacity
+
+        started = time.time()
+        receiver.receive()
+        receiver.execution.wait()
+        duration = time.time() - started
+        if not receiver.execution.completed_successfully():
+            self._logger.warning("Receiver trial failed (%s, capacity=%d)" % (implementation, capacity))
+            return 0.0
+        return self.messages / duration if duration else 0.0
+
+
+class CapacityResult:
+    """
+    Best capacity found for an implementation against a broker.
+    """
+    __slots__ = ('implementation', 'broker', 'capacity', 'messages_per_second', 'trials')
+
+    def __init__(self, implementation: str, broker: str, capacity: int, messages_per_second: float,
+                 trials: Dict[int, float]):
+        self.implementation = implementation
+        self.broker = broker
+        self.capacity = capacity
+        self.messages_per_second = messages_per_second
+        self.trials = trials  # capacity: messages per second
+
+    def to_dict(self) -> dict:
+        return {
+            'implementation': self.implementation,
+            'broker': self.broker,
+            'capacity': self.capacity,
+            'messages_per_second': self.messages_per_second,
+            'trials': sorted(self.trials.items()),
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> 'CapacityResult':
+        return CapacityResult(data['implementation'], data['broker'], data['capacity'],
+                              data['messages_per_second'], {int(capacity): value for capacity, value in data['trials']})
+
+    def __repr__(self):
+        return "CapacityResult(%s, %s, capacity=%d, msgs/s=%.2f)" % (self.implementation, self.broker,
+                                                                     self.capacity, self.messages_per_second)
+
+
+class CapacityStore:
+    """
+    Best capacities by (implementation, broker), persisted to a JSON file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._results = {}  # type: Dict[str, CapacityResult]
+        if os.path.exists(path):
+            with open(path) as store:
+                for data in json.load(store):
+                    result = CapacityResult.from_dict(data)
+                    self._results[self._key(result.implementation, result.broker)] = result
+
+    @staticmethod
+    def _key(implementation: str, broker: str) -> str:
+        return '%s/%s' % (implementation, broker)
+
+    def get(self, implementation: str, broker: str) -> CapacityResult:
+        return self._results.get(self._key(implementation, broker))
+
+    def put(self, result: CapacityResult):
+        """
+        Stores a result, saving the file.
+        :param result:
+        :return:
+        """
+        self._results[self._key(result.implementation, result.broker)] = result
+        temporary = '%s.tmp' % self.path
+        with open(temporary, 'w') as store:
+            json.dump([result.to_dict() for result in self._results.values()], store, indent=2)
+        os.replace(temporary, self.path)
+
+
+class CapacityTuner:
+    """
+    Tunes the capacity of receivers of each implementation against a broker.
+    """
+    def __init__(self, trial: CapacityTrial, store: CapacityStore, broker: str, low: int=1, high: int=10000,
+                 max_trials: int=8):
+        """
+        :param trial:
+        :param store:
+        :param broker: Broker (or router) identification, i.e. 'artemis-2.6' or a host name
+        :param low: Smallest capacity
+        :param high: Largest capacity
+        :param max_trials: Trials per implementation
+        """
+        self.trial = trial
+        self.store = store
+        self.broker = broker
+        self.low = low
+        self.high = high
+        self.max_trials = max_trials
+        self._logger = logging.getLogger(self.__module__)
+
+    def tune(self, implementation: str, force: bool=False) -> CapacityResult:
+        """
+        Searches the best capacity of the implementation, unless already stored.
+        :param implementation:
+        :param force: Search again even if a stored result exists
+        :return:
+        """
+        result = self.store.get(implementation, self.broker)
+        if result is not None and not force:
+            return result
+
+        def objective(capacity: int) -> float:
+            value = self.trial.run(implementation, capacity)
+            self._logger.info("Capacity trial %s/%s: capacity=%d, %.2f msgs/s"
+                              % (implementation, self.broker, capacity, value))
+            return value
+
+        capacity, value, trials = golden_section_search(objective, self.low, self.high, self.max_trials)
+        result = CapacityResult(implementation, self.broker, capacity, value, trials)
+        self.store.put(result)
+        return result
+
+    def tune_all(self, implementations: List[str]=('python', 'java', 'nodejs'),
+                 force: bool=False) -> List[CapacityResult]:
+        return [self.tune(implementation, force) for implementation in implementations]
+
+    def apply(self, client: ClientExternal) -> bool:
+        """
+        Sets the stored capacity of the client implementation to the client command.
+        :param client: Receiver (or sender)
+        :return: False if no capacity is stored for the implementation
+        """
+        result = self.store.get(client.implementation, self.broker)
+        if result is None:
+            return False
+        client.command.control.capacity = result.capacity
+        return True
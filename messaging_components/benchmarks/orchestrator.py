@@ -0,0 +1,231 @@
+"""
+Distributed load orchestration: the external clients of a workload are placed across
+many nodes (local, Ansible or Docker), balancing the CPU load of each node, started
+together at a shared start time and waited for in parallel, so the load generated is
+not limited by a single load generator host.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from iqa_common.executor import Command
+from messaging_abstract.component import Node
+from messaging_abstract.message import Message
+
+from messaging_components.clients.external import ClientFactory
+from messaging_components.clients.external.client_external import ClientExternal
+from messaging_components.clients.external.fleet import ClientFleet, FleetResult, FleetStats
+
+
+class ClientGroup:
+    """
+    Clients of the same implementation and type, running the same workload.
+    """
+    def __init__(self, implementation: str, client_type: str, count: int, url: str, messages: int=None,
+                 message: Message=None, cost: float=1.0, name: str=None, **kwargs):
+        """
+        :param implementation: i.e. python, java, nodejs
+        :param client_type: sender, receiver or connector
+        :param count: Number of clients
+        :param url:
+        :param messages: Messages sent or received by each client (--count)
+        :param message: Message sent by senders
+        :param cost: CPU used by each client (cores)
+        :param name: Defaults to implementation-client_type
+        :param kwargs: Client arguments
+        """
+        self.implementation = implementation
+        self.client_type = client_type
+        self.count = count
+        self.url = url
+        self.messages = messages
+        self.message = message
+        self.cost = cost
+        self.name = name or '%s-%s' % (implementation, client_type)
+        self.kwargs = kwargs
+
+
+class Placement:
+    """
+    Node a client of a group runs on.
+    """
+    __slots__ = ('group', 'index', 'node')
+
+    def __init__(self, group: ClientGroup, index: int, node: Node):
+        self.group = group
+        self.index = index
+        self.node = node
+
+    def __repr__(self):
+        return "Placement(%s-%d on %s)" % (self.group.name, self.index, self.node.hostname)
+
+
+def node_cpus(node: Node) -> int:
+    """
+    Number of processors of a node (1 if it cannot be determined).
+    :param node:
+    :return:
+    """
+    execution = node.execute(Command(['nproc'], stdout=True, timeout=30))
+    execution.wait()
+    try:
+        return max(1, int(execution.read_stdout().strip()))
+    except (AttributeError, ValueError):
+        return 1
+
+
+def place(groups: List[ClientGroup], nodes: List[Node], cpus: Dict[str, int]) -> List[Placement]:
+    """
+    Places clients on nodes, the most expensive first, each one on the node with the lowest
+    load relative to its processors.
+    :param groups:
+    :param nodes:
+    :param cpus: Processors by node hostname
+    :return:
+    """
+    if not nodes:
+        raise ValueError('No nodes to place clients on')
+
+    load = {node.hostname: 0.0 for node in nodes}
+    clients = [(group, index) for group in groups for index in range(group.count)]
+    placements = []
+    for group, index in sorted(clients, key=lambda client: -client[0].cost):
+        node = min(nodes, key=lambda candidate: (load[candidate.hostname] + group.cost) / cpus[candidate.hostname])
+        load[node.hostname] += group.cost
+        placements.append(Placement(group, index, node))
+    return placements
+
+
+class OrchestrationResult:
+    """
+    Results of a workload run, for all clients and by group.
+    """
+    def __init__(self, placements: List[Placement], results: List[FleetResult], start_at: float,
+                 late: List[Placement]=None, launch_time: float=None):
+        """
+        :param placements:
+        :param results:
+        :param start_at: Shared start time of the clients
+        :param late: Clients launched after start_at, which started late
+        :param launch_time: Seconds taken to launch all clients
+        """
+        self.placements = placements
+        self.start_at = start_at
+        self.late = late or []
+        self.launch_time = launch_time
+        finished = [result.finished for result in results if result.finished is not None]
+        duration = max(finished) - start_at if finished else 0.0
+        self.stats = FleetStats(results, duration)
+
+        by_group = {}
+        for placement, result in zip(placements, results):
+            by_group.setdefault(placement.group.name, (placement.group, []))[1].append(result)
+        self.groups = {name: FleetStats(group_results, duration, group.messages)
+                       for name, (group, group_results) in by_group.items()}
+
+    @property
+    def messages_per_second(self) -> Dict[str, float]:
+        return {name: stats.messages_per_second for name, stats in self.groups.items()}
+
+    @property
+    def synchronized(self) -> bool:
+        """
+        Whether all clients were launched before the shared start time (so they started together).
+        :return:
+        """
+        return not self.late
+
+    def clients_by_node(self) -> Dict[str, int]:
+        nodes = {}
+        for placement in self.placements:
+            nodes[placement.node.hostname] = nodes.get(placement.node.hostname, 0) + 1
+        return nodes
+
+
+class LoadOrchestrator:
+    """
+    Runs workloads (lists of client groups) across the given nodes.
+    """
+    def __init__(self, nodes: List[Node], lead: float=5.0, cpus: Dict[str, int]=None, launches_per_node: int=8):
+        """
+        :param nodes: Nodes created by NodeFactory
+        :param lead: Seconds between launching the clients and their shared start time. All clients
+                     must be launched within it (see: OrchestrationResult.late and launch_time)
+        :param cpus: Processors by node hostname (detected with nproc by default)
+        :param launches_per_node: Clients being launched (remote executions being started) at once on each node
+        """
+        self.nodes = nodes
+        self.lead = lead
+        self._cpus = cpus
+        self.launches_per_node = max(1, launches_per_node)
+        self._logger = logging.getLogger(self.__module__)
+
+    @property
+    def cpus(self) -> Dict[str, int]:
+        if self._cpus is None:
+            with ThreadPoolExecutor(len(self.nodes)) as pool:
+                self._cpus = dict(zip([node.hostname for node in self.nodes], pool.map(node_cpus, self.nodes)))
+        return self._cpus
+
+    def create(self, groups: List[ClientGroup]) -> List[Tuple[Placement, ClientExternal]]:
+        """
+        Places the clients of the workload and creates them on their nodes.
+        :param groups:
+        :return:
+        """
+        clients = []
+        for placement in place(groups, self.nodes, self.cpus):
+            group, node = placement.group, placement.node
+            name = '%s-%s-%d' % (group.name, node.hostname, placement.index)
+            client = ClientFactory.create_client(group.implementation, group.client_type, node, node.executor,
+                                                 name=name, url=group.url, **group.kwargs)
+            if group.messages is not None:
+                client.command.control.count = group.messages
+            clients.append((placement, client))
+        return clients
+
+    def run(self, groups: List[ClientGroup]) -> OrchestrationResult:
+        """
+        Runs the workload: all clients start at the same time and are waited for in parallel.
+        :param groups:
+        :return:
+        """
+        placed = self.create(groups)
+        start_at = time.time() + self.lead
+        for _, client in placed:
+            client.start_at = start_at
+
+        actions = {id(client): ClientFleet.default_action(placement.group.message) for placement, client in placed}
+        placements = {id(client): placement for placement, client in placed}
+        launching = {node.hostname: threading.Semaphore(self.launches_per_node) for node in self.nodes}
+        launched = []
+        late = []
+        launch_started = time.time()
+
+        def action(client: ClientExternal):
+            placement = placements[id(client)]
+            with launching[placement.node.hostname]:
+                actions[id(client)](client)
+            now = time.time()
+            launched.append(now)
+            if now > start_at:
+                # The client waited for less than expected (if at all), so it started after the others
+                late.append(placement)
+
+        self._logger.info("Starting %d clients on %d nodes at %.3f" % (len(placed), len(self.nodes), start_at))
+        # Every client is waited for in its own thread, launches are limited per node
+        fleet = ClientFleet([client for _, client in placed], concurrency=max(1, len(placed)))
+        try:
+            stats = fleet.run(action)
+        finally:
+            for _, client in placed:
+                client.start_at = None
+
+        launch_time = max(launched) - launch_started if launched else 0.0
+        if late:
+            self._logger.warning("%d clients were launched after the start time: launching took %.1fs, lead is %.1fs"
+                                 % (len(late), launch_time, self.lead))
+        return OrchestrationResult([placement for placement, _ in placed], stats.results, start_at, late, launch_time)
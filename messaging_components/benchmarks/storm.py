@@ -0,0 +1,346 @@
+"""
+Connection storm benchmark: the number of concurrent connections to a broker or
+router is ramped in steps, new connections being spread across drivers (in-process
+asyncio connections or external connector clients running on any node). Each step
+records the connect latency distribution, the failure rate and the resources used
+by the broker or router, and the report locates the knee point: the number of
+connections after which latency or failures grow sharply.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from messaging_components.brokers.artemis.management import ArtemisJolokiaClient
+from messaging_components.clients.core.aio import AsyncConnection
+from messaging_components.clients.external.client_external import ClientExternal
+from messaging_components.clients.latency import LatencyHistogram
+from messaging_components.routers.dispatch.management import RouterQuery
+from messaging_components.routers.dispatch.management.allocator import allocated_bytes
+
+
+class ResourceMonitor:
+    """
+    Samples the resources used by the broker or router under test.
+    """
+    def sample(self) -> dict:
+        raise NotImplementedError()
+
+
+class RouterMonitor(ResourceMonitor):
+    """
+    Connections and allocated memory of a Dispatch Router.
+    """
+    def __init__(self, query: RouterQuery):
+        self.query = query
+
+    def sample(self) -> dict:
+        return {
+            'connections': len(self.query.connection()),
+            'allocated_bytes': sum(allocated_bytes(record) for record in self.query.allocator()),
+        }
+
+
+class ArtemisMonitor(ResourceMonitor):
+    """
+    Connections and heap usage of an Artemis broker (through Jolokia).
+    """
+    HEAP_MBEAN = 'java.lang:type=Memory'
+
+    def __init__(self, client: ArtemisJolokiaClient):
+        self.client = client
+
+    def sample(self) -> dict:
+        resources = {}
+        connections = self.client.read_attribute('ConnectionCount')
+        if connections.success:
+            resources['connections'] = connections.data
+        heap = self.client.read_attribute('HeapMemoryUsage', self.HEAP_MBEAN)
+        if heap.success and heap.data:
+            resources['heap_used_bytes'] = heap.data.get('used')
+        return resources
+
+
+class StormDriver:
+    """
+    Opens connections and keeps them open until closed.
+    """
+    def open(self, count: int) -> Tuple[List[float], int]:
+        """
+        Opens count more connections.
+        :param count:
+        :return: Tuple (connect latencies in seconds, number of connections that failed)
+        """
+        raise NotImplementedError()
+
+    def lost(self) -> int:
+        """
+        :return: Number of opened connections that have been closed since (i.e. by the peer)
+        """
+        return 0
+
+    def close(self):
+        raise NotImplementedError()
+
+
+class CoreStormDriver(StormDriver):
+    """
+    In-process asyncio connections, run by an event loop on a background thread.
+    """
+    def __init__(self, url: str, concurrency: int=100, timeout: float=10.0, **kwargs):
+        """
+        :param url:
+        :param concurrency: Connections being established at once
+        :param timeout: Seconds to wait for each connection to be opened
+        :param kwargs: See: AsyncConnection.connect()
+        """
+        self.url = url
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.options = kwargs
+        self.connections = []  # type: List[AsyncConnection]
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='storm-%s' % url, daemon=True)
+        self._thread.start()
+
+    async def _open(self, count: int) -> list:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def connect():
+            async with semaphore:
+                started = time.time()
+                connection = await AsyncConnection.connect(self.url, timeout=self.timeout, **self.options)
+                return connection, time.time() - started
+
+        return await asyncio.gather(*[connect() for _ in range(count)], return_exceptions=True)
+
+    def open(self, count: int) -> Tuple[List[float], int]:
+        latencies = []
+        failures = 0
+        for result in asyncio.run_coroutine_threadsafe(self._open(count), self._loop).result():
+            if isinstance(result, BaseException):
+                failures += 1
+                continue
+            connection, latency = result
+            self.connections.append(connection)
+            latencies.append(latency)
+        return latencies, failures
+
+    def lost(self) -> int:
+        return sum(1 for connection in self.connections if connection.closed)
+
+    def close(self):
+        async def close_all():
+            await asyncio.gather(*[connection.close(self.timeout) for connection in self.connections],
+                                 return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(close_all(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+class ExternalStormDriver(StormDriver):
+    """
+    Connections opened by an external connector client (on its node), one execution per step,
+    each one holding its connections for hold seconds (--close-sleep), which must cover the storm.
+    External clients do not report when each connection is opened, so no latency is recorded:
+    executions that exit with an error within grace seconds count as failed connections.
+    """
+    def __init__(self, connector: ClientExternal, hold: int=300, grace: float=2.0):
+        self.connector = connector
+        self.hold = hold
+        self.grace = grace
+        self.executions = []  # type: list  # (execution, connections)
+
+    def open(self, count: int) -> Tuple[List[float], int]:
+        command = self.connector.command
+        command.control.count = count
+        command.control.close_sleep = self.hold
+        command.connector.obj_ctrl = 'C'
+        command.timeout = max(command.timeout or 0, self.hold + 30)
+        execution = self.connector.execute(command)
+        time.sleep(self.grace)
+        if not execution.is_running() and not execution.completed_successfully():
+            return [], count
+        self.executions.append((execution, count))
+        return [], 0
+
+    def lost(self) -> int:
+        return sum(count for execution, count in self.executions if not execution.is_running())
+
+    def close(self):
+        for execution, _ in self.executions:
+            if execution.is_running():
+                execution.terminate()
+        self.executions = []
+
+
+class StormStep:
+    """
+    Result of a step of the storm.
+    """
+    __slots__ = ('target', 'attempted', 'failed', 'connections', 'latency', 'duration', 'resources')
+
+    def __init__(self, target: int, attempted: int, failed: int, connections: int, latency: LatencyHistogram,
+                 duration: float, resources: dict):
+        self.target = target
+        self.attempted = attempted
+        self.failed = failed
+        self.connections = connections  # open at the end of the step
+        self.latency = latency
+        self.duration = duration
+        self.resources = resources
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failed / self.attempted if self.attempted else 0.0
+
+    def __repr__(self):
+        return "StormStep(target=%d, connections=%d, failure_rate=%.3f, p99=%.6fs)" % (
+            self.target, self.connections, self.failure_rate, self.latency.percentile(99))
+
+
+def find_knee(xs: List[float], ys: List[float]) -> int:
+    """
+    Returns the index of the knee of an increasing convex curve (i.e. latency by connections):
+    the point farthest below the line joining the first and last points, once normalized.
+    :param xs:
+    :param ys:
+    :return: Index or None if the curve has no knee
+    """
+    if len(xs) < 3:
+        return None
+    x_range = xs[-1] - xs[0]
+    y_min = min(ys)
+    y_range = max(ys) - y_min
+    if not x_range or not y_range:
+        return None
+    distances = [(x - xs[0]) / x_range - (y - y_min) / y_range for x, y in zip(xs, ys)]
+    index = max(range(len(distances)), key=distances.__getitem__)
+    return index if distances[index] > 0 else None
+
+
+class StormReport:
+    """
+    Steps of a storm and the knee point.
+    """
+    def __init__(self, steps: List[StormStep], max_failure_rate: float=0.01, percentile: float=99):
+        self.steps = steps
+        self.max_failure_rate = max_failure_rate
+        self.percentile = percentile
+
+    @property
+    def knee(self) -> int:
+        """
+        Target connections of the knee point: the step before failures exceed max_failure_rate
+        or the knee of the latency curve, whichever comes first.
+        :return: Connections or None
+        """
+        candidates = []
+        for index, step in enumerate(self.steps):
+            if step.failure_rate > self.max_failure_rate:
+                if index:
+                    candidates.append(index - 1)
+                break
+        # Steps where no connection was opened have no latency
+        measured = [index for index, step in enumerate(self.steps) if step.latency.total]
+        latency_knee = find_knee([self.steps[index].target for index in measured],
+                                 [self.steps[index].latency.percentile(self.percentile) for index in measured])
+        if latency_knee is not None:
+            candidates.append(measured[latency_knee])
+        return self.steps[min(candidates)].target if candidates else None
+
+    def rows(self) -> List[dict]:
+        """
+        :return: One row per step
+        """
+        rows = []
+        for step in self.steps:
+            row = {
+                'target': step.target,
+                'connections': step.connections,
+                'failure_rate': step.failure_rate,
+                'duration': step.duration,
+            }
+            row.update({'latency_%s' % name: value for name, value in step.latency.summary().items()})
+            row.update(step.resources)
+            rows.append(row)
+        return rows
+
+
+class ConnectionStorm:
+    """
+    Ramps concurrent connections through the given steps (targets of open connections).
+    """
+    def __init__(self, drivers: List[StormDriver], steps: List[int], monitors: List[ResourceMonitor]=None,
+                 settle: float=1.0, max_failure_rate: float=0.01, stop_failure_rate: float=0.5):
+        """
+        :param drivers: New connections of each step are split evenly between drivers
+        :param steps: Number of connections to reach at each step
+        :param monitors:
+        :param settle: Seconds to wait after each step, before sampling resources
+        :param max_failure_rate: Failure rate that marks the knee point
+        :param stop_failure_rate: Failure rate that stops the storm
+        """
+        self.drivers = drivers
+        self.steps = steps
+        self.monitors = monitors or []
+        self.settle = settle
+        self.max_failure_rate = max_failure_rate
+        self.stop_failure_rate = stop_failure_rate
+        self._logger = logging.getLogger(self.__module__)
+
+    def _shares(self, count: int) -> List[int]:
+        share, remainder = divmod(count, len(self.drivers))
+        return [share + (1 if index < remainder else 0) for index in range(len(self.drivers))]
+
+    def _sample(self) -> dict:
+        resources = {}
+        for monitor in self.monitors:
+            try:
+                resources.update(monitor.sample())
+            except Exception as ex:
+                self._logger.warning("Unable to sample resources with %s: %s" % (monitor, ex))
+        return resources
+
+    def run(self) -> StormReport:
+        """
+        Runs the storm, closing all connections at the end.
+        :return:
+        """
+        results = []
+        opened = 0
+        try:
+            with ThreadPoolExecutor(len(self.drivers)) as pool:
+                for target in self.steps:
+                    lost = sum(driver.lost() for driver in self.drivers)
+                    attempted = max(0, target - (opened - lost))
+                    started = time.time()
+                    opens = list(pool.map(lambda driver_share: driver_share[0].open(driver_share[1]),
+                                          zip(self.drivers, self._shares(attempted))))
+                    duration = time.time() - started
+
+                    histogram = LatencyHistogram()
+                    failed = 0
+                    for latencies, failures in opens:
+                        for latency in latencies:
+                            histogram.record(latency)
+                        failed += failures
+                    opened += attempted - failed
+
+                    time.sleep(self.settle)
+                    lost = sum(driver.lost() for driver in self.drivers)
+                    step = StormStep(target, attempted, failed, opened - lost, histogram, duration, self._sample())
+                    self._logger.info("Connection storm: %s" % step)
+                    results.append(step)
+                    if step.failure_rate > self.stop_failure_rate:
+                        break
+        finally:
+            for driver in self.drivers:
+                driver.close()
+
+        return StormReport(results, self.max_failure_rate)
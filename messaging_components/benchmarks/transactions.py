@@ -0,0 +1,263 @@
+"""
+Transactional throughput benchmark: sweeps the transaction size (--tx-size) and the
+commit/rollback mix (share of senders using --tx-action rollback) across fleets of
+senders and receivers, recording committed throughput of each configuration, to
+compare them in a table.
+
+External clients do not report their transactions, so the latency of every commit
+is only measured with core senders (see: SenderCore.send_transactions()), which
+time each discharge (commit or rollback) until its outcome.
+"""
+
+import logging
+import math
+import threading
+from typing import Callable, List
+
+from messaging_abstract.message import Message
+
+from messaging_components.clients.external.client_external import ClientExternal
+from messaging_components.clients.external.fleet import ClientFleet, FleetStats
+from messaging_components.clients.latency import LatencyHistogram
+
+
+class TransactionConfig:
+    """
+    Transaction size and share of senders rolling back their transactions.
+    """
+    __slots__ = ('tx_size', 'rollback_ratio', 'endloop_action')
+
+    def __init__(self, tx_size: int, rollback_ratio: float=0.0, endloop_action: str='commit'):
+        self.tx_size = tx_size
+        self.rollback_ratio = rollback_ratio
+        self.endloop_action = endloop_action
+
+    def rolls_back(self, index: int) -> bool:
+        """
+        Whether the sender of the given index rolls back (spread evenly across the fleet).
+        :param index:
+        :return:
+        """
+        return math.floor((index + 1) * self.rollback_ratio) > math.floor(index * self.rollback_ratio)
+
+    def __repr__(self):
+        return "TransactionConfig(tx_size=%d, rollback_ratio=%.2f)" % (self.tx_size, self.rollback_ratio)
+
+
+def set_transaction(client: ClientExternal, tx_size: int, action: str, endloop_action: str):
+    """
+    Sets the transaction options of an external sender or receiver.
+    :param client:
+    :param tx_size:
+    :param action: commit or rollback
+    :param endloop_action: Action for the last (incomplete) transaction
+    :return:
+    """
+    transaction = client.command.transaction
+    transaction.tx_size = tx_size
+    transaction.tx_action = action
+    transaction.tx_endloop_action = endloop_action
+
+
+class TransactionResult:
+    """
+    Outcome of a configuration.
+    """
+    def __init__(self, config: TransactionConfig, senders: FleetStats, receivers: FleetStats, committed: int,
+                 commit_latency: LatencyHistogram=None):
+        self.config = config
+        self.senders = senders
+        self.receivers = receivers
+        self.committed = committed  # messages sent in committed transactions, by successful senders
+        self.commit_latency = commit_latency  # of all transactions of core senders (None without them)
+
+    def commit_percentile(self, percentile: float) -> float:
+        """
+        :param percentile:
+        :return: Commit latency (seconds) at the given percentile, or None if not measured
+        """
+        if self.commit_latency is None or not self.commit_latency.total:
+            return None
+        return self.commit_latency.percentile(percentile)
+
+    @property
+    def duration(self) -> float:
+        return max(self.senders.duration, self.receivers.duration if self.receivers else 0.0)
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.committed / self.duration if self.duration else 0.0
+
+    @property
+    def transactions_per_second(self) -> float:
+        return self.messages_per_second / self.config.tx_size
+
+    @property
+    def failed(self) -> int:
+        return self.senders.failed + (self.receivers.failed if self.receivers else 0)
+
+    def row(self) -> dict:
+        return {
+            'tx_size': self.config.tx_size,
+            'rollback_ratio': self.config.rollback_ratio,
+            'messages': self.committed,
+            'duration': self.duration,
+            'msgs/s': self.messages_per_second,
+            'tx/s': self.transactions_per_second,
+            'commit_p50': self.commit_percentile(50),
+            'commit_p99': self.commit_percentile(99),
+            'commit_max': self.commit_percentile(100),
+            'failed': self.failed,
+        }
+
+
+def format_table(rows: List[dict], columns: List[str]=None) -> str:
+    """
+    Formats rows as a plain text table (floats with 3 decimals).
+    :param rows:
+    :param columns: Defaults to the keys of the first row
+    :return:
+    """
+    if not rows:
+        return ''
+    columns = columns or list(rows[0])
+    cells = [[('%.3f' % row.get(column)) if isinstance(row.get(column), float) else str(row.get(column, ''))
+              for column in columns] for row in rows]
+    widths = [max(len(column), *(len(line[index]) for line in cells)) for index, column in enumerate(columns)]
+    lines = ['  '.join(column.rjust(width) for column, width in zip(columns, widths)),
+             '  '.join('-' * width for width in widths)]
+    lines += ['  '.join(cell.rjust(width) for cell, width in zip(line, widths)) for line in cells]
+    return '\n'.join(lines)
+
+
+class TransactionReport:
+    """
+    Results of all configurations of a sweep.
+    """
+    def __init__(self, results: List[TransactionResult]):
+        self.results = results
+
+    def rows(self) -> List[dict]:
+        return [result.row() for result in self.results]
+
+    def table(self) -> str:
+        return format_table(self.rows())
+
+    def best(self) -> TransactionResult:
+        """
+        Configuration with the highest committed throughput and no failed clients.
+        :return:
+        """
+        candidates = [result for result in self.results if not result.failed]
+        return max(candidates, key=lambda result: result.messages_per_second) if candidates else None
+
+
+class TransactionSweep:
+    """
+    Runs senders (and receivers) once for every combination of transaction size and rollback ratio.
+    Committed messages are split between receivers, which run transactions of the same size
+    (always committed), when receiver_tx is set.
+    """
+    def __init__(self, senders: ClientFleet, receivers: ClientFleet=None, tx_sizes: List[int]=(1, 10, 100),
+                 rollback_ratios: List[float]=(0.0,), messages_per_client: int=1000, message: Message=None,
+                 receiver_tx: bool=True):
+        self.senders = senders
+        self.receivers = receivers
+        self.tx_sizes = tx_sizes
+        self.rollback_ratios = rollback_ratios
+        self.messages_per_client = messages_per_client
+        self.message = message
+        self.receiver_tx = receiver_tx
+        self._logger = logging.getLogger(self.__module__)
+
+    def configurations(self) -> List[TransactionConfig]:
+        return [TransactionConfig(tx_size, ratio) for tx_size in self.tx_sizes for ratio in self.rollback_ratios]
+
+    def _sender_action(self, config: TransactionConfig, handlers: dict) -> Callable[[ClientExternal], None]:
+        """
+        :param config:
+        :param handlers: Filled with the transaction handler of each core sender, by client id
+        :return:
+        """
+        indexes = {id(client): index for index, client in enumerate(self.senders.clients)}
+
+        def action(client: ClientExternal):
+            if config.rolls_back(indexes[id(client)]):
+                tx_action, endloop_action = 'rollback', 'rollback'
+            else:
+                tx_action, endloop_action = 'commit', config.endloop_action
+
+            if not hasattr(client, 'send_transactions'):
+                set_transaction(client, config.tx_size, tx_action, endloop_action)
+                client.command.control.count = self.messages_per_client
+                client.send(self.message)
+                return
+
+            # Core senders run in background, they are waited for here
+            handler = client.send_transactions(self.message, self.messages_per_client, config.tx_size,
+                                               tx_action, endloop_action)
+            handlers[id(client)] = handler
+            client.wait()
+            if handler.stats.errors:
+                raise RuntimeError('; '.join(handler.stats.errors))
+        return action
+
+    def _receiver_action(self, config: TransactionConfig, committed: int) -> Callable[[ClientExternal], None]:
+        share, remainder = divmod(committed, len(self.receivers.clients))
+        counts = {id(client): share + (1 if index < remainder else 0)
+                  for index, client in enumerate(self.receivers.clients)}
+
+        def action(client: ClientExternal):
+            if self.receiver_tx:
+                set_transaction(client, config.tx_size, 'commit', 'commit')
+            client.command.control.count = counts[id(client)]
+            client.receive()
+        return action
+
+    def run_configuration(self, config: TransactionConfig) -> TransactionResult:
+        """
+        Runs a configuration.
+        :param config:
+        :return:
+        """
+        committers = sum(1 for index in range(len(self.senders.clients)) if not config.rolls_back(index))
+        expected = committers * self.messages_per_client
+
+        receiver_stats = []
+        receivers = None
+        if self.receivers is not None and expected:
+            receivers = threading.Thread(
+                target=lambda: receiver_stats.append(self.receivers.run(self._receiver_action(config, expected))))
+            receivers.start()
+
+        handlers = {}
+        sender_stats = self.senders.run(self._sender_action(config, handlers),
+                                        messages_per_client=self.messages_per_client)
+        if receivers is not None:
+            receivers.join()
+
+        # Only messages of committing senders that completed successfully are counted
+        # (core senders report the messages of their committed transactions)
+        committed = 0
+        for index, result in enumerate(sender_stats.results):
+            handler = handlers.get(id(result.client))
+            if not result.success:
+                continue
+            if handler is not None:
+                committed += handler.committed
+            elif not config.rolls_back(index):
+                committed += self.messages_per_client
+
+        commit_latency = LatencyHistogram.merged(handler.commit_latency for handler in handlers.values()) \
+            if handlers else None
+        result = TransactionResult(config, sender_stats, receiver_stats[0] if receiver_stats else None,
+                                   committed, commit_latency)
+        self._logger.info("%s: %.2f msgs/s" % (config, result.messages_per_second))
+        return result
+
+    def run(self) -> TransactionReport:
+        """
+        Runs all configurations.
+        :return:
+        """
+        return TransactionReport([self.run_configuration(config) for config in self.configurations()])
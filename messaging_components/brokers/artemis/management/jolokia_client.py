@@ -169,6 +169,23 @@ class ArtemisJolokiaClient(object):
         request.arguments = [address_name, queue_name, durable, routing_type]
         return self._execute(request)
 
+    def read_attribute(self, attribute: str, mbean: str=None) -> ArtemisJolokiaClientResult:
+        """
+        Reads an attribute of the broker (or of the given MBean, i.e. java.lang:type=Memory),
+        returned through the data property of the returned object.
+        :param attribute: Attribute name (i.e. ConnectionCount)
+        :param mbean:
+        :return:
+        """
+        request = copy.copy(self)
+        request.type = 'read'
+        request.mbean = mbean or self.mbean
+        request.attribute = attribute
+        result = self._execute(request)
+        if result.success:
+            result.data = result.response.json().get('value')
+        return result
+
     def to_json(self):
         """
         Returns a JSON representation of the object.
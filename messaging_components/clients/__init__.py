@@ -1,4 +1,11 @@
-from .external import *
+from .external import ClientExternal, ClientFactory
+from .external import __all__
+
+
+def __getattr__(name: str):
+    # Client classes are imported on first use (see: clients.external)
+    from . import external
+    return getattr(external, name)
 
 
 def not_supported():
@@ -1,4 +1,5 @@
-from .client import Client
-from .sender import Sender
-from .receiver import Receiver
-from .connector import Connector
+from .client import ClientCore, CoreRunner, CoreStats, MessagePool
+from .sender import SenderCore
+from .receiver import ReceiverCore
+from .connector import ConnectorCore
+from .aio import AsyncConnection, AsyncReceiver, AsyncSender
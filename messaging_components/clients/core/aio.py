@@ -0,0 +1,471 @@
+"""
+Asyncio API for core clients. The proton engine (Connection, Transport and Collector)
+of each connection is driven directly by asyncio streams, without a reactor or a
+thread per connection, so a single process can handle thousands of connections and links.
+
+Example:
+    connection = await AsyncConnection.connect('amqp://127.0.0.1:5672')
+    sender = await connection.open_sender('examples')
+    await sender.send(Message(body='hello'))
+    receiver = await connection.open_receiver('examples')
+    async for message in receiver:
+        ...
+    await connection.close()
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import List
+
+import proton
+from proton import Collector, Connection, Delivery, Event, SASL, SSL, SSLDomain, Transport, Url
+
+from messaging_components.clients.core.client import encode_message, message_payload, send_encoded, to_proton_message
+
+# Seconds between checks of the transport input capacity, while it is full
+_CAPACITY_POLL = 0.01
+
+
+class AsyncClientError(Exception):
+    """
+    Raised when a connection or link is closed by the peer or fails.
+    """
+    pass
+
+
+class _LinkState:
+    __slots__ = ('opened', 'closed', 'credit')
+
+    def __init__(self, loop):
+        self.opened = loop.create_future()
+        self.closed = loop.create_future()
+        self.credit = asyncio.Event()
+
+
+class AsyncConnection:
+    """
+    AMQP connection whose proton engine is driven by asyncio streams.
+    """
+    def __init__(self, url: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 connection: Connection, transport: Transport):
+        self.url = url
+        self._reader = reader
+        self._writer = writer
+        self._connection = connection
+        self._transport = transport
+        self._collector = Collector()
+        self._connection.collect(self._collector)
+        self._loop = asyncio.get_event_loop()
+        self._opened = self._loop.create_future()
+        self._closed = self._loop.create_future()
+        self._links = {}  # type: dict  # link: _LinkState
+        self._deliveries = {}  # type: dict  # delivery: future
+        self._receivers = {}  # type: dict  # link: AsyncReceiver
+        self._session = None
+        self._io_task = None
+        self._logger = logging.getLogger(self.__module__)
+
+    @staticmethod
+    async def connect(url: str, ssl_domain: SSLDomain=None, allowed_mechs: str=None, user: str=None,
+                      password: str=None, container_id: str=None, timeout: float=None) -> 'AsyncConnection':
+        """
+        Opens a connection to url (the path, if any, is ignored).
+        :param url:
+        :param ssl_domain: Use SSL (encryption is done by the proton transport)
+        :param allowed_mechs: SASL mechanisms (i.e. ANONYMOUS or PLAIN)
+        :param user:
+        :param password:
+        :param container_id:
+        :param timeout: Seconds to wait for the connection to be opened
+        :return:
+        """
+        parsed = Url(url)
+        parsed.defaults()
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(parsed.host, int(parsed.port)), timeout)
+
+        connection = Connection()
+        connection.container = container_id or str(uuid.uuid4())
+        connection.hostname = parsed.host
+        user = user or parsed.username
+        password = password or parsed.password
+        if user:
+            connection.user = user
+            connection.password = password
+
+        transport = Transport()
+        if ssl_domain is not None:
+            SSL(transport, ssl_domain)
+        sasl = transport.sasl()  # type: SASL
+        sasl.allowed_mechs(allowed_mechs or ('PLAIN' if user else 'ANONYMOUS'))
+        transport.bind(connection)
+
+        async_connection = AsyncConnection(url, reader, writer, connection, transport)
+        connection.open()
+        async_connection._io_task = asyncio.ensure_future(async_connection._run())
+        try:
+            result = await asyncio.wait_for(asyncio.shield(async_connection._opened), timeout)
+        except BaseException:
+            # Timed out (or cancelled): the socket must not be left open
+            async_connection._abort()
+            raise
+        if isinstance(result, Exception):
+            async_connection._abort()
+            raise result
+        return async_connection
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.done()
+
+    async def _run(self):
+        """
+        Pumps bytes between the stream and the proton transport and dispatches engine events.
+        :return:
+        """
+        transport = self._transport
+        try:
+            while True:
+                self._dispatch()
+                pending = await self._flush()
+                capacity = transport.capacity()
+                if pending < 0 and capacity < 0:
+                    break
+                if capacity < 0:
+                    # Nothing else will be read, just let the transport write what is left
+                    transport.close_head()
+                    continue
+
+                deadline = transport.tick(time.time())
+                timeout = max(deadline - time.time(), 0) if deadline else None
+                if capacity == 0:
+                    # Input buffer full, nothing can be pushed until the transport processes it
+                    await asyncio.sleep(min(timeout, _CAPACITY_POLL) if timeout is not None else _CAPACITY_POLL)
+                    continue
+                try:
+                    data = await asyncio.wait_for(self._reader.read(capacity), timeout)
+                except asyncio.TimeoutError:
+                    continue
+
+                if data:
+                    transport.push(data)
+                else:
+                    transport.close_tail()
+        except Exception as ex:
+            self._fail(AsyncClientError('Connection to %s failed: %s' % (self.url, ex)))
+        finally:
+            self._dispatch()
+            self._writer.close()
+            self._fail(AsyncClientError('Connection to %s closed' % self.url))
+
+    async def _flush(self) -> int:
+        """
+        Writes all pending output of the transport.
+        :return: Transport pending output (negative once the output is closed)
+        """
+        self._wake()
+        await self._writer.drain()
+        return self._transport.pending()
+
+    def _wake(self):
+        """
+        Writes pending output after engine state is changed outside of the IO task.
+        The transport only exposes up to a frame of output at once, so it is written
+        until nothing is left (or a message larger than a frame would wait for the peer).
+        :return:
+        """
+        pending = self._transport.pending()
+        while pending > 0:
+            data = self._transport.peek(pending)
+            self._writer.write(data)
+            self._transport.pop(len(data))
+            pending = self._transport.pending()
+
+    def _dispatch(self):
+        collector = self._collector
+        event = collector.peek()
+        while event is not None:
+            event_type = event.type
+            if event_type == Event.CONNECTION_REMOTE_OPEN:
+                _set_result(self._opened, True)
+            elif event_type in (Event.CONNECTION_REMOTE_CLOSE, Event.TRANSPORT_CLOSED):
+                condition = self._connection.remote_condition or self._transport.condition
+                if event_type == Event.CONNECTION_REMOTE_CLOSE and self._connection.state & Connection.LOCAL_ACTIVE:
+                    self._connection.close()
+                if condition:
+                    self._fail(AsyncClientError('Connection to %s closed: %s' % (self.url, condition)))
+            elif event_type == Event.LINK_REMOTE_OPEN:
+                state = self._links.get(event.link)
+                if state:
+                    _set_result(state.opened, True)
+            elif event_type == Event.LINK_REMOTE_CLOSE:
+                self._link_closed(event.link)
+            elif event_type == Event.LINK_FLOW:
+                state = self._links.get(event.link)
+                if state and event.link.credit > 0:
+                    state.credit.set()
+            elif event_type == Event.DELIVERY:
+                self._delivery(event.delivery)
+            collector.pop()
+            event = collector.peek()
+
+    def _link_closed(self, link):
+        state = self._links.pop(link, None)
+        if state is None:
+            return
+        condition = link.remote_condition
+        error = AsyncClientError('Link %s closed: %s' % (link.name, condition)) if condition else None
+        _set_result(state.opened, error)
+        _set_result(state.closed, error)
+        state.credit.set()
+        receiver = self._receivers.pop(link, None)
+        if receiver is not None:
+            receiver._queue.put_nowait(error or StopAsyncIteration())
+        if link.state & proton.Endpoint.LOCAL_ACTIVE:
+            link.close()
+
+    def _delivery(self, delivery: Delivery):
+        link = delivery.link
+        if link.is_sender:
+            if delivery.updated and delivery.remote_state:
+                future = self._deliveries.pop(delivery, None)
+                if future is not None:
+                    _set_result(future, delivery.remote_state)
+                delivery.settle()
+            return
+
+        if not delivery.readable or delivery.partial:
+            return
+        receiver = self._receivers.get(link)
+        data = link.recv(delivery.pending)
+        link.advance()
+        if receiver is None:
+            delivery.update(Delivery.RELEASED)
+            delivery.settle()
+            return
+        receiver._received(data, delivery)
+
+    def _abort(self):
+        """
+        Closes the socket and stops the IO task, without waiting for the peer.
+        :return:
+        """
+        if self._io_task is not None:
+            self._io_task.cancel()
+            self._io_task = None
+        self._writer.close()
+        self._fail(AsyncClientError('Connection to %s aborted' % self.url))
+
+    def _fail(self, error: Exception):
+        _set_result(self._opened, error)
+        _set_result(self._closed, error)
+        for state in self._links.values():
+            _set_result(state.opened, error)
+            _set_result(state.closed, error)
+            state.credit.set()
+        for future in self._deliveries.values():
+            _set_result(future, error)
+        self._deliveries.clear()
+        for receiver in self._receivers.values():
+            receiver._queue.put_nowait(error)
+        self._receivers.clear()
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = self._connection.session()
+            self._session.open()
+        return self._session
+
+    async def _open_link(self, link, timeout: float=None):
+        state = self._links[link] = _LinkState(self._loop)
+        link.open()
+        self._wake()
+        result = await asyncio.wait_for(asyncio.shield(state.opened), timeout)
+        if isinstance(result, Exception):
+            raise result
+        return state
+
+    async def open_sender(self, address: str, name: str=None, presettled: bool=False,
+                          timeout: float=None) -> 'AsyncSender':
+        """
+        Opens a sender link to address.
+        :param address:
+        :param name:
+        :param presettled: Send messages settled (at most once)
+        :param timeout:
+        :return:
+        """
+        link = self._get_session().sender(name or 'sender-%s' % uuid.uuid4())
+        link.target.address = address
+        link.source.address = address
+        if presettled:
+            link.snd_settle_mode = proton.Link.SND_SETTLED
+        state = await self._open_link(link, timeout)
+        return AsyncSender(self, link, state, presettled)
+
+    async def open_receiver(self, address: str, name: str=None, credit: int=100,
+                            timeout: float=None) -> 'AsyncReceiver':
+        """
+        Opens a receiver link from address, granting credit messages at a time.
+        :param address:
+        :param name:
+        :param credit:
+        :param timeout:
+        :return:
+        """
+        link = self._get_session().receiver(name or 'receiver-%s' % uuid.uuid4())
+        link.source.address = address
+        link.target.address = address
+        receiver = self._receivers[link] = AsyncReceiver(self, link, credit)
+        await self._open_link(link, timeout)
+        link.flow(credit)
+        self._wake()
+        return receiver
+
+    async def close(self, timeout: float=None):
+        """
+        Closes the connection, waiting for the peer to close it.
+        :param timeout:
+        :return:
+        """
+        if not self._closed.done():
+            self._connection.close()
+            self._wake()
+            try:
+                await asyncio.wait_for(asyncio.shield(self._closed), timeout)
+            except asyncio.TimeoutError:
+                self._logger.warning("Connection to %s not closed by peer" % self.url)
+        if self._io_task is not None:
+            self._io_task.cancel()
+            self._io_task = None
+
+
+class AsyncSender:
+    """
+    Sender link of an AsyncConnection.
+    """
+    def __init__(self, connection: AsyncConnection, link, state: _LinkState, presettled: bool):
+        self.connection = connection
+        self.link = link
+        self._state = state
+        self.presettled = presettled
+        self._tag = 0
+
+    async def send(self, message, timeout: float=None):
+        """
+        Sends a message (messaging_abstract or proton Message), waiting for credit.
+        :param message:
+        :param timeout:
+        :return: Remote outcome (i.e. Delivery.ACCEPTED), or None when presettled
+        """
+        return await self.send_encoded(encode_message(to_proton_message(message), message_payload(message)), timeout)
+
+    async def send_encoded(self, data, timeout: float=None):
+        """
+        Sends an already encoded message (see: MessagePool), as bytes or chunks.
+        :param data:
+        :param timeout:
+        :return:
+        """
+        link = self.link
+        while link.credit <= 0:
+            self._state.credit.clear()
+            if self._state.closed.done():
+                raise AsyncClientError('Link %s is closed' % link.name)
+            await asyncio.wait_for(self._state.credit.wait(), timeout)
+
+        self._tag += 1
+        delivery = link.delivery(str(self._tag).encode())
+        send_encoded(link, data)
+        link.advance()
+
+        if self.presettled:
+            delivery.settle()
+            self.connection._wake()
+            return None
+
+        future = self.connection._loop.create_future()
+        self.connection._deliveries[delivery] = future
+        self.connection._wake()
+        result = await asyncio.wait_for(future, timeout)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def close(self):
+        self.link.close()
+        self.connection._wake()
+
+
+class AsyncReceiver:
+    """
+    Receiver link of an AsyncConnection, usable as an async iterator of proton Messages.
+    Messages are accepted when handed to the caller.
+    """
+    def __init__(self, connection: AsyncConnection, link, credit: int):
+        self.connection = connection
+        self.link = link
+        self.credit = credit
+        self._queue = asyncio.Queue()
+
+    def _received(self, data: bytes, delivery: Delivery):
+        self._queue.put_nowait((data, delivery))
+
+    async def receive(self, timeout: float=None) -> proton.Message:
+        """
+        Waits for the next message.
+        :param timeout:
+        :return:
+        """
+        item = await asyncio.wait_for(self._queue.get(), timeout)
+        if isinstance(item, BaseException):
+            # Keep the error for other waiters
+            self._queue.put_nowait(item)
+            raise item
+
+        data, delivery = item
+        message = proton.Message()
+        message.decode(data)
+        delivery.update(Delivery.ACCEPTED)
+        delivery.settle()
+
+        # Replenish credit when half of it has been used
+        if self.link.credit <= self.credit // 2:
+            self.link.flow(self.credit - self.link.credit)
+        self.connection._wake()
+        return message
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> proton.Message:
+        return await self.receive()
+
+    async def close(self):
+        self.link.close()
+        self.connection._wake()
+
+
+async def open_connections(url: str, count: int, concurrency: int=100, **kwargs) -> List[AsyncConnection]:
+    """
+    Opens many connections (i.e. connection storm), at most concurrency of them being established at once.
+    Connections that failed to open are returned as the exception raised.
+    :param url:
+    :param count:
+    :param concurrency:
+    :param kwargs: See: AsyncConnection.connect()
+    :return:
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def connect():
+        async with semaphore:
+            return await AsyncConnection.connect(url, **kwargs)
+
+    return await asyncio.gather(*[connect() for _ in range(count)], return_exceptions=True)
+
+
+def _set_result(future: asyncio.Future, result):
+    if not future.done():
+        future.set_result(result)
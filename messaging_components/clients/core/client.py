@@ -1,12 +1,275 @@
 """
-    # TODO jstejska: Package description
+In-process (core) clients based on the Proton reactor.
+Each client runs its own Container in a background thread, so tests and
+benchmarks can drive messaging directly, without launching external processes.
 """
 
+import threading
+import time
+
 from autologging import logged, traced
 from iqa_common.executor import Executor
 from messaging_abstract.component.client import Client, Node
+import proton
+from proton.handlers import MessagingHandler
+from proton.reactor import ApplicationEvent, Container, EventInjector
 
 import messaging_components.protocols as protocols
+from messaging_components.clients.latency import stamp_properties
+from messaging_components.clients.payload import Payload, encode_with_payload
+
+
+def to_proton_message(message) -> proton.Message:
+    """
+    Converts a messaging_abstract Message (or any object with a body) into a proton Message.
+    :param message:
+    :return:
+    """
+    if isinstance(message, proton.Message):
+        return message
+
+    # Payload bodies are encoded separately (see: encode_message())
+    body = getattr(message, 'body', message)
+    proton_message = proton.Message(body=None if isinstance(body, Payload) else body)
+    for attribute in ('id', 'subject', 'reply_to', 'durable', 'ttl', 'priority', 'correlation_id',
+                      'user_id', 'group_id', 'content_type', 'address'):
+        value = getattr(message, attribute, None)
+        if value is not None:
+            setattr(proton_message, attribute, value)
+    properties = getattr(message, 'application_properties', None) or getattr(message, 'properties', None)
+    if properties:
+        proton_message.properties = dict(properties)
+    return proton_message
+
+
+def message_payload(message) -> Payload:
+    """
+    :param message:
+    :return: The body of message if it is a Payload, None otherwise
+    """
+    body = getattr(message, 'body', message)
+    return body if isinstance(body, Payload) else None
+
+
+def encode_message(message, payload: Payload=None):
+    """
+    Encodes a message. Messages whose body is a Payload are encoded as chunks
+    referencing the memory-mapped payload (see: send_encoded()).
+    :param message: proton Message
+    :param payload:
+    :return: bytes-like or list of chunks
+    """
+    if payload is not None:
+        return encode_with_payload(message, payload)
+    return message.encode()
+
+
+def send_encoded(link, encoded):
+    """
+    Sends an encoded message (bytes-like or list of chunks) to the current delivery of the link.
+    :param link:
+    :param encoded:
+    :return:
+    """
+    if not isinstance(encoded, list):
+        # bytes, or bytearray as returned by Message.encode() of recent proton versions
+        link.send(encoded)
+        return
+    for chunk in encoded:
+        link.send(chunk)
+
+
+class MessagePool:
+    """
+    Pool of pre-encoded messages, reused (round robin) for every send,
+    so messages are built and encoded only once.
+    """
+    __slots__ = ('_messages', '_payloads', '_encoded', '_index')
+
+    def __init__(self, messages: list):
+        if not messages:
+            raise ValueError('Message pool requires at least one message')
+        self._messages = [to_proton_message(message) for message in messages]
+        self._payloads = [message_payload(message) for message in messages]
+        self._encoded = [encode_message(message, payload) for message, payload in zip(self._messages, self._payloads)]
+        self._index = 0
+
+    def __len__(self):
+        return len(self._encoded)
+
+    def next(self):
+        """
+        :return: Next encoded message (see: encode_message())
+        """
+        encoded = self._encoded[self._index]
+        self._index = (self._index + 1) % len(self._encoded)
+        return encoded
+
+    def next_stamped(self, sequence: int, send_time: float=None):
+        """
+        Encodes the next message stamped with the send time (defaults to now)
+        and the given sequence (see: latency module).
+        :param sequence:
+        :param send_time:
+        :return:
+        """
+        message = self._messages[self._index]
+        payload = self._payloads[self._index]
+        self._index = (self._index + 1) % len(self._messages)
+        properties = message.properties
+        message.properties = stamp_properties(sequence, properties, send_time)
+        try:
+            return encode_message(message, payload)
+        finally:
+            message.properties = properties
+
+
+class CoreStats:
+    """
+    Counters of a core client run.
+    """
+    __slots__ = ('sent', 'accepted', 'rejected', 'released', 'received', 'started', 'finished', 'errors')
+
+    def __init__(self):
+        self.sent = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.released = 0
+        self.received = 0
+        self.started = None  # type: float
+        self.finished = None  # type: float
+        self.errors = []  # type: list
+
+    @property
+    def duration(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def throughput(self) -> float:
+        """
+        Messages sent or received per second.
+        :return:
+        """
+        duration = self.duration
+        return (self.sent or self.received) / duration if duration else 0.0
+
+    def __repr__(self):
+        return "CoreStats(sent=%d, accepted=%d, rejected=%d, released=%d, received=%d, %.1f msg/s, errors=%s)" % (
+            self.sent, self.accepted, self.rejected, self.released, self.received, self.throughput, self.errors)
+
+
+class CoreHandler(MessagingHandler):
+    """
+    Base handler for core clients. Other threads interact with the
+    container only through the event injector (see: CoreRunner.stop()).
+    """
+    def __init__(self, url: str, connection_options: dict=None, **kwargs):
+        super(CoreHandler, self).__init__(**kwargs)
+        self.url = url
+        self.address = proton.Url(url).path
+        self.connection_options = connection_options or {}
+        self.stats = CoreStats()
+        self.injector = EventInjector()
+        self.container = None
+        self.connection = None
+        self._closed = False
+
+    def on_reactor_init(self, event):
+        event.container.selectable(self.injector)
+        super(CoreHandler, self).on_reactor_init(event)
+
+    def on_start(self, event):
+        self.container = event.container
+        self.connection = event.container.connect(self.url, **self.connection_options)
+        self.stats.started = time.time()
+        self.open_links(event)
+
+    def open_links(self, event):
+        raise NotImplementedError()
+
+    def close(self):
+        """
+        Closes the connection and stops the container, once there is nothing else to do.
+        :return:
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self.stats.finished = time.time()
+        if self.connection is not None:
+            self.connection.close()
+        self.injector.close()
+
+    def on_stop_client(self, event):
+        self.close()
+
+    def stopped(self):
+        """
+        Called once the container has stopped, normally or not (see: CoreRunner).
+        :return:
+        """
+        if self.stats.finished is None:
+            self.stats.finished = time.time()
+
+    def _error(self, event, kind: str):
+        # Transports have a (local) condition only, connections and links a remote one
+        context = event.context
+        condition = getattr(context, 'remote_condition', None) or getattr(context, 'condition', None)
+        self.stats.errors.append('%s: %s' % (kind, condition))
+        self.close()
+
+    def on_transport_error(self, event):
+        self._error(event, 'transport')
+
+    def on_connection_error(self, event):
+        self._error(event, 'connection')
+
+    def on_link_error(self, event):
+        self._error(event, 'link')
+
+
+class CoreRunner:
+    """
+    Runs a Container with the given handler in a background thread.
+    """
+    def __init__(self, handler: CoreHandler):
+        self.handler = handler
+        self.container = Container(handler)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        try:
+            self.container.run()
+        except Exception as ex:
+            # Recorded as an error of the run, instead of only ending the thread
+            self.handler.stats.errors.append('container: %r' % ex)
+        finally:
+            self.handler.stopped()
+
+    def start(self) -> 'CoreRunner':
+        self.thread.start()
+        return self
+
+    def wait(self, timeout: float=None) -> bool:
+        """
+        Waits for the client to complete.
+        :param timeout:
+        :return: True if completed
+        """
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+    def stop(self, timeout: float=None) -> bool:
+        """
+        Asks the client to close (thread safe) and waits for it.
+        :param timeout:
+        :return: True if stopped
+        """
+        if self.thread.is_alive():
+            self.handler.injector.trigger(ApplicationEvent('stop_client'))
+        return self.wait(timeout)
 
 
 @logged
@@ -18,170 +281,67 @@ class ClientCore(Client):
     implementation = 'core'
     version = '0.1'
 
-    def __init__(self, name: str, node: Node, executor: Executor):
-        super(ClientCore, self).__init__(name, node, executor)
-
-#
-# """
-#     # TODO jstejska: Package description
-# """
-#
-# # -*- coding: utf-8 -*-
-#
-# import threading
-#
-# from proton.handlers import MessagingHandler
-# from proton.reactor import Container
-#
-#
-# class Timeout(object):
-#     def __init__(self, handler):
-#         self.registrated_handler = handler
-#
-#     def on_timer_task(self, event):
-#         self.registrated_handler.timeout(event)
-#
-#
-# class Client(MessagingHandler):
-#     # TODO error handling is not incorporated, this is just a raw idea
-#     """Client represents an entity in the framework capable of manipulation with messages (sending, receiving, parsing ...)
-#     """
-#
-#     def __init__(self, blocking=False):
-#         """ # TODO jstejska: Description
-#
-#         :param blocking: if clients blocks program execution - runs on foreground
-#         :type blocking: bool
-#         """
-#         super(Client, self).__init__()
-#         self.hostname = None
-#         self.address = None
-#         self.message_pool = []
-#         self.error = False
-#         self.container = None
-#         self.event = None
-#         self.thread = None
-#         self._blocking = blocking
-#
-#     @property
-#     def msg_cnt(self):
-#         """ # TODO jstejska: Description
-#
-#         :return: count of available messages
-#         :rtype: int
-#         """
-#         return len(self.message_pool)
-#
-#     def run(self):
-#         """Starts clients.
-#
-#         Client runs on foreground/background according to its configuration during initialization
-#
-#         :return: None
-#         :rtype: # TODO jstejska: type
-#         """
-#         self.thread = threading.Thread(target=self.container.run)  # assing a thread
-#         if self._blocking:
-#             self.thread.run()
-#         else:
-#             self.thread.start()  # invokes separate thread of control
-#
-#     def stop(self):
-#         self.thread.join(timeout=1)
-#
-#
-# class Sender(Client):
-#     """Most basic example clients capable of sending messages."""
-#
-#     def __init__(self, hostname="localhost", address="test_queue", count=1, messages=None, blocking=False):
-#         """ # TODO jstejska: Description
-#
-#         :param hostname: hostname of the physical node with routers/brokers/receiver
-#         :type hostname: str
-#         :param address: address where to send (queue name, topic name)
-#         :type address: str
-#         :param count: count of messages to send - every message from the 'messages' will be sent *count* times
-#         :type count: int
-#         :param messages: pool of messages to send, note count - proton.Message
-#         :type messages: list
-#         :param blocking: if clients blocks program execution - runs on foreground
-#         :type blocking: bool
-#         """
-#         super(Sender, self).__init__(blocking=blocking)
-#         if messages is None:
-#             messages = []
-#         self.hostname = hostname
-#         self.address = address
-#         self.counter = 0
-#         self.max_messages = count
-#         self.messages = messages
-#         self.container = None
-#         self.container = Container(self)
-#
-#     def on_start(self, event):  # event loop starts
-#         conn = event.container.connect(self.hostname)
-#         event.container.create_sender(conn, self.address)
-#
-#     def on_sendable(self,
-#                     event):  # link has credit and we can transfer messages TODO add link credit checking see dtests
-#         if event.sender:
-#             for message in self.messages:
-#                 counter_per_message = 0
-#                 if counter_per_message < self.max_messages:
-#                     event.sender.send(message)
-#                     self.message_pool.append(message)  # sent messages to the pool
-#                     counter_per_message += 1
-#                 self.counter += 1
-#             if self.counter == self.max_messages:
-#                 event.connection.close()
-#
-#     @staticmethod
-#     def on_connection_closed(event):
-#         event.container.stop()
-#
-#
-# class Receiver(Client):
-#     def __init__(self, hostname="localhost", address="test_queue", expected=1, blocking=True):
-#         """ # TODO jstejska: Description
-#
-#
-#         :param hostname: hostname of the physical node with routers/brokers/receiver
-#         :type hostname: str
-#         :param address: address where to send (queue name, topic name)
-#         :type address: str
-#         :param expected: expected count of messages to receive
-#         :type expected: int
-#         :param blocking: if clients blocks program execution - runs on foreground
-#         :type blocking: bool
-#         """
-#         super(Receiver, self).__init__(blocking=blocking)
-#         self.hostname = hostname
-#         self.confirmed = 0
-#         self.total = expected
-#         self.received = 0
-#         self.receiver = None
-#         self.address = address
-#         self.container = Container(self)
-#         self.timer = None
-#
-#     def on_reactor_init(self, event):  # called when event loop - the reactor - starts
-#         super(Receiver, self).on_reactor_init(event)
-#         self.timer = event.reactor.schedule(5, Timeout(
-#             self))  # schedule timeout -- good for testing purposes to not hang out
-#         self.receiver = event.container.create_receiver(self.hostname + "/" + self.address)
-#         self.receiver.open()
-#
-#     def timeout(self, event):  # TODO error handling is missing
-#         self.error = 1
-#         if self.receiver is not None:
-#             self.receiver.close()
-#         event.container.stop()
-#
-#     def on_message(self, event):  # we got a message
-#         if event.receiver:
-#             self.message_pool.append(event.message)
-#             self.received += 1
-#         if self.received == self.total:
-#             if self.receiver is not None:
-#                 self.receiver.close()
-#         event.container.stop()
+    def __init__(self, name: str, node: Node, executor: Executor, url: str=None, **kwargs):
+        super(ClientCore, self).__init__(name, node, executor, **kwargs)
+        self.url = url  # type: str
+        self.connection_options = {}  # type: dict
+        self.runner = None  # type: CoreRunner
+
+        # initializing client from kwargs
+        for func in [self.set_auth_mechs, self.set_ssl_auth]:
+            self.call_if_all_arguments_in_kwargs(func, **kwargs)
+
+    def get_url(self):
+        return self.url
+
+    def set_url(self, url: str):
+        self.url = url
+
+    def set_auth_mechs(self, mechs: str):
+        self.connection_options['sasl_enabled'] = True
+        self.connection_options['allowed_mechs'] = mechs
+
+    def set_ssl_auth(self, pem_file: str=None, key_file: str=None, keystore: str=None,
+                     keystore_pass: str=None, keystore_alias: str=None):
+        ssl_domain = proton.SSLDomain(proton.SSLDomain.MODE_CLIENT)
+        ssl_domain.set_credentials(pem_file, key_file, keystore_pass)
+        self.connection_options['ssl_domain'] = ssl_domain
+
+    def _run(self, handler: CoreHandler) -> CoreRunner:
+        if self.url is None:
+            raise ValueError('Url has not been defined for %s' % self.name)
+        self.runner = CoreRunner(handler).start()
+        return self.runner
+
+    async def open_async(self, timeout: float=None):
+        """
+        Opens an asyncio connection to the client url (see: aio.AsyncConnection).
+        :param timeout:
+        :return: AsyncConnection
+        """
+        # Imported here as the aio module depends on this one
+        from messaging_components.clients.core.aio import AsyncConnection
+
+        options = {name: value for name, value in self.connection_options.items()
+                   if name in ('ssl_domain', 'allowed_mechs', 'user', 'password')}
+        return await AsyncConnection.connect(self.url, timeout=timeout, **options)
+
+    @property
+    def stats(self) -> CoreStats:
+        return self.runner.handler.stats if self.runner else None
+
+    def wait(self, timeout: float=None) -> bool:
+        """
+        Waits for the current run to complete.
+        :param timeout:
+        :return: True if completed
+        """
+        return self.runner.wait(timeout) if self.runner else True
+
+    def stop(self, timeout: float=None) -> bool:
+        """
+        Stops the current run.
+        :param timeout:
+        :return: True if stopped
+        """
+        return self.runner.stop(timeout) if self.runner else True
@@ -1,18 +1,82 @@
 """
-    # TODO jstejska: Package description
+In-process connector, keeping a number of connections open until stopped.
 """
 
+import threading
+
 from autologging import logged, traced
 from iqa_common.executor import Executor
 from messaging_abstract.component.client import Connector, Node
 
-from messaging_components.clients.core.client import ClientCore
+from messaging_components.clients.core.aio import open_connections
+from messaging_components.clients.core.client import ClientCore, CoreHandler
+
+
+class ConnectorHandler(CoreHandler):
+    """
+    Opens count connections and keeps them open until stopped.
+    """
+    def __init__(self, url: str, count: int=1, connection_options: dict=None):
+        super(ConnectorHandler, self).__init__(url, connection_options)
+        self.count = count
+        self.connections = []
+        self.opened = 0
+        self.ready = threading.Event()
+
+    def on_start(self, event):
+        super(ConnectorHandler, self).on_start(event)
+        self.connections.append(self.connection)
+        for _ in range(self.count - 1):
+            self.connections.append(event.container.connect(self.url, **self.connection_options))
+
+    def open_links(self, event):
+        pass
+
+    def on_connection_opened(self, event):
+        self.opened += 1
+        if self.opened == self.count:
+            self.ready.set()
+
+    def close(self):
+        for connection in self.connections[1:]:
+            connection.close()
+        super(ConnectorHandler, self).close()
+        self.ready.set()
+
+    def stopped(self):
+        super(ConnectorHandler, self).stopped()
+        self.ready.set()
 
 
 @logged
 @traced
 class ConnectorCore(Connector, ClientCore):
     """Core python connector client."""
-    def __init__(self, name: str, node: Node, executor: Executor):
-        super(ConnectorCore, self).__init__(name, node, executor)
-        #  TODO - Define what kind of object the core connector is going to use (maybe the default for python ext. client)
+    def __init__(self, name: str, node: Node, executor: Executor, url: str=None, **kwargs):
+        super(ConnectorCore, self).__init__(name, node, executor, url=url, **kwargs)
+
+    def connect(self, count: int=1, timeout: float=None) -> bool:
+        """
+        Opens count connections, waiting until all of them are opened.
+        Connections are kept open until stop() is called.
+        :param count:
+        :param timeout:
+        :return: True if all connections have been opened
+        """
+        handler = ConnectorHandler(self.url, count, connection_options=self.connection_options)
+        self._run(handler)
+        handler.ready.wait(timeout)
+        return handler.opened == count and not handler.stats.errors
+
+    async def connect_async(self, count: int=1, concurrency: int=100, timeout: float=None) -> list:
+        """
+        Opens count asyncio connections from the current event loop (i.e. connection storms),
+        establishing at most concurrency connections at once.
+        :param count:
+        :param concurrency:
+        :param timeout:
+        :return: List of AsyncConnection (or the exception raised when a connection failed)
+        """
+        options = {name: value for name, value in self.connection_options.items()
+                   if name in ('ssl_domain', 'allowed_mechs', 'user', 'password')}
+        return await open_connections(self.url, count, concurrency, timeout=timeout, **options)
@@ -1,17 +1,149 @@
 """
-    # TODO jstejska: Package description
+In-process receiver, granting credit in a window (prefetch) and
+accepting deliveries in batches.
 """
+
+from collections import deque
+from typing import List
+
 from autologging import logged, traced
 from iqa_common.executor import Executor
 from messaging_abstract.component.client import Receiver, Node
+from proton import Url
+
+from messaging_components.clients.core.client import ClientCore, CoreHandler
+from messaging_components.clients.latency import LatencyHistogram, message_latency
+from messaging_components.clients.payload import Payload, PayloadVerifier
+
+
+class ReceiverHandler(CoreHandler):
+    """
+    Receives count messages (or until stopped, when count is 0), keeping the
+    last max_messages received messages and accepting deliveries in batches of
+    settle_batch (consecutive dispositions are sent together by proton).
+    Latency of messages stamped by senders is recorded into histogram and,
+    when a verifier is given, bodies are verified against the payloads sent.
+    Only a few messages are kept by default, so long runs use bounded memory:
+    max_messages=0 only counts them, and max_messages=None keeps all of them.
+    """
+    # Received messages kept by default
+    MAX_MESSAGES = 100
+
+    def __init__(self, url: str, count: int=0, window: int=1000, settle_batch: int=100,
+                 max_messages: int=MAX_MESSAGES, verifier: PayloadVerifier=None, connection_options: dict=None):
+        super(ReceiverHandler, self).__init__(url, connection_options, prefetch=window, auto_accept=False)
+        self.count = count
+        self.settle_batch = max(1, settle_batch)
+        self.messages = deque(maxlen=max_messages)
+        self.histogram = LatencyHistogram()
+        self.verifier = verifier
+        self.receiver = None
+        self._pending = []
+
+    def open_links(self, event):
+        self.receiver = event.container.create_receiver(self.connection, self.address)
+
+    def on_message(self, event):
+        if self.count and self.stats.received >= self.count:
+            # Messages received after expected count (prefetched) are left for other receivers
+            self.release(event.delivery, delivered=False)
+            return
 
-from messaging_components.clients.core.client import ClientCore
+        self.stats.received += 1
+        latency = message_latency(event.message.properties)
+        if latency is not None:
+            self.histogram.record(latency)
+        if self.verifier is not None:
+            self.verifier.verify(event.message.body)
+        if self.messages.maxlen != 0:
+            self.messages.append(event.message)
+        self._pending.append(event.delivery)
+        if len(self._pending) >= self.settle_batch:
+            self.flush()
+
+        if self.count and self.stats.received == self.count:
+            self.close()
+
+    def flush(self):
+        """
+        Accepts all pending deliveries.
+        :return:
+        """
+        for delivery in self._pending:
+            self.accept(delivery)
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        super(ReceiverHandler, self).close()
 
 
 @logged
 @traced
 class ReceiverCore(Receiver, ClientCore):
     """Core python receiver client."""
-    def __init__(self, name: str, node: Node, executor: Executor):
-        super(ReceiverCore, self).__init__(name, node, executor)
-        #  TODO - Define what kind of object the core receiver is going to use (maybe the default for python ext. client)
+    def __init__(self, name: str, node: Node, executor: Executor, url: str=None, window: int=1000,
+                 settle_batch: int=100, max_messages: int=ReceiverHandler.MAX_MESSAGES, payloads: List[Payload]=None,
+                 **kwargs):
+        """
+        :param name:
+        :param node:
+        :param executor:
+        :param url:
+        :param window: Credit granted to the sender (prefetch)
+        :param settle_batch: Deliveries accepted together
+        :param max_messages: Received messages kept (see: messages), 0 only counts them
+                             and None keeps all of them (memory grows with the run)
+        :param payloads: Payloads the received bodies are verified against
+        :param kwargs:
+        """
+        super(ReceiverCore, self).__init__(name, node, executor, url=url, **kwargs)
+        self.window = window
+        self.settle_batch = settle_batch
+        self.max_messages = max_messages
+        self.payloads = payloads
+
+    def receive(self, count: int=0):
+        """
+        Receives count messages in background (or until stopped, when count is 0).
+        When payloads are defined, received bodies are verified against them (see: verifier).
+        :param count:
+        :return:
+        """
+        verifier = PayloadVerifier(self.payloads) if self.payloads is not None else None
+        self._run(ReceiverHandler(self.url, count, window=self.window, settle_batch=self.settle_batch,
+                                  max_messages=self.max_messages, verifier=verifier,
+                                  connection_options=self.connection_options))
+
+    @property
+    def messages(self) -> list:
+        """
+        Last max_messages received messages (all of them when max_messages is None).
+        :return:
+        """
+        return list(self.runner.handler.messages) if self.runner else []
+
+    @property
+    def histogram(self) -> LatencyHistogram:
+        """
+        Latencies of the stamped messages received in the current run.
+        :return:
+        """
+        return self.runner.handler.histogram if self.runner else LatencyHistogram()
+
+    @property
+    def verifier(self) -> PayloadVerifier:
+        """
+        Payload verification of the current run (None if payloads are not defined).
+        :return:
+        """
+        return self.runner.handler.verifier if self.runner else None
+
+    async def receiver_async(self, timeout: float=None):
+        """
+        Opens an asyncio connection and receiver, to be consumed with: async for message in receiver.
+        :param timeout:
+        :return: AsyncReceiver
+        """
+        connection = await self.open_async(timeout)
+        return await connection.open_receiver(Url(self.url).path, credit=self.window, timeout=timeout)
@@ -1,17 +1,293 @@
 """
-    # TODO jstejska: Package description
+In-process sender, pipelining pre-encoded messages up to a window of unsettled
+deliveries, optionally limited to a given rate (messages per second), or sending
+them in transactions, timing the commit of each one.
 """
+
+import time
+
 from autologging import logged, traced
 from iqa_common.executor import Executor
 from messaging_abstract.component.client import Sender, Node
+from proton import Url
+from proton.handlers import TransactionHandler
+from proton.reactor import AtMostOnce
+
+from messaging_components.clients.core.client import ClientCore, CoreHandler, MessagePool, send_encoded
+from messaging_components.clients.latency import LatencyHistogram
+from messaging_components.clients.load import ArrivalSchedule, LoadProfile
+
+
+class SenderHandler(CoreHandler):
+    """
+    Sends count messages taken from the message pool, keeping at most window
+    deliveries unsettled (ignored when pre-settled) and at most rate messages per second,
+    or following the intended send times of an arrival schedule (see: load module).
+    When stamp is set, messages carry their send time and sequence number, to measure latency.
+    Paced messages are stamped with their intended send time, so latency includes the
+    time they waited for credit or for the window (no coordinated omission).
+    """
+    def __init__(self, url: str, pool: MessagePool, count: int, window: int=1000, rate: float=None,
+                 presettled: bool=False, stamp: bool=False, schedule: ArrivalSchedule=None,
+                 connection_options: dict=None):
+        super(SenderHandler, self).__init__(url, connection_options, prefetch=0)
+        self.pool = pool
+        self.count = schedule.count if schedule else count
+        self.window = window
+        self.rate = rate
+        self.schedule = schedule
+        self.presettled = presettled
+        self.stamp = stamp
+        self.sender = None
+        self.settled = 0
+        self._timer = None
+
+    def open_links(self, event):
+        options = AtMostOnce() if self.presettled else None
+        self.sender = event.container.create_sender(self.connection, self.address, options=options)
+
+    def on_sendable(self, event):
+        self._send_available()
+
+    def on_timer_task(self, event):
+        self._timer = None
+        self._send_available()
+
+    def _send_available(self):
+        sender = self.sender
+        stats = self.stats
+        while stats.sent < self.count and sender.credit > 0:
+            if not self.presettled and stats.sent - self.settled >= self.window:
+                break
+
+            due = None
+            if self.schedule:
+                due = stats.started + self.schedule.time_of(stats.sent)
+            elif self.rate:
+                due = stats.started + stats.sent / self.rate
+            if due is not None:
+                delay = due - time.time()
+                if delay > 0:
+                    if self._timer is None:
+                        self._timer = self.container.schedule(delay, self)
+                    break
+
+            delivery = sender.delivery(str(stats.sent).encode())
+            send_encoded(sender, self.pool.next_stamped(stats.sent, due) if self.stamp else self.pool.next())
+            sender.advance()
+            if self.presettled:
+                delivery.settle()
+            stats.sent += 1
+
+        if stats.sent == self.count and (self.presettled or self.settled == self.count):
+            self.close()
+
+    def on_accepted(self, event):
+        self.stats.accepted += 1
+
+    def on_rejected(self, event):
+        self.stats.rejected += 1
+
+    def on_released(self, event):
+        self.stats.released += 1
+
+    def on_settled(self, event):
+        self.settled += 1
+        self._send_available()
+
+
+class TransactionSenderHandler(CoreHandler, TransactionHandler):
+    """
+    Sends count messages taken from the message pool in transactions of tx_size messages,
+    declared one after the other, each one discharged with action (commit or rollback)
+    and the last incomplete one with endloop_action.
+    For every transaction, commit_latency records the time from the discharge request
+    to its outcome, and transaction_time the time from the declare request to the outcome.
+    """
+    # Transactional state (see: proton.reactor.Transaction.send())
+    TRANSACTIONAL_STATE = 0x34
+
+    def __init__(self, url: str, pool: MessagePool, count: int, tx_size: int, action: str='commit',
+                 endloop_action: str='commit', connection_options: dict=None):
+        super(TransactionSenderHandler, self).__init__(url, connection_options, prefetch=0)
+        self.pool = pool
+        self.count = count
+        self.tx_size = tx_size
+        self.action = action
+        self.endloop_action = endloop_action
+        self.sender = None
+        self.transaction = None
+        self.committed = 0
+        self.rolled_back = 0
+        self.commit_latency = LatencyHistogram()
+        self.transaction_time = LatencyHistogram()
+        self._in_transaction = 0
+        self._declared_at = None
+        self._discharged_at = None
+
+    def open_links(self, event):
+        self.sender = event.container.create_sender(self.connection, self.address)
+        self._declare()
 
-from messaging_components.clients.core.client import ClientCore
+    def _declare(self):
+        self.transaction = None
+        self._in_transaction = 0
+        self._declared_at = time.time()
+        self.container.declare_transaction(self.connection, handler=self)
+
+    def on_transaction_declared(self, event):
+        self.transaction = event.transaction
+        self._send_available()
+
+    def on_sendable(self, event):
+        self._send_available()
+
+    def _send_available(self):
+        transaction = self.transaction
+        if transaction is None or self._discharged_at is not None:
+            return
+        sender = self.sender
+        stats = self.stats
+        while stats.sent < self.count and self._in_transaction < self.tx_size and sender.credit > 0:
+            delivery = sender.delivery(str(stats.sent).encode())
+            send_encoded(sender, self.pool.next())
+            sender.advance()
+            delivery.local.data = [transaction.id]
+            delivery.update(self.TRANSACTIONAL_STATE)
+            stats.sent += 1
+            self._in_transaction += 1
+
+        if self._in_transaction == self.tx_size:
+            self._discharge(self.action)
+        elif stats.sent == self.count:
+            self._discharge(self.endloop_action)
+
+    def _discharge(self, action: str):
+        self._discharged_at = time.time()
+        if action == 'rollback':
+            self.transaction.abort()
+        else:
+            self.transaction.commit()
+
+    def _discharged(self):
+        now = time.time()
+        self.commit_latency.record(now - self._discharged_at)
+        self.transaction_time.record(now - self._declared_at)
+        self._discharged_at = None
+        if self.stats.sent < self.count:
+            self._declare()
+        else:
+            self.close()
+
+    def on_transaction_committed(self, event):
+        self.committed += self._in_transaction
+        self._discharged()
+
+    def on_transaction_aborted(self, event):
+        self.rolled_back += self._in_transaction
+        self._discharged()
+
+    def on_transaction_declare_failed(self, event):
+        self.stats.errors.append('transaction declare failed: %s' % event.delivery.remote_state)
+        self.close()
+
+    def on_transaction_commit_failed(self, event):
+        self.stats.errors.append('transaction commit failed: %s' % event.delivery.remote_state)
+        self.close()
+
+    def on_accepted(self, event):
+        self.stats.accepted += 1
+
+    def on_rejected(self, event):
+        self.stats.rejected += 1
+
+    def on_released(self, event):
+        self.stats.released += 1
 
 
 @logged
 @traced
 class SenderCore(Sender, ClientCore):
     """Core python sender client."""
-    def __init__(self, name: str, node: Node, executor: Executor):
-        super(SenderCore, self).__init__(name, node, executor)
-        #  TODO - Define what kind of object the core sender is going to use (maybe the default for python ext. client)
+    def __init__(self, name: str, node: Node, executor: Executor, url: str=None, window: int=1000,
+                 rate: float=None, presettled: bool=False, stamp: bool=False, **kwargs):
+        super(SenderCore, self).__init__(name, node, executor, url=url, **kwargs)
+        self.window = window
+        self.rate = rate
+        self.presettled = presettled
+        self.stamp = stamp
+        self._async_sender = None
+
+    def _send(self, message, count: int=1, **kwargs):
+        """
+        Sends the message (or the list of messages, round robin) count times in background.
+        :param message:
+        :param count:
+        :return:
+        """
+        messages = list(message) if isinstance(message, (list, tuple)) else [message]
+        self.send_pool(MessagePool(messages), count)
+
+    def send_pool(self, pool: MessagePool, count: int, schedule: ArrivalSchedule=None):
+        """
+        Sends count messages from the given pool in background.
+        :param pool:
+        :param count:
+        :param schedule: Intended send times (count is taken from the schedule)
+        :return:
+        """
+        self._run(SenderHandler(self.url, pool, count, window=self.window, rate=self.rate,
+                                presettled=self.presettled, stamp=self.stamp, schedule=schedule,
+                                connection_options=self.connection_options))
+
+    def send_transactions(self, message, count: int, tx_size: int, action: str='commit',
+                          endloop_action: str='commit') -> TransactionSenderHandler:
+        """
+        Sends count messages in background, in transactions of tx_size messages
+        (see: TransactionSenderHandler for the commit latency of each transaction).
+        :param message: Message (or list of messages, round robin)
+        :param count:
+        :param tx_size:
+        :param action: commit or rollback
+        :param endloop_action: Action for the last (incomplete) transaction
+        :return:
+        """
+        messages = list(message) if isinstance(message, (list, tuple)) else [message]
+        handler = TransactionSenderHandler(self.url, MessagePool(messages), count, tx_size, action=action,
+                                           endloop_action=endloop_action, connection_options=self.connection_options)
+        self._run(handler)
+        return handler
+
+    def send_profile(self, message, profile: LoadProfile, index: int=0, clients: int=1):
+        """
+        Sends messages in background following the share of the load profile of one of clients senders.
+        :param message: Message (or list of messages, round robin)
+        :param profile:
+        :param index: Index of this sender
+        :param clients: Number of senders sharing the profile
+        :return:
+        """
+        messages = list(message) if isinstance(message, (list, tuple)) else [message]
+        self.send_pool(MessagePool(messages), 0, ArrivalSchedule(profile, index, clients))
+
+    async def send_async(self, message, timeout: float=None):
+        """
+        Sends a message through an asyncio connection (opened on first use).
+        :param message:
+        :param timeout:
+        :return: Remote outcome, or None when presettled
+        """
+        if self._async_sender is None or self._async_sender.connection.closed:
+            connection = await self.open_async(timeout)
+            self._async_sender = await connection.open_sender(Url(self.url).path, presettled=self.presettled,
+                                                              timeout=timeout)
+        return await self._async_sender.send(message, timeout)
+
+    async def close_async(self):
+        """
+        Closes the asyncio connection used by send_async().
+        :return:
+        """
+        if self._async_sender is not None:
+            await self._async_sender.connection.close()
+            self._async_sender = None
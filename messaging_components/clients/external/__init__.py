@@ -1,49 +1,202 @@
-from messaging_abstract.component import *
-from messaging_components.clients.external.client_external import ClientExternal
-from .nodejs import *
-from .python import *
-from .java import *
+"""
+External clients, executed as command line applications.
+Client implementations are registered by name and only imported when first used,
+so importing this package does not load every implementation. Third party
+implementations can be registered through ClientFactory.register() or declared as
+entry points of the 'messaging_components.clients' group, named
+'<implementation>.<client type>' (i.e. 'go.sender = my_package.sender:SenderGo').
+"""
+
+import importlib
+import inspect
 import logging
 
+from messaging_abstract.component import Executor, Node
+from messaging_components.clients.external.client_external import ClientExternal
+
+ENTRY_POINT_GROUP = 'messaging_components.clients'
+
+# Client classes of the built-in implementations, by implementation and client type
+_BUILTIN_CLIENTS = {
+    'nodejs': {
+        'sender': 'messaging_components.clients.external.nodejs.sender:SenderNodeJS',
+        'receiver': 'messaging_components.clients.external.nodejs.receiver:ReceiverNodeJS',
+        'connector': 'messaging_components.clients.external.nodejs.connector:ConnectorNodeJS',
+    },
+    'python': {
+        'sender': 'messaging_components.clients.external.python.sender:SenderPython',
+        'receiver': 'messaging_components.clients.external.python.receiver:ReceiverPython',
+        'connector': 'messaging_components.clients.external.python.connector:ConnectorPython',
+    },
+    'java': {
+        'sender': 'messaging_components.clients.external.java.sender:SenderJava',
+        'receiver': 'messaging_components.clients.external.java.receiver:ReceiverJava',
+        'connector': 'messaging_components.clients.external.java.connector:ConnectorJava',
+    },
+}
+
+# Names exported by the implementation packages, imported on first access (see: __getattr__)
+_LAZY_NAMES = {
+    'ClientNodeJS': 'nodejs', 'SenderNodeJS': 'nodejs', 'ReceiverNodeJS': 'nodejs', 'ConnectorNodeJS': 'nodejs',
+    'ClientPython': 'python', 'SenderPython': 'python', 'ReceiverPython': 'python', 'ConnectorPython': 'python',
+    'ClientJava': 'java', 'SenderJava': 'java', 'ReceiverJava': 'java', 'ConnectorJava': 'java',
+    'JavaWorker': 'java',
+}
+
+
+
+def _component_names() -> list:
+    # Public names of messaging_abstract.component, which used to be exported by this package
+    component = importlib.import_module('messaging_abstract.component')
+    names = getattr(component, '__all__', None)
+    if names is None:
+        names = [name for name, value in vars(component).items()
+                 if not name.startswith('_') and not inspect.ismodule(value)]
+    return list(names)
+
+
+# Names exported by "from messaging_components.clients.external import *" (client classes are imported then)
+__all__ = ['ClientExternal', 'ClientFactory'] + sorted(_LAZY_NAMES) + \
+    [name for name in _component_names() if name not in ('ClientExternal', 'ClientFactory')]
+
+
+def _load_path(path: str) -> type:
+    module, _, name = path.partition(':')
+    return getattr(importlib.import_module(module), name)
+
+
+def _entry_points() -> list:
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        try:
+            from pkg_resources import iter_entry_points
+        except ImportError:
+            return []
+        return [(entry_point.name, entry_point.load) for entry_point in iter_entry_points(ENTRY_POINT_GROUP)]
+
+    found = entry_points()
+    if hasattr(found, 'select'):
+        found = found.select(group=ENTRY_POINT_GROUP)
+    else:
+        found = found.get(ENTRY_POINT_GROUP, [])
+    return [(entry_point.name, entry_point.load) for entry_point in found]
+
 
 class ClientFactory(object):
 
-    # Static element to store all available implementations
-    _implementations: list = []
+    # Client classes (or their 'module:Class' path) by implementation and client type
+    _registry = {implementation: dict(clients) for implementation, clients in _BUILTIN_CLIENTS.items()}
 
-    @staticmethod
-    def create_clients(implementation: str, node: Node, executor: Executor, **kwargs) -> list:
+    # Client classes already imported, by (implementation, client type)
+    _classes = {}  # type: dict
 
-        for client in ClientExternal.__subclasses__():
+    _entry_points_loaded = False
 
-            # Ignore clients with different implementation
-            if client.implementation != implementation:
+    @staticmethod
+    def register(implementation: str, client_type: str, client):
+        """
+        Registers a client class (or its 'module:Class' path, imported on first use).
+        :param implementation: i.e. python, java, nodejs
+        :param client_type: sender, receiver or connector
+        :param client:
+        :return:
+        """
+        ClientFactory._registry.setdefault(implementation, {})[client_type.lower()] = client
+        ClientFactory._classes.pop((implementation, client_type.lower()), None)
+
+    @staticmethod
+    def _load_entry_points():
+        if ClientFactory._entry_points_loaded:
+            return
+        ClientFactory._entry_points_loaded = True
+        for name, load in _entry_points():
+            implementation, _, client_type = name.rpartition('.')
+            if not implementation:
+                logging.getLogger(ClientFactory.__module__).warning(
+                    "Ignoring client entry point '%s' (expected <implementation>.<client type>)" % name)
                 continue
+            # Built-in and explicitly registered clients take precedence
+            ClientFactory._registry.setdefault(implementation, {}).setdefault(client_type.lower(), load)
 
-            # Now loop through concrete client types (sender, receiver, connector)
-            clients = []
-            for client_impl in client.__subclasses__():
-                name = '%s-%s-%s' % (implementation, client_impl.__name__.lower(), node.hostname)
-                clients.append(client_impl(name=name, node=node, executor=executor, **kwargs))
+    @staticmethod
+    def _clients(implementation: str) -> dict:
+        if implementation not in ClientFactory._registry:
+            ClientFactory._load_entry_points()
+        clients = ClientFactory._registry.get(implementation)
+        if clients is None:
+            exception = ValueError('Invalid client implementation: %s' % implementation)
+            logging.getLogger(ClientFactory.__module__).error(exception)
+            raise exception
+        return clients
 
-            return clients
+    @staticmethod
+    def get_client_class(implementation: str, client_type: str) -> type:
+        """
+        Returns the class of the given implementation and type, importing it if needed.
+        :param implementation:
+        :param client_type:
+        :return:
+        """
+        key = (implementation, client_type.lower())
+        client_class = ClientFactory._classes.get(key)
+        if client_class is not None:
+            return client_class
+
+        client = ClientFactory._clients(implementation).get(key[1])
+        if client is None:
+            exception = ValueError('Invalid client: %s %s' % (implementation, client_type))
+            logging.getLogger(ClientFactory.__module__).error(exception)
+            raise exception
 
-        exception = ValueError('Invalid client implementation: %s' % implementation)
-        logging.getLogger(ClientFactory.__module__).error(exception)
-        raise exception
+        if isinstance(client, str):
+            client_class = _load_path(client)
+        elif isinstance(client, type):
+            client_class = client
+        else:
+            # Entry point
+            client_class = client()
+        ClientFactory._classes[key] = client_class
+        return client_class
 
     @staticmethod
-    def get_available_implementations() -> list:
+    def create_clients(implementation: str, node: Node, executor: Executor, **kwargs) -> list:
+        clients = []
+        for client_type in ClientFactory._clients(implementation):
+            clients.append(ClientFactory.create_client(implementation, client_type, node, executor, **kwargs))
+        return clients
 
-        # If implementations list has already been loaded, use it
-        if ClientFactory._implementations:
-            return ClientFactory._implementations
+    @staticmethod
+    def create_client(implementation: str, client_type: str, node: Node, executor: Executor,
+                      name: str=None, **kwargs) -> ClientExternal:
+        """
+        Creates a single client of the given implementation and type.
+        :param implementation: i.e. python, java, nodejs
+        :param client_type: sender, receiver or connector
+        :param node:
+        :param executor:
+        :param name:
+        :param kwargs:
+        :return:
+        """
+        client_class = ClientFactory.get_client_class(implementation, client_type)
+        name = name or '%s-%s-%s' % (implementation, client_class.__name__.lower(), node.hostname)
+        return client_class(name=name, node=node, executor=executor, **kwargs)
 
-        result = []
+    @staticmethod
+    def get_available_implementations() -> list:
+        ClientFactory._load_entry_points()
+        return list(ClientFactory._registry)
 
-        for client in ClientExternal.__subclasses__():
-            result.append(client.implementation)
 
-        ClientFactory._implementations = result
+def __getattr__(name: str):
+    # Client classes used to be imported along with this package
+    package = _LAZY_NAMES.get(name)
+    if package is not None:
+        return getattr(importlib.import_module('%s.%s' % (__name__, package)), name)
 
-        return result
+    # As well as everything in messaging_abstract.component
+    component = importlib.import_module('messaging_abstract.component')
+    if hasattr(component, name) and not name.startswith('_'):
+        return getattr(component, name)
+    raise AttributeError("module '%s' has no attribute '%s'" % (__name__, name))
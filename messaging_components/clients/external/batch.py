@@ -0,0 +1,229 @@
+"""
+Sends a batch of messages through an external sender client with a single execution
+and a single client process.
+
+The CLI clients send the same content (and properties) for every message of a
+run (--count), so a batch of equal messages is sent by one run of the sender client,
+with large or multi-line contents read through --msg-content-from-file.
+
+Batches of distinct messages are written to a messages file (a JSON object per
+message) and sent by batch_sender.py, a python-qpid-proton script copied to the node
+with the batch: one process sends all the messages over one connection, each one
+with its own body and properties. Nodes sending distinct messages need python3 and
+python-qpid-proton (installed with cli-proton-python), whatever the sender client is.
+"""
+
+import json
+import os
+import shlex
+import uuid
+from typing import Iterable, List
+
+from iqa_common.executor import Command, Execution
+from messaging_abstract.message import Message
+
+from messaging_components.node.files import EOF_MARKER
+
+# Message attribute: sender message option
+MESSAGE_OPTIONS = {
+    'id': 'msg_id',
+    'subject': 'msg_subject',
+    'reply_to': 'msg_reply_to',
+    'durable': 'msg_durable',
+    'ttl': 'msg_ttl',
+    'priority': 'msg_priority',
+    'correlation_id': 'msg_correlation_id',
+    'user_id': 'msg_user_id',
+    'group_id': 'msg_group_id',
+    'content_type': 'msg_content_type',
+    'properties': 'msg_property',
+    'application_properties': 'msg_property',
+}
+
+
+def message_options(message: Message) -> dict:
+    """
+    Returns the sender message options (content and properties) that represent the given message.
+    :param message:
+    :return:
+    """
+    options = {}
+    for attribute, option in MESSAGE_OPTIONS.items():
+        value = getattr(message, attribute, None)
+        if value is not None:
+            options[option] = value
+
+    body = message.body
+    if isinstance(body, dict):
+        options['msg_content_map_item'] = body
+    elif isinstance(body, (list, tuple)):
+        options['msg_content_list_item'] = list(body)
+    elif body is not None:
+        options['msg_content'] = body if isinstance(body, str) else str(body)
+    return options
+
+
+# Script sending the messages of batches of distinct messages
+BATCH_SENDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'batch_sender.py')
+
+
+def message_record(message: Message, defaults: dict=None) -> dict:
+    """
+    Returns the message attributes sent by the batch sender script for the given message.
+    :param message:
+    :param defaults: Attributes of messages that do not set them
+    :return:
+    """
+    record = dict(defaults or {})
+    for attribute in MESSAGE_OPTIONS:
+        value = getattr(message, attribute, None)
+        if value is not None:
+            record['properties' if attribute == 'application_properties' else attribute] = value
+    if message.body is not None:
+        record['body'] = message.body
+    return record
+
+
+def _record_defaults(options) -> dict:
+    # Message options set on the sender command apply to every message of the batch
+    defaults = {}
+    for attribute, option in MESSAGE_OPTIONS.items():
+        value = getattr(options, option, None)
+        if value is None or option == 'msg_property':
+            continue
+        if option == 'msg_durable':
+            value = str(value).lower() in ('yes', 'true')
+        defaults[attribute] = value
+    return defaults
+
+
+def _run_key(options: dict) -> str:
+    return repr(sorted(options.items()))
+
+
+def group_runs(messages: Iterable[Message]) -> List[tuple]:
+    """
+    Groups consecutive equal messages.
+    :param messages:
+    :return: List of (message options, count)
+    """
+    runs = []
+    last_key = None
+    for message in messages:
+        options = message_options(message)
+        key = _run_key(options)
+        if runs and key == last_key:
+            runs[-1][1] += 1
+        else:
+            runs.append([options, 1])
+            last_key = key
+    return [tuple(run) for run in runs]
+
+
+def _restore(options, defaults: dict, changed: set):
+    # Set through setattr, so option changes are tracked (see: ClientOptionsBase.revision)
+    for option in changed:
+        setattr(options, option, defaults.get(option))
+    changed.clear()
+
+
+def _heredoc(path: str, content: str) -> str:
+    # Here-documents always end with a newline, which is not part of the content
+    return "cat > %s <<'%s'\n%s\n%s\ntruncate -s -1 %s" % (shlex.quote(path), EOF_MARKER, content, EOF_MARKER,
+                                                            shlex.quote(path))
+
+
+def _script(lines: List[str], files: List[str]) -> str:
+    if files:
+        # Files are removed even if the client fails
+        lines.insert(1, 'trap %s EXIT' % shlex.quote('rm -f ' + ' '.join(shlex.quote(path) for path in files)))
+    return '\n'.join(lines) + '\n'
+
+
+def _client_script(sender, options: dict, count: int, content_dir: str, inline_limit: int) -> str:
+    """
+    Script running the sender client once, sending count messages with the given options.
+    """
+    command = sender.command
+    message_defaults = {option: getattr(command.message, option, None) for option in options}
+    message_defaults['msg_content_from_file'] = getattr(command.message, 'msg_content_from_file', None)
+    count_default = command.control.count
+    files = []
+    lines = ['set -e']
+
+    try:
+        for option, value in options.items():
+            setattr(command.message, option, value)
+        command.control.count = count
+
+        content = options.get('msg_content')
+        if content is not None and (len(content) > inline_limit or '\n' in content):
+            path = '%s/iqa-batch-%s.txt' % (content_dir, uuid.uuid4().hex)
+            files.append(path)
+            lines.append(_heredoc(path, content))
+            command.message.msg_content = None
+            command.message.msg_content_from_file = path
+
+        lines.append(' '.join(shlex.quote(str(arg)) for arg in sender.client_args(command.args)))
+    finally:
+        _restore(command.message, message_defaults, set(message_defaults))
+        command.control.count = count_default
+    return _script(lines, files)
+
+
+def _batch_sender_script(sender, messages: List[Message], content_dir: str, python: str) -> str:
+    """
+    Script sending distinct messages with the batch sender script (see: batch_sender.py).
+    """
+    url = sender.get_url()
+    if not url:
+        raise ValueError('Sender %s has no url to send the batch to' % sender.name)
+
+    defaults = _record_defaults(sender.command.message)
+    records = '\n'.join(json.dumps(message_record(message, defaults), default=str) for message in messages)
+    with open(BATCH_SENDER) as source:
+        sender_source = source.read()
+
+    prefix = '%s/iqa-batch-%s' % (content_dir, uuid.uuid4().hex)
+    script_path, messages_path = prefix + '.py', prefix + '.jsonl'
+    lines = ['set -e', _heredoc(script_path, sender_source), _heredoc(messages_path, records),
+             ' '.join(shlex.quote(arg) for arg in (python, script_path, url, messages_path))]
+    return _script(lines, [script_path, messages_path])
+
+
+def batch_script(sender, messages: Iterable[Message], content_dir: str='/tmp', inline_limit: int=1024,
+                 python: str='python3') -> str:
+    """
+    Builds the shell script that sends all messages from a single client process.
+    Equal messages are sent by the sender client (options already set on its command
+    are kept), distinct messages by the batch sender script.
+    :param sender: External sender client
+    :param messages:
+    :param content_dir: Directory on the client node where contents and messages are written
+    :param inline_limit: Contents longer than this are sent from a file
+    :param python: Python interpreter (with python-qpid-proton) on the client node
+    :return:
+    """
+    messages = list(messages)
+    runs = group_runs(messages)
+    if len(runs) == 1:
+        options, count = runs[0]
+        return _client_script(sender, options, count, content_dir, inline_limit)
+    return _batch_sender_script(sender, messages, content_dir, python)
+
+
+def execute_batch(sender, messages: Iterable[Message], content_dir: str='/tmp', inline_limit: int=1024,
+                  python: str='python3') -> Execution:
+    """
+    Sends all messages with a single execution, running a single client process on the sender node.
+    :param sender: External sender client
+    :param messages:
+    :param content_dir:
+    :param inline_limit:
+    :param python:
+    :return:
+    """
+    command = sender.command
+    script = batch_script(sender, messages, content_dir, inline_limit, python)
+    return sender.execute(Command(['sh', '-c', script], stdout=command.stdout, stderr=command.stderr,
+                                  daemon=command.daemon, timeout=command.timeout, encoding=command.encoding))
@@ -0,0 +1,78 @@
+"""
+Sends a batch of distinct messages over a single connection, from one process.
+
+Standalone script (it only requires python-qpid-proton, installed on the nodes
+running cli-proton-python), copied to the client node by the batch module.
+Every line of the messages file is a JSON object with the attributes of one
+message (body, properties, subject, ...), so each message keeps its own content.
+
+usage: python3 batch_sender.py <url> <messages file>
+"""
+
+import json
+import sys
+
+from proton import Message
+from proton.handlers import MessagingHandler
+from proton.reactor import Container
+
+
+def to_message(record: dict) -> Message:
+    message = Message()
+    for attribute, value in record.items():
+        if attribute == 'user_id' and isinstance(value, str):
+            value = value.encode()
+        setattr(message, attribute, value)
+    return message
+
+
+class BatchSender(MessagingHandler):
+    def __init__(self, url: str, records):
+        super(BatchSender, self).__init__()
+        self.url = url
+        self.records = (line for line in records if line.strip())
+        self.next = next(self.records, None)
+        self.sent = 0
+        self.accepted = 0
+        self.settled = 0
+        self.done = self.next is None
+
+    def on_start(self, event):
+        event.container.create_sender(self.url)
+
+    def on_sendable(self, event):
+        sender = event.sender
+        while not self.done and sender.credit > 0:
+            sender.send(to_message(json.loads(self.next)))
+            self.sent += 1
+            self.next = next(self.records, None)
+            self.done = self.next is None
+        self._close_if_done(event)
+
+    def on_accepted(self, event):
+        self.accepted += 1
+
+    def on_settled(self, event):
+        self.settled += 1
+        self._close_if_done(event)
+
+    def _close_if_done(self, event):
+        if self.done and self.settled == self.sent:
+            event.connection.close()
+
+
+def main(argv) -> int:
+    if len(argv) != 3:
+        sys.stderr.write('usage: %s <url> <messages file>\n' % argv[0])
+        return 2
+
+    with open(argv[2]) as records:
+        handler = BatchSender(argv[1], iter(records))
+        Container(handler).run()
+
+    print('sent: %d, accepted: %d' % (handler.sent, handler.accepted))
+    return 0 if handler.done and handler.accepted == handler.sent else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -1,5 +1,35 @@
+import math
+import time
+
+from iqa_common.executor import Command, Execution
 from messaging_abstract.component import Client, Node, Executor
 from messaging_components.clients.external.command.client_command import ClientCommand
+from messaging_components.clients.external.output import ClientOutputParser
+
+# Sleeps until the start time ($1, seconds since epoch on the node clock), then runs the command
+_SYNCHRONIZED_SCRIPT = """now=$(date +%s.%N)
+case "$now" in *N*) now=$(date +%s);; esac
+sleep "$(awk -v start="$1" -v now="$now" 'BEGIN { delay = start - now; printf "%.3f", (delay > 0 ? delay : 0) }')"
+shift
+exec "$@"
+"""
+
+
+def synchronized_command(command: Command, start_at: float) -> Command:
+    """
+    Returns a command that waits on the node until start_at (epoch seconds) before running.
+    Node clocks must be synchronized (i.e. NTP) for clients on different nodes to start together.
+    :param command:
+    :param start_at:
+    :return:
+    """
+    # The wait must not count against the command timeout
+    timeout = command.timeout
+    if timeout:
+        timeout += int(math.ceil(max(0.0, start_at - time.time())))
+    return Command(['sh', '-c', _SYNCHRONIZED_SCRIPT, 'iqa-start', '%.3f' % start_at] + list(command.args),
+                   stdout=command.stdout, stderr=command.stderr, daemon=command.daemon,
+                   timeout=timeout, encoding=command.encoding)
 
 
 class ClientExternal(Client):
@@ -16,6 +46,8 @@ class ClientExternal(Client):
         self.execution = None  # type: Execution
         self._command = None  # type: ClientCommand
         self._url = None  # type: str
+        # Epoch time the next executions start at (see: synchronized_command())
+        self.start_at = None  # type: float
         self.reset_command()
 
         # initializing client from kwargs
@@ -34,6 +66,28 @@ class ClientExternal(Client):
         self._command = self._new_command(stdout=True, timeout=ClientExternal.TIMEOUT,
                                           daemon=True)  # type: ClientCommand
 
+    def client_args(self, args: list) -> list:
+        """
+        Returns the arguments that run the client with the given command arguments,
+        used by scripts running the client (i.e. batches), which are executed as a whole.
+        :param args:
+        :return:
+        """
+        return args
+
+    def execute(self, command: Command) -> Execution:
+        if self.start_at is not None:
+            command = synchronized_command(command, self.start_at)
+        return super(ClientExternal, self).execute(command)
+
+    def output_parser(self, **kwargs) -> ClientOutputParser:
+        """
+        Returns an incremental parser for the output of the current execution.
+        :param kwargs: See: ClientOutputParser
+        :return:
+        """
+        return ClientOutputParser(self.execution, **kwargs)
+
     def get_url(self):
         return self._url
 
@@ -44,6 +98,7 @@ class ClientExternal(Client):
         :param url:
         :return:
         """
+        self._url = url
         self._set_url(url)
 
     def _new_command(self, stdout: bool=False, stderr: bool=False,
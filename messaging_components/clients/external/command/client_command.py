@@ -33,24 +33,42 @@ class ClientCommand(Command):
         """
         raise NotImplementedError()
 
+    def _option_groups(self) -> list:
+        """
+        All ClientOptionsBase members of the command.
+        :return:
+        """
+        return [opt_value for opt_value in self.__dict__.values() if isinstance(opt_value, ClientOptionsBase)]
+
+    def invalidate(self):
+        """
+        Discards the cached command arguments (i.e. after changing an option value in place).
+        :return:
+        """
+        self.__dict__.pop('_args_cache', None)
+
     def _build_command(self) -> list:
         """
         Builds the external client command based on all
         ClientOptionsBase properties available on implementing class,
         using optconstruct to produce the arguments list.
+        The arguments are cached until an option changes (see: ClientOptionsBase.revision).
         :return:
         """
+        groups = self._option_groups()
+        key = tuple(opt_value.revision for opt_value in groups)
+        cached = self.__dict__.get('_args_cache')
+        if cached is not None and cached[0] == key:
+            return list(cached[1])
+
         all_options = {}
         valid_options = []
 
-        for opt_name, opt_value in self.__dict__.items():
-            # Skip members that are not an instance of ClientOptionsBase
-            if not isinstance(opt_value, ClientOptionsBase):
-                continue
+        for opt_value in groups:
             # List of populated options
             all_options.update(opt_value.to_dict())
             # Append list of valid options for each ClientOptionsBase implementation
-            valid_options += opt_value.valid_options()
+            valid_options += opt_value.cached_valid_options()
 
         # Generates parameters list (only allowed will be added)
         params = [
@@ -60,7 +78,9 @@ class ClientCommand(Command):
         ]
         params_flat = [item for param in params for item in param]
 
-        return self.main_command() + params_flat
+        args = self.main_command() + params_flat
+        self._args_cache = (key, args)
+        return list(args)
 
 
 class ConnectorClientCommand(ClientCommand):
@@ -1,3 +1,5 @@
+import itertools
+
 from optconstruct import OptionAbstract
 from optconstruct.types import Toggle, Prefixed, KWOption, ListOption
 
@@ -9,12 +11,43 @@ OptionAbstract (optconstruct) that is supported.
 """
 
 
+# Revisions are unique across all options instances
+_revisions = itertools.count(1)
+
+
 class ClientOptionsBase(object):
     """
     Base abstraction for options (arguments) that can be used
     in an external client command.
+    Every time an option is set, the instance gets a new revision,
+    so commands can tell when their arguments must be generated again.
     """
 
+    # Valid options and option mapper of each concrete class
+    _valid_options_cache = {}
+    _option_mapper_cache = {}
+
+    def __setattr__(self, key, value):
+        super(ClientOptionsBase, self).__setattr__(key, value)
+        if not key.startswith('_'):
+            super(ClientOptionsBase, self).__setattr__('_revision', next(_revisions))
+
+    @property
+    def revision(self) -> int:
+        """
+        Revision of the option values (changes whenever an option is set).
+        Values that are changed in place (i.e. a dict) are not tracked, see: touch().
+        :return:
+        """
+        return self.__dict__.get('_revision', 0)
+
+    def touch(self):
+        """
+        Marks options as changed.
+        :return:
+        """
+        super(ClientOptionsBase, self).__setattr__('_revision', next(_revisions))
+
     def valid_options(self) -> list:
         """
         Delegated method that must return a list of all valid
@@ -24,6 +57,16 @@ class ClientOptionsBase(object):
         """
         raise NotImplementedError()
 
+    def cached_valid_options(self) -> list:
+        """
+        Valid options, computed once per concrete class.
+        :return:
+        """
+        cls = type(self)
+        if cls not in ClientOptionsBase._valid_options_cache:
+            ClientOptionsBase._valid_options_cache[cls] = tuple(self.valid_options())
+        return ClientOptionsBase._valid_options_cache[cls]
+
     def option_mapper(self) -> dict:
         """
         Allows a specific argument to have a different name
@@ -39,13 +82,19 @@ class ClientOptionsBase(object):
         becomes 'broker-url'.
         It also allows internal property to be renamed to something else,
         like: { 'property_xyz': 'property_abc' } (see: option_mapper()).
+        Private members (starting with underscore) are not options.
         :return:
         """
+        cls = type(self)
+        mapper = ClientOptionsBase._option_mapper_cache.get(cls)
+        if mapper is None:
+            mapper = ClientOptionsBase._option_mapper_cache[cls] = self.option_mapper()
+
         nd = {}
         for (k, v) in self.__dict__.items():
-            rk = k
-            if k in self.option_mapper():
-                rk = self.option_mapper()[k]
+            if k.startswith('_'):
+                continue
+            rk = mapper.get(k, k)
             nd['%s' % rk.replace('_', '-')] = v
         return nd
 
@@ -0,0 +1,171 @@
+"""
+Runs a fleet of external clients (i.e. hundreds of senders or receivers),
+launching them with a concurrency limit and staggered starts, waiting for
+their executions concurrently and aggregating completion, throughput and
+failure statistics.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from messaging_abstract.component import Connector, Executor, Node, Receiver, Sender
+from messaging_abstract.message import Message
+
+from messaging_components.clients.external import ClientFactory
+from messaging_components.clients.external.client_external import ClientExternal
+
+
+class FleetResult:
+    """
+    Outcome of a single client of the fleet.
+    """
+    __slots__ = ('client', 'started', 'finished', 'success', 'error')
+
+    def __init__(self, client: ClientExternal):
+        self.client = client
+        self.started = None  # type: float
+        self.finished = None  # type: float
+        self.success = False
+        self.error = None  # type: Exception
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class FleetStats:
+    """
+    Aggregate statistics of a fleet run.
+    """
+    def __init__(self, results: List[FleetResult], duration: float, messages_per_client: int=None):
+        self.results = results
+        self.duration = duration
+        self.total = len(results)
+        self.completed = sum(1 for result in results if result.success)
+        self.failed = self.total - self.completed
+        self.errors = [result for result in results if result.error is not None]
+        self.messages = self.completed * messages_per_client if messages_per_client else None
+
+        durations = sorted(result.duration for result in results if result.duration is not None)
+        self.min_duration = durations[0] if durations else None
+        self.max_duration = durations[-1] if durations else None
+        self.mean_duration = sum(durations) / len(durations) if durations else None
+
+    @property
+    def clients_per_second(self) -> float:
+        return self.completed / self.duration if self.duration else 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        if self.messages is None or not self.duration:
+            return None
+        return self.messages / self.duration
+
+    @property
+    def failed_clients(self) -> List[ClientExternal]:
+        return [result.client for result in self.results if not result.success]
+
+    def __repr__(self):
+        return "FleetStats(total=%d, completed=%d, failed=%d, duration=%.2fs, clients/s=%.2f)" % (
+            self.total, self.completed, self.failed, self.duration, self.clients_per_second)
+
+
+class ClientFleet:
+    """
+    Group of external clients that are run together.
+    At most `concurrency` clients are running at any time, and client
+    starts are spaced by `stagger` seconds to avoid connection bursts.
+    """
+    def __init__(self, clients: List[ClientExternal], concurrency: int=50, stagger: float=0.0):
+        self.clients = clients
+        self.concurrency = max(1, concurrency)
+        self.stagger = stagger
+        self._logger = logging.getLogger(self.__module__)
+
+    @staticmethod
+    def create(implementation: str, client_type: str, count: int, nodes: List[Node], executor: Executor,
+               concurrency: int=50, stagger: float=0.0, **kwargs) -> 'ClientFleet':
+        """
+        Creates a fleet of clients of the same implementation and type,
+        distributed across the given nodes (round robin).
+        :param implementation: i.e. python, java, nodejs
+        :param client_type: sender, receiver or connector
+        :param count:
+        :param nodes:
+        :param executor:
+        :param concurrency:
+        :param stagger:
+        :param kwargs: Client arguments (i.e. url)
+        :return:
+        """
+        clients = []
+        for index in range(count):
+            node = nodes[index % len(nodes)]
+            name = '%s-%s-%s-%d' % (implementation, client_type, node.hostname, index)
+            clients.append(ClientFactory.create_client(implementation, client_type, node, executor,
+                                                       name=name, **kwargs))
+        return ClientFleet(clients, concurrency=concurrency, stagger=stagger)
+
+    @staticmethod
+    def default_action(message: Message=None) -> Callable[[ClientExternal], None]:
+        """
+        Returns the action to run for each client, based on its type.
+        :param message: Message sent by senders
+        :return:
+        """
+        def action(client: ClientExternal):
+            if isinstance(client, Sender):
+                client.send(message)
+            elif isinstance(client, Receiver):
+                client.receive()
+            elif isinstance(client, Connector):
+                client.connect()
+            else:
+                raise ValueError('Unsupported client type: %s' % type(client).__name__)
+        return action
+
+    def run(self, action: Callable[[ClientExternal], None]=None, message: Message=None,
+            messages_per_client: int=None) -> FleetStats:
+        """
+        Runs all clients and waits for them to complete.
+        :param action: Function that starts a client (defaults to send, receive or connect)
+        :param message: Message sent by senders, when using the default action
+        :param messages_per_client: Used to compute message throughput
+        :return:
+        """
+        action = action or self.default_action(message)
+        results = [FleetResult(client) for client in self.clients]
+        start = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(self._run_client, action, result, start + index * self.stagger)
+                       for index, result in enumerate(results)]
+            for future in futures:
+                future.result()
+
+        stats = FleetStats(results, time.time() - start, messages_per_client)
+        self._logger.info("Fleet completed: %s" % stats)
+        return stats
+
+    def _run_client(self, action: Callable[[ClientExternal], None], result: FleetResult, start_at: float):
+        delay = start_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+        result.started = time.time()
+        try:
+            action(result.client)
+            execution = result.client.execution
+            if execution is not None:
+                execution.wait()
+                result.success = execution.completed_successfully()
+            else:
+                result.success = True
+        except Exception as ex:
+            self._logger.warning("Client %s failed: %s" % (result.client.name, ex))
+            result.error = ex
+        result.finished = time.time()
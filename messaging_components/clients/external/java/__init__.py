@@ -2,3 +2,4 @@ from .client import *
 from .sender import *
 from .receiver import *
 from .connector import *
+from .worker import *
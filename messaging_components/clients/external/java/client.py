@@ -1,7 +1,8 @@
 from autologging import logged, traced
-from iqa_common.executor import Executor
+from iqa_common.executor import Command, Execution, Executor
 from messaging_abstract.component.client import Node
 from messaging_components.clients.external.client_external import ClientExternal
+from messaging_components.clients.external.java.worker import JavaWorker
 
 from messaging_components import protocols
 
@@ -16,4 +17,24 @@ class ClientJava(ClientExternal):
     version = '1.0.1'
 
     def __init__(self, name: str, node: Node, executor: Executor, **kwargs):
+        self.worker = kwargs.get('worker')  # type: JavaWorker
         super(ClientJava, self).__init__(name, node, executor, **kwargs)
+
+    def use_worker(self, worker: JavaWorker=None):
+        """
+        Runs the client commands on a warm worker JVM (defaults to the worker of the node).
+        The worker must be started (see: JavaWorker.start()).
+        :param worker:
+        :return:
+        """
+        self.worker = worker or JavaWorker.for_node(self.node, self.executor)
+
+    def client_args(self, args: list) -> list:
+        if self.worker is not None:
+            return self.worker.wrap_args(args)
+        return args
+
+    def execute(self, command: Command) -> Execution:
+        if self.worker is not None:
+            command = self.worker.wrap(command)
+        return super(ClientJava, self).execute(command)
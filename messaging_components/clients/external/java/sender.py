@@ -2,6 +2,7 @@ from autologging import logged, traced
 from iqa_common.executor import Executor
 from messaging_abstract.component.client import Sender, Message, Node
 
+from messaging_components.clients.external.batch import execute_batch
 from messaging_components.clients.external.java.client import ClientJava
 from messaging_components.clients.external.java.command.java_commands import JavaSenderClientCommand
 
@@ -52,5 +53,14 @@ class SenderJava(Sender, ClientJava):
         self._command.message.msg_content = message.body
         self.execution = self.execute(self.command)
 
+    def send_batch(self, messages: list, **kwargs):
+        """
+        Sends all messages with a single execution and a single client process.
+        :param messages:
+        :param kwargs: See: execute_batch()
+        :return:
+        """
+        self.execution = execute_batch(self, messages, **kwargs)
+
     def __init__(self, name: str, node: Node, executor: Executor, **kwargs):
         super(SenderJava, self).__init__(name, node, executor, **kwargs)
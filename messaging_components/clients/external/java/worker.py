@@ -0,0 +1,165 @@
+"""
+Warm JVM runner for the Java external clients. Starting a JVM for every client
+execution adds seconds of startup and JIT warm-up, which distorts short runs.
+A long-lived worker JVM (one per node) runs the cli-java clients in-process,
+so executions only pay for a client round trip.
+
+The worker is a Nailgun server (https://github.com/facebook/nailgun) started with
+the cli-java jar in its classpath. Client commands are run through the Nailgun
+client (ng), which forwards the arguments, streams the client output and exits
+with the exit code of the client. The nailgun-server jar and the ng client must
+be installed on the node.
+"""
+
+import logging
+import time
+from typing import List
+
+from iqa_common.executor import Command, Execution, Executor
+from messaging_abstract.component.client import Node
+
+# Commands the worker can run in-process, with the client type passed to the cli-java main class
+WORKER_CLIENTS = {
+    'cli-qpid-sender': 'sender',
+    'cli-qpid-receiver': 'receiver',
+    'cli-qpid-connector': 'connector',
+}
+
+
+class JavaWorker:
+    """
+    Worker JVM running on a node, started and stopped through the node executor.
+    """
+    DEFAULT_PORT = 2113
+    SERVER_CLASS = 'com.facebook.nailgun.NGServer'
+    MAIN_CLASS = 'com.redhat.mqe.jms.Main'
+
+    # Workers by node name (see: for_node())
+    _workers = {}  # type: dict
+
+    def __init__(self, node: Node, executor: Executor, classpath: List[str], port: int=DEFAULT_PORT,
+                 host: str='127.0.0.1', main_class: str=MAIN_CLASS, server_class: str=SERVER_CLASS,
+                 java: List[str]=None, ng: List[str]=None):
+        """
+        :param node:
+        :param executor:
+        :param classpath: Jars of the worker JVM on the node (the nailgun-server and cli-java jars)
+        :param port: Local port the worker listens on
+        :param host: Address the worker listens on, as seen from the node
+        :param main_class: Main class of the cli-java jar (its Main-Class manifest attribute)
+        :param server_class: Nailgun server class (com.martiansoftware.nailgun.NGServer before Nailgun 1.0)
+        :param java: Command starting the JVM, i.e. ['java', '-Xmx1g']. On Java 18 and later,
+        -Djava.security.manager=allow is needed for the exit codes of clients calling System.exit
+        to be returned instead of stopping the worker.
+        :param ng: Nailgun client command
+        """
+        self.node = node
+        self.executor = executor
+        self.classpath = classpath
+        self.port = port
+        self.host = host
+        self.main_class = main_class
+        self.server_class = server_class
+        self.java = java or ['java']
+        self.ng = ng or ['ng']
+        self.execution = None  # type: Execution
+        self._logger = logging.getLogger(self.__module__)
+
+    @staticmethod
+    def for_node(node: Node, executor: Executor=None, **kwargs) -> 'JavaWorker':
+        """
+        Returns the worker of the given node, creating it if needed.
+        :param node:
+        :param executor: Defaults to the node executor
+        :param kwargs: See: JavaWorker() (classpath is required to create the worker)
+        :return:
+        """
+        worker = JavaWorker._workers.get(node.name)
+        if worker is None:
+            if 'classpath' not in kwargs:
+                raise ValueError('No Java worker defined for %s (classpath is required)' % node.name)
+            worker = JavaWorker(node, executor or node.executor, **kwargs)
+            JavaWorker._workers[node.name] = worker
+        return worker
+
+    @property
+    def running(self) -> bool:
+        return self.execution is not None and self.execution.is_running()
+
+    def _ng(self, *args: str) -> List[str]:
+        return self.ng + ['--nailgun-server', self.host, '--nailgun-port', str(self.port)] + list(args)
+
+    def start(self, timeout: int=30) -> bool:
+        """
+        Starts the worker JVM (if not running) and waits until it accepts requests.
+        :param timeout: Seconds
+        :return: True if the worker is ready
+        """
+        if not self.running:
+            self._logger.debug("Starting Java worker on %s:%s" % (self.node.name, self.port))
+            self.execution = self.executor.execute(
+                Command(self.java + ['-cp', ':'.join(self.classpath), self.server_class,
+                                     '%s:%s' % (self.host, self.port)], stdout=True, stderr=True, daemon=True))
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.ready():
+                return True
+            if not self.running:
+                self._logger.error("Java worker on %s exited" % self.node.name)
+                return False
+            time.sleep(0.5)
+        return False
+
+    def ready(self) -> bool:
+        """
+        :return: True if the worker accepts requests
+        """
+        execution = self.executor.execute(Command(self._ng('ng-version'), timeout=5))
+        execution.wait()
+        return execution.completed_successfully()
+
+    def wrap_args(self, args: List) -> List:
+        """
+        Returns the arguments that run the given client invocation on the worker.
+        Scripts running clients (i.e. batches) build their client invocations with it.
+        :param args: Client command arguments (cli-qpid-sender ...)
+        :return: Unchanged if the worker cannot run it
+        """
+        if not args or args[0] not in WORKER_CLIENTS:
+            return args
+        return self._ng(self.main_class, WORKER_CLIENTS[args[0]], *[str(arg) for arg in args[1:]])
+
+    def wrap(self, command: Command) -> Command:
+        """
+        Returns a command that runs the given client command on the worker.
+        Commands that the worker cannot run (i.e. batch scripts) are returned unchanged,
+        their client invocations are wrapped when the script is built (see: wrap_args()).
+        :param command:
+        :return:
+        """
+        args = command.args
+        wrapped = self.wrap_args(args)
+        if wrapped is args:
+            return command
+
+        return Command(wrapped, stdout=command.stdout, stderr=command.stderr, daemon=command.daemon,
+                       timeout=command.timeout, encoding=command.encoding)
+
+    def stop(self, timeout: int=10):
+        """
+        Asks the worker to exit and waits for it.
+        :param timeout:
+        :return:
+        """
+        if not self.running:
+            return
+        shutdown = self.executor.execute(Command(self._ng('ng-stop'), timeout=timeout))
+        shutdown.wait()
+        if not shutdown.completed_successfully():
+            self._logger.warning("Unable to stop Java worker on %s" % self.node.name)
+            return
+        self.execution.wait()
+        self.execution = None
+        if JavaWorker._workers.get(self.node.name) is self:
+            del JavaWorker._workers[self.node.name]
@@ -7,6 +7,7 @@ from iqa_common.executor import Executor
 from messaging_abstract.component.client import Sender, Node
 from messaging_abstract.message import Message
 
+from messaging_components.clients.external.batch import execute_batch
 from messaging_components.clients.external.nodejs.client import ClientNodeJS
 from messaging_components.clients.external.nodejs.command.nodejs_commands import NodeJSSenderClientCommand
 
@@ -49,5 +50,14 @@ class SenderNodeJS(Sender, ClientNodeJS):
         self._command.message.msg_content = message.body
         self.execution = self.execute(self.command)
 
+    def send_batch(self, messages: list, **kwargs):
+        """
+        Sends all messages with a single execution and a single client process.
+        :param messages:
+        :param kwargs: See: execute_batch()
+        :return:
+        """
+        self.execution = execute_batch(self, messages, **kwargs)
+
     def __init__(self, name: str, node: Node, executor: Executor, **kwargs):
         super(SenderNodeJS, self).__init__(name, node, executor, **kwargs)
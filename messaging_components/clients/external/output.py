@@ -0,0 +1,183 @@
+"""
+Incremental parser for the output of external clients executed with stdout=True.
+Lines are read as they are written (from the execution stdout file, when available)
+and messages logged by the clients (--log-msgs dict or json) are turned into dict
+records, updating counters on the fly. Records can be spilled to a JSON lines file,
+so only a bounded number of them is kept in memory.
+"""
+
+import ast
+import codecs
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Callable, Iterator, List
+
+from iqa_common.executor import Execution
+
+
+def parse_record(line: str) -> dict:
+    """
+    Parses a message logged by an external client: JSON (NodeJS --log-msgs json)
+    or a python dict literal (--log-msgs dict of the Python, Java and NodeJS clients).
+    :param line:
+    :return: The record or None if the line is not a logged message
+    """
+    line = line.strip()
+    if not line.startswith('{') or not line.endswith('}'):
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        try:
+            record = ast.literal_eval(line)
+        except (ValueError, SyntaxError):
+            return None
+    return record if isinstance(record, dict) else None
+
+
+class ClientOutputParser:
+    """
+    Parses the output of an external client execution as it is produced.
+    """
+    # Bytes read from the stdout file at once
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, execution: Execution=None, keep: int=1000, spill_path: str=None,
+                 on_record: Callable[[dict], None]=None):
+        """
+        :param execution: Execution of the external client
+        :param keep: Number of most recent records kept in memory (None keeps all)
+        :param spill_path: File where all records are written (JSON lines)
+        :param on_record: Called for every parsed record
+        """
+        self.execution = execution
+        self.records = deque(maxlen=keep)
+        self.on_record = on_record
+        self.lines = 0
+        self.messages = 0
+        self.unparsed = 0
+        self._offset = 0
+        self._partial = ''
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._spill = open(spill_path, 'a') if spill_path else None
+        self._logger = logging.getLogger(self.__module__)
+
+    def feed(self, text: str) -> List[dict]:
+        """
+        Parses output text. Incomplete lines are kept until the rest arrives.
+        :param text:
+        :return: New records
+        """
+        if not text:
+            return []
+
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+
+        records = []
+        for line in lines:
+            self._line(line, records)
+        return records
+
+    def _line(self, line: str, records: list):
+        if not line.strip():
+            return
+        self.lines += 1
+        record = parse_record(line)
+        if record is None:
+            self.unparsed += 1
+            return
+
+        self.messages += 1
+        records.append(record)
+        self.records.append(record)
+        if self._spill is not None:
+            self._spill.write(json.dumps(record, default=str))
+            self._spill.write('\n')
+        if self.on_record is not None:
+            self.on_record(record)
+
+    def _read(self, final: bool=False) -> str:
+        """
+        Reads the output written since the last read.
+        Executions without a stdout file can only provide their whole output (read_stdout()),
+        so reading it on every poll would be quadratic for long runs: their output is only
+        read once the execution completed (or on finish()).
+        :param final: Read the output even if the execution is still running
+        :return:
+        """
+        stdout = getattr(self.execution, 'fh_stdout', None)
+        if stdout is not None and hasattr(stdout, 'fileno'):
+            chunks = []
+            fd = stdout.fileno()
+            while True:
+                data = os.pread(fd, self.CHUNK_SIZE, self._offset)
+                if not data:
+                    break
+                self._offset += len(data)
+                chunks.append(self._decoder.decode(data))
+            return ''.join(chunks)
+
+        if not final and self.execution.is_running():
+            return ''
+        output = self.execution.read_stdout() or ''
+        text = output[self._offset:]
+        self._offset = len(output)
+        return text
+
+    def poll(self) -> List[dict]:
+        """
+        Parses the output written since the last poll (see: _read() for executions without a stdout file).
+        :return: New records
+        """
+        return self.feed(self._read())
+
+    def follow(self, interval: float=0.5, timeout: float=None) -> Iterator[dict]:
+        """
+        Yields records as they are produced, until the execution completes (or timeout expires).
+        :param interval: Seconds between polls
+        :param timeout:
+        :return:
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            running = self.execution.is_running()
+            for record in self.poll():
+                yield record
+            if not running:
+                break
+            if deadline is not None and time.time() >= deadline:
+                self._logger.debug("Stopped following client output after %ss" % timeout)
+                return
+            time.sleep(interval)
+
+        for record in self.finish():
+            yield record
+
+    def finish(self) -> List[dict]:
+        """
+        Parses the remaining output, including a last line without a line break.
+        :return: New records
+        """
+        records = self.feed(self._read(final=True))
+        if self._partial:
+            self._line(self._partial, records)
+            self._partial = ''
+        if self._spill is not None:
+            self._spill.flush()
+        return records
+
+    def close(self):
+        """
+        Closes the spill file.
+        :return:
+        """
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def __repr__(self):
+        return "ClientOutputParser(lines=%d, messages=%d, unparsed=%d)" % (self.lines, self.messages, self.unparsed)
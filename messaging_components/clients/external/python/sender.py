@@ -6,6 +6,7 @@ from autologging import logged, traced
 from messaging_abstract.component.client import Sender, Node, Executor
 from messaging_abstract.message import Message
 
+from messaging_components.clients.external.batch import execute_batch
 from messaging_components.clients.external.command.client_command import ClientCommand
 from messaging_components.clients.external.python.client import ClientPython
 from messaging_components.clients.external.python.command.python_commands import PythonSenderClientCommand
@@ -39,5 +40,14 @@ class SenderPython(Sender, ClientPython):
         self._command.message.msg_content = message.body
         self.execution = self.execute(self.command)
 
+    def send_batch(self, messages: list, **kwargs):
+        """
+        Sends all messages with a single execution and a single client process.
+        :param messages:
+        :param kwargs: See: execute_batch()
+        :return:
+        """
+        self.execution = execute_batch(self, messages, **kwargs)
+
     def __init__(self, name: str, node: Node, executor: Executor, **kwargs):
         super(SenderPython, self).__init__(name, node, executor, **kwargs)
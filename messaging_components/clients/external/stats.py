@@ -0,0 +1,295 @@
+"""
+Parses the statistics printed by external clients executed with --log-stats
+(cli-proton-python, cli-java and cli-rhea) into a common schema: a timestamp and
+the number of messages processed so far. Statistics of a fleet of clients are
+aggregated into throughput time series, kept column-wise (one array of samples
+per client), so every client is resampled in a single pass over its samples.
+"""
+
+import math
+import time
+from array import array
+from typing import Callable, Dict, List
+
+from messaging_components.clients.external.output import parse_record
+
+# Field names (last component of the flattened key) of each implementation,
+# in order of preference
+TIMESTAMP_FIELDS = ('timestamp', 'time', 'ts')
+MESSAGE_FIELDS = ('sent', 'received', 'delivered', 'msg_count', 'message_count', 'messages', 'count')
+
+# Keys of logged messages (--log-msgs), which are not statistics
+_MESSAGE_RECORD_KEYS = ('body', 'content', 'properties')
+
+# Timestamps bigger than this are in milliseconds (Java and NodeJS clients)
+_MILLISECONDS = 1e11
+
+
+def _flatten(record: dict, prefix: str='', flat: dict=None) -> dict:
+    flat = {} if flat is None else flat
+    for key, value in record.items():
+        name = '%s%s' % (prefix, str(key).lower().replace('-', '_'))
+        if isinstance(value, dict):
+            _flatten(value, name + '.', flat)
+        else:
+            flat[name] = value
+    return flat
+
+
+def _number(value) -> float:
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _find(flat: dict, fields: tuple) -> float:
+    for field in fields:
+        for key, value in flat.items():
+            if key == field or key.endswith('.' + field):
+                number = _number(value)
+                if number is not None:
+                    return number
+    return None
+
+
+def normalize_stats(record: dict, received: float=None) -> tuple:
+    """
+    Normalizes a statistics record printed by an external client.
+    :param record: Parsed record (see: parse_record())
+    :param received: Time the record was read, used when it has no timestamp (defaults to now)
+    :return: Tuple (timestamp in seconds, messages) or None if record has no statistics
+    """
+    if not isinstance(record, dict) or any(key in record for key in _MESSAGE_RECORD_KEYS):
+        return None
+
+    flat = _flatten(record)
+    messages = _find(flat, MESSAGE_FIELDS)
+    if messages is None:
+        return None
+
+    timestamp = _find(flat, TIMESTAMP_FIELDS)
+    if timestamp is None:
+        timestamp = received if received is not None else time.time()
+    elif timestamp > _MILLISECONDS:
+        timestamp /= 1000.0
+    return timestamp, messages
+
+
+class ClientStats:
+    """
+    Statistics samples of a single client, as columns of timestamps and cumulative message counts.
+    """
+    __slots__ = ('name', 'cumulative', 'timestamps', 'messages')
+
+    def __init__(self, name: str, cumulative: bool=True):
+        """
+        :param name:
+        :param cumulative: Whether clients print totals (True) or counts since the previous sample
+        """
+        self.name = name
+        self.cumulative = cumulative
+        self.timestamps = array('d')
+        self.messages = array('d')
+
+    def add(self, timestamp: float, messages: float):
+        """
+        Adds a sample. Samples older than the last one are ignored.
+        :param timestamp:
+        :param messages:
+        :return:
+        """
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            return
+        if not self.cumulative and self.messages:
+            messages += self.messages[-1]
+        self.timestamps.append(timestamp)
+        self.messages.append(messages)
+
+    def on_record(self, record: dict):
+        """
+        Adds the sample of a statistics record (i.e. ClientOutputParser on_record).
+        Other records are ignored.
+        :param record:
+        :return:
+        """
+        sample = normalize_stats(record)
+        if sample is not None:
+            self.add(*sample)
+
+    @property
+    def total(self) -> float:
+        return self.messages[-1] if self.messages else 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.timestamps[-1] - self.timestamps[0] if len(self.timestamps) > 1 else 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        if not self.duration:
+            return 0.0
+        return (self.messages[-1] - self.messages[0]) / self.duration
+
+    def cumulative_at(self, times: array) -> array:
+        """
+        Interpolates the message count at the given (sorted) times, in a single pass.
+        Times before the first sample and after the last one get the first and last count.
+        :param times:
+        :return:
+        """
+        result = array('d', bytes(8 * len(times)))
+        timestamps, messages = self.timestamps, self.messages
+        if not timestamps:
+            return result
+
+        last = len(timestamps) - 1
+        position = 0
+        for index, moment in enumerate(times):
+            while position < last and timestamps[position + 1] <= moment:
+                position += 1
+            if moment <= timestamps[0]:
+                result[index] = messages[0]
+            elif position == last:
+                result[index] = messages[last]
+            else:
+                start, end = timestamps[position], timestamps[position + 1]
+                fraction = (moment - start) / (end - start) if end > start else 1.0
+                result[index] = messages[position] + fraction * (messages[position + 1] - messages[position])
+        return result
+
+    def __repr__(self):
+        return "ClientStats(%s, samples=%d, msgs/s=%.2f)" % (self.name, len(self.timestamps), self.messages_per_second)
+
+
+class StatsSeries:
+    """
+    Throughput (messages per second) of each client and of the whole fleet,
+    in intervals starting at start.
+    """
+    def __init__(self, start: float, interval: float, rates: Dict[str, array]):
+        self.start = start
+        self.interval = interval
+        self.rates = rates
+        columns = list(rates.values())
+        self.combined = array('d', (sum(column) for column in zip(*columns))) if columns else array('d')
+
+    @property
+    def times(self) -> List[float]:
+        return [self.start + index * self.interval for index in range(len(self.combined))]
+
+    @property
+    def peak(self) -> float:
+        return max(self.combined) if self.combined else 0.0
+
+
+def _median(values: List[float]) -> float:
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2.0
+
+
+def find_outliers(values: Dict[str, float], threshold: float=3.5) -> List[str]:
+    """
+    Returns the keys whose value is an outlier, by the modified z-score
+    (distance to the median in median absolute deviations).
+    :param values:
+    :param threshold:
+    :return:
+    """
+    if len(values) < 3:
+        return []
+    median = _median(list(values.values()))
+    deviations = [abs(value - median) for value in values.values()]
+    scale = _median(deviations) / 0.6745
+    if not scale:
+        # More than half of the values are equal, use the mean absolute deviation
+        scale = sum(deviations) / len(deviations) * math.sqrt(math.pi / 2)
+    if not scale:
+        return []
+    return [name for name, value in values.items() if abs(value - median) / scale > threshold]
+
+
+class StatsAggregator:
+    """
+    Aggregates statistics of a fleet of external clients.
+    Feed it with the output of each client, or pass collector(name) as
+    the on_record callback of the client output parser.
+    """
+    def __init__(self, cumulative: bool=True):
+        self.cumulative = cumulative
+        self.clients = {}  # type: Dict[str, ClientStats]
+
+    def client(self, name: str) -> ClientStats:
+        stats = self.clients.get(name)
+        if stats is None:
+            stats = self.clients[name] = ClientStats(name, self.cumulative)
+        return stats
+
+    def collector(self, name: str) -> Callable[[dict], None]:
+        """
+        Returns a record callback that collects the statistics of the given client.
+        :param name:
+        :return:
+        """
+        return self.client(name).on_record
+
+    def feed(self, name: str, output: str):
+        """
+        Parses the (whole) output of a client.
+        :param name:
+        :param output:
+        :return:
+        """
+        stats = self.client(name)
+        for line in output.splitlines():
+            record = parse_record(line)
+            if record is not None:
+                stats.on_record(record)
+
+    def _span(self) -> tuple:
+        timestamps = [stats.timestamps for stats in self.clients.values() if stats.timestamps]
+        if not timestamps:
+            return None, None
+        return min(column[0] for column in timestamps), max(column[-1] for column in timestamps)
+
+    def series(self, interval: float=1.0) -> StatsSeries:
+        """
+        Resamples the message counts of every client at a fixed interval.
+        :param interval: Seconds
+        :return:
+        """
+        start, end = self._span()
+        if start is None:
+            return StatsSeries(0.0, interval, {})
+
+        intervals = max(1, int(math.ceil((end - start) / interval)))
+        edges = array('d', (start + index * interval for index in range(intervals + 1)))
+        rates = {}
+        for name, stats in self.clients.items():
+            counts = stats.cumulative_at(edges)
+            rates[name] = array('d', ((counts[index + 1] - counts[index]) / interval for index in range(intervals)))
+        return StatsSeries(start, interval, rates)
+
+    def report(self, interval: float=1.0, threshold: float=3.5) -> dict:
+        """
+        Summary of a run: combined throughput and per client throughput and outliers.
+        :param interval: Seconds, to compute the peak throughput
+        :param threshold: Modified z-score above which a client is an outlier
+        :return:
+        """
+        start, end = self._span()
+        duration = end - start if start is not None else 0.0
+        messages = sum(stats.total for stats in self.clients.values())
+        client_rates = {name: stats.messages_per_second for name, stats in self.clients.items()}
+        return {
+            'clients': len(self.clients),
+            'messages': messages,
+            'duration': duration,
+            'messages_per_second': messages / duration if duration else 0.0,
+            'peak_messages_per_second': self.series(interval).peak,
+            'client_messages_per_second': client_rates,
+            'outliers': find_outliers(client_rates, threshold),
+        }
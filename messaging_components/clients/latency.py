@@ -0,0 +1,218 @@
+"""
+End-to-end latency measurement. Senders stamp messages with their send time and a
+sequence number (application properties), and receivers record the latency of each
+message into a LatencyHistogram: an HDR-style histogram with logarithmic buckets,
+each split into linear sub-buckets, so values are recorded with a fixed relative
+precision in constant time and histograms from many clients can be merged.
+Send and receive times come from the clocks of the client hosts, which must be
+synchronized when clients run on different nodes.
+"""
+
+import math
+import time
+from typing import Iterable
+
+# Application properties used to stamp messages
+SEND_TIME_PROPERTY = 'iqa-send-time'
+SEQUENCE_PROPERTY = 'iqa-sequence'
+
+
+def stamp_properties(sequence: int, properties: dict=None, send_time: float=None) -> dict:
+    """
+    Returns application properties with the send time (seconds) and sequence number.
+    :param sequence:
+    :param properties: Properties to extend
+    :param send_time: Defaults to now
+    :return:
+    """
+    stamped = dict(properties) if properties else {}
+    stamped[SEND_TIME_PROPERTY] = send_time if send_time is not None else time.time()
+    stamped[SEQUENCE_PROPERTY] = sequence
+    return stamped
+
+
+def message_latency(properties: dict, received: float=None) -> float:
+    """
+    Returns the latency (seconds) of a message stamped by stamp_properties().
+    :param properties: Application properties of the received message
+    :param received: Receive time (defaults to now)
+    :return: Latency or None if message is not stamped
+    """
+    if not properties or SEND_TIME_PROPERTY not in properties:
+        return None
+    return (received if received is not None else time.time()) - float(properties[SEND_TIME_PROPERTY])
+
+
+def latency_recorder(histogram: 'LatencyHistogram'):
+    """
+    Returns a function that records the latency of stamped message records
+    (i.e. ClientOutputParser on_record), taking the time they are parsed as receive time.
+    :param histogram:
+    :return:
+    """
+    def record(message_record: dict):
+        latency = message_latency(message_record.get('properties'))
+        if latency is not None:
+            histogram.record(latency)
+    return record
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies, stored as integer multiples of unit (microseconds by default).
+    Values are kept with the given number of significant decimal digits.
+    """
+    def __init__(self, significant_digits: int=2, unit: float=1e-6):
+        self.significant_digits = significant_digits
+        self.unit = unit
+        self._sub_bucket_bits = int(math.ceil(math.log2(2 * 10 ** significant_digits)))
+        self._sub_bucket_count = 1 << self._sub_bucket_bits
+        self._sub_bucket_half = self._sub_bucket_count >> 1
+        self.counts = {}  # type: dict  # bucket index: count
+        self.total = 0
+        self.min = None  # type: int
+        self.max = None  # type: int
+        self._sum = 0
+
+    def _index(self, value: int) -> int:
+        bucket = max(0, value.bit_length() - self._sub_bucket_bits)
+        return bucket * self._sub_bucket_half + (value >> bucket)
+
+    def _highest_equivalent(self, index: int) -> int:
+        if index < self._sub_bucket_count:
+            return index
+        bucket = (index - self._sub_bucket_count) // self._sub_bucket_half + 1
+        sub_bucket = index - bucket * self._sub_bucket_half
+        return ((sub_bucket + 1) << bucket) - 1
+
+    def record_value(self, value: int, count: int=1):
+        """
+        Records a value, in units.
+        :param value:
+        :param count:
+        :return:
+        """
+        value = max(0, int(value))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self._sum += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def record(self, latency: float):
+        """
+        Records a latency in seconds.
+        :param latency:
+        :return:
+        """
+        self.record_value(int(round(latency / self.unit)))
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """
+        Returns the value (in units) below or equal to which the given percentage of values are.
+        :param percentile: 0 to 100
+        :return:
+        """
+        if not self.total:
+            return 0
+        target = max(1, int(math.ceil(percentile / 100.0 * self.total)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max)
+        return self.max
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Returns the latency (seconds) at the given percentile.
+        :param percentile:
+        :return:
+        """
+        return self.value_at_percentile(percentile) * self.unit
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.total * self.unit if self.total else 0.0
+
+    def summary(self) -> dict:
+        """
+        Latencies (seconds) usually reported for a run.
+        :return:
+        """
+        return {
+            'count': self.total,
+            'min': (self.min or 0) * self.unit,
+            'mean': self.mean,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'p99.9': self.percentile(99.9),
+            'max': (self.max or 0) * self.unit,
+        }
+
+    def _check_compatible(self, other: 'LatencyHistogram'):
+        if (other.significant_digits, other.unit) != (self.significant_digits, self.unit):
+            raise ValueError('Histograms with different precision or unit cannot be merged')
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """
+        Adds the values of other histogram into this one.
+        :param other:
+        :return: self
+        """
+        self._check_compatible(other)
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self._sum += other._sum
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    @staticmethod
+    def merged(histograms: Iterable['LatencyHistogram']) -> 'LatencyHistogram':
+        """
+        Returns a new histogram with the values of all given histograms (i.e. from all clients).
+        :param histograms:
+        :return:
+        """
+        result = None
+        for histogram in histograms:
+            if result is None:
+                result = LatencyHistogram(histogram.significant_digits, histogram.unit)
+            result.merge(histogram)
+        return result or LatencyHistogram()
+
+    def snapshot(self) -> dict:
+        """
+        Serializable copy of the histogram (see: from_snapshot()).
+        :return:
+        """
+        return {
+            'significant_digits': self.significant_digits,
+            'unit': self.unit,
+            'counts': sorted(self.counts.items()),
+            'sum': self._sum,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @staticmethod
+    def from_snapshot(snapshot: dict) -> 'LatencyHistogram':
+        histogram = LatencyHistogram(snapshot['significant_digits'], snapshot['unit'])
+        histogram.counts = {int(index): count for index, count in snapshot['counts']}
+        histogram.total = sum(histogram.counts.values())
+        histogram._sum = snapshot['sum']
+        histogram.min = snapshot['min']
+        histogram.max = snapshot['max']
+        return histogram
+
+    def __repr__(self):
+        summary = self.summary()
+        return "LatencyHistogram(count=%d, p50=%.6fs, p99=%.6fs, p99.9=%.6fs, max=%.6fs)" % (
+            summary['count'], summary['p50'], summary['p99'], summary['p99.9'], summary['max'])
@@ -0,0 +1,228 @@
+"""
+Open-loop load profiles for senders: the arrival rate (messages per second) is defined
+as a function of time, independently of how fast the broker or router accepts messages.
+
+Profiles are spread across N senders:
+- In-process senders (SenderCore) follow an ArrivalSchedule, which gives the intended
+  send time of every message. Messages are stamped with their intended send time, so
+  measured latency includes the time messages waited because of a slow peer
+  (no coordinated omission).
+- External senders can only send at a constant rate for a whole run (--count spread
+  over --duration), so profiles are approximated by consecutive constant rate
+  segments, chained in a single execution (see: send_profile_external()).
+"""
+
+import math
+import shlex
+from bisect import bisect_right
+from typing import List, Tuple
+
+from iqa_common.executor import Command, Execution
+
+from messaging_components.clients.external.batch import message_options
+
+# Tolerance for rounding errors when accumulating arrivals of many segments
+_EPSILON = 1e-6
+
+
+class LoadProfile:
+    """
+    Arrival rate as a function of time, during duration seconds.
+    """
+    def __init__(self, duration: float):
+        self.duration = duration
+
+    def rate(self, elapsed: float) -> float:
+        """
+        Messages per second at the given time (seconds since start).
+        :param elapsed:
+        :return:
+        """
+        raise NotImplementedError()
+
+    def segments(self, resolution: float=0.1) -> List[Tuple[float, float, float]]:
+        """
+        Approximates the profile as constant rate segments.
+        :param resolution: Segment length in seconds
+        :return: List of (start, length, rate)
+        """
+        segments = []
+        for index in range(int(math.ceil(self.duration / resolution - _EPSILON))):
+            start = index * resolution
+            length = min(resolution, self.duration - start)
+            segments.append((start, length, max(0.0, self.rate(start + length / 2))))
+        return segments
+
+    def total_messages(self, resolution: float=0.1) -> int:
+        return int(sum(length * rate for _, length, rate in self.segments(resolution)) + _EPSILON)
+
+
+class ConstantRate(LoadProfile):
+    def __init__(self, rate: float, duration: float):
+        super(ConstantRate, self).__init__(duration)
+        self._rate = rate
+
+    def rate(self, elapsed: float) -> float:
+        return self._rate
+
+
+class Ramp(LoadProfile):
+    """
+    Rate growing (or decreasing) linearly from start_rate to end_rate.
+    """
+    def __init__(self, start_rate: float, end_rate: float, duration: float):
+        super(Ramp, self).__init__(duration)
+        self.start_rate = start_rate
+        self.end_rate = end_rate
+
+    def rate(self, elapsed: float) -> float:
+        return self.start_rate + (self.end_rate - self.start_rate) * elapsed / self.duration
+
+
+class Step(LoadProfile):
+    """
+    Rate increased by step_rate every step_duration seconds, for the given number of steps.
+    """
+    def __init__(self, start_rate: float, step_rate: float, step_duration: float, steps: int):
+        super(Step, self).__init__(step_duration * steps)
+        self.start_rate = start_rate
+        self.step_rate = step_rate
+        self.step_duration = step_duration
+
+    def rate(self, elapsed: float) -> float:
+        return self.start_rate + self.step_rate * int(elapsed // self.step_duration)
+
+
+class Burst(LoadProfile):
+    """
+    Base rate with bursts of burst_rate lasting burst_duration, every period seconds.
+    """
+    def __init__(self, base_rate: float, burst_rate: float, period: float, burst_duration: float, duration: float):
+        super(Burst, self).__init__(duration)
+        self.base_rate = base_rate
+        self.burst_rate = burst_rate
+        self.period = period
+        self.burst_duration = burst_duration
+
+    def rate(self, elapsed: float) -> float:
+        return self.burst_rate if elapsed % self.period < self.burst_duration else self.base_rate
+
+
+class Sine(LoadProfile):
+    """
+    Rate oscillating around mean_rate.
+    """
+    def __init__(self, mean_rate: float, amplitude: float, period: float, duration: float):
+        super(Sine, self).__init__(duration)
+        self.mean_rate = mean_rate
+        self.amplitude = amplitude
+        self.period = period
+
+    def rate(self, elapsed: float) -> float:
+        return self.mean_rate + self.amplitude * math.sin(2 * math.pi * elapsed / self.period)
+
+
+class ArrivalSchedule:
+    """
+    Intended send times of the messages of a profile, for one of clients senders
+    (sender index gets arrivals index, index + clients, index + 2 * clients...).
+    """
+    def __init__(self, profile: LoadProfile, index: int=0, clients: int=1, resolution: float=0.01):
+        self.index = index
+        self.clients = clients
+        self._starts = []
+        self._rates = []
+        self._cumulative = []  # arrivals before each segment
+        arrivals = 0.0
+        for start, length, rate in profile.segments(resolution):
+            self._starts.append(start)
+            self._rates.append(rate)
+            self._cumulative.append(arrivals)
+            arrivals += length * rate
+        self.total = int(arrivals + _EPSILON)
+        self.count = max(0, (self.total - index + clients - 1) // clients)
+
+    def time_of(self, sequence: int) -> float:
+        """
+        Intended send time (seconds since start) of the given message of this sender.
+        :param sequence: Message number of this sender
+        :return: Time or None if the profile has no more messages for this sender
+        """
+        if sequence >= self.count:
+            return None
+        arrival = sequence * self.clients + self.index
+        segment = bisect_right(self._cumulative, arrival) - 1
+        while self._rates[segment] <= 0:
+            segment += 1
+        return self._starts[segment] + (arrival - self._cumulative[segment]) / self._rates[segment]
+
+
+def external_segments(profile: LoadProfile, index: int=0, clients: int=1,
+                      resolution: float=1.0) -> List[Tuple[int, int]]:
+    """
+    Splits the share of one of clients senders into constant rate runs.
+    :param profile:
+    :param index: Sender index
+    :param clients: Number of senders
+    :param resolution: Length (seconds) of each run
+    :return: List of (count, duration)
+    """
+    runs = []
+    sent = 0
+    arrivals = 0.0
+    for _, length, rate in profile.segments(resolution):
+        arrivals += length * rate
+        # Messages of this sender are arrivals index, index + clients...
+        expected = max(0, int(math.ceil((int(arrivals + _EPSILON) - index) / clients)))
+        runs.append((expected - sent, max(1, int(round(length)))))
+        sent = expected
+    return runs
+
+
+def send_profile_external(sender, message, profile: LoadProfile, index: int=0, clients: int=1,
+                          resolution: float=5.0) -> Execution:
+    """
+    Sends message following the share of the profile of one of clients external senders,
+    as consecutive constant rate runs in a single execution.
+    Segments without messages just wait for their duration.
+    Every run starts a client process, whose startup delays the following runs, so the
+    resolution must be well above the client startup time (seconds for Java clients):
+    the profile is followed at the resolution granularity only, and the whole profile
+    takes about (client startup * runs) longer than its duration. Java senders using
+    a worker JVM (see: ClientJava.use_worker()) run on it and avoid most of the startup.
+    :param sender: External sender client
+    :param message:
+    :param profile:
+    :param index:
+    :param clients:
+    :param resolution: Length (seconds) of each run
+    :return:
+    """
+    command = sender.command
+    control = command.control
+    defaults = (control.count, control.duration, control.duration_mode)
+    options = message_options(message)
+    message_defaults = {option: getattr(command.message, option, None) for option in options}
+    lines = ['set -e']
+    try:
+        for option, value in options.items():
+            setattr(command.message, option, value)
+        control.duration_mode = 'before-send'
+        for count, duration in external_segments(profile, index, clients, resolution):
+            if count <= 0:
+                lines.append('sleep %d' % duration)
+                continue
+            control.count = count
+            control.duration = duration
+            lines.append(' '.join(shlex.quote(str(arg)) for arg in sender.client_args(command.args)))
+    finally:
+        control.count, control.duration, control.duration_mode = defaults
+        # Set through setattr, so option changes are tracked (see: ClientOptionsBase.revision)
+        for option, value in message_defaults.items():
+            setattr(command.message, option, value)
+
+    # The whole profile must fit in the execution timeout (each run adds the client startup time)
+    timeout = command.timeout + int(math.ceil(profile.duration)) if command.timeout else command.timeout
+    return sender.execute(Command(['sh', '-c', '\n'.join(lines) + '\n'], stdout=command.stdout,
+                                  stderr=command.stderr, daemon=command.daemon, timeout=timeout,
+                                  encoding=command.encoding))
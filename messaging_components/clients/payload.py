@@ -0,0 +1,279 @@
+"""
+Message payloads of given sizes, generated once into files that are reused across runs.
+External senders read them with --msg-content-from-file (instead of passing the content
+as an argument), in-process senders send memory-mapped slices of the files without
+copying them into python objects, and receivers verify payloads by size and checksum
+instead of comparing full contents.
+"""
+
+import json
+import mmap
+import os
+import random
+import string
+import struct
+import zlib
+from typing import Iterable, List
+
+# Bytes generated and checksummed at once
+CHUNK_SIZE = 1 << 20
+
+KINDS = ('text', 'binary', 'random', 'zeros')
+
+# Maps every byte to a letter or digit
+_TEXT = (string.ascii_letters + string.digits).encode()
+_TEXT_TABLE = bytes(_TEXT[byte % len(_TEXT)] for byte in range(256))
+
+# Encoded AMQP data section with an empty body, and the header of a data section of up to 4GB
+_EMPTY_DATA_SECTION = b'\x00\x53\x75\xa0\x00'
+_DATA_SECTION = b'\x00\x53\x75\xb0'
+
+
+def checksum(data, value: int=0) -> int:
+    """
+    CRC-32 of data (bytes-like), continuing from value.
+    :param data:
+    :param value:
+    :return:
+    """
+    return zlib.crc32(data, value) & 0xffffffff
+
+
+def _chunks(kind: str, size: int, seed: int) -> Iterable[bytes]:
+    generator = random.Random(seed)
+    remaining = size
+    while remaining > 0:
+        length = min(CHUNK_SIZE, remaining)
+        remaining -= length
+        if kind == 'zeros':
+            yield bytes(length)
+        elif kind == 'random':
+            yield os.urandom(length)
+        elif kind == 'binary':
+            yield generator.getrandbits(8 * length).to_bytes(length, 'little')
+        else:
+            # Printable content, as external clients read the file as text
+            yield generator.getrandbits(8 * length).to_bytes(length, 'little').translate(_TEXT_TABLE)
+
+
+class Payload:
+    """
+    Payload stored in a file, memory-mapped when used by in-process clients.
+    """
+    __slots__ = ('path', 'size', 'checksum', '_file', '_mmap')
+
+    def __init__(self, path: str, size: int, checksum: int):
+        self.path = path
+        self.size = size
+        self.checksum = checksum
+        self._file = None
+        self._mmap = None
+
+    @staticmethod
+    def generate(path: str, size: int, kind: str='text', seed: int=0) -> 'Payload':
+        """
+        Writes a payload file.
+        :param path:
+        :param size: Bytes
+        :param kind: text and binary are deterministic (same seed, same content), random is not
+        :param seed:
+        :return:
+        """
+        if kind not in KINDS:
+            raise ValueError('Invalid payload kind: %s (expected one of %s)' % (kind, ', '.join(KINDS)))
+        value = 0
+        with open(path, 'wb') as payload_file:
+            for chunk in _chunks(kind, size, seed):
+                payload_file.write(chunk)
+                value = checksum(chunk, value)
+        return Payload(path, size, value)
+
+    def view(self) -> memoryview:
+        """
+        Read-only view of the payload, backed by the memory-mapped file (shared by all users).
+        :return:
+        """
+        if not self.size:
+            return memoryview(b'')
+        if self._mmap is None:
+            self._file = open(self.path, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    def verify(self, data) -> bool:
+        """
+        Whether data (bytes-like) is this payload.
+        :param data:
+        :return:
+        """
+        return len(data) == self.size and checksum(data) == self.checksum
+
+    def encoded_body(self) -> List:
+        """
+        The payload as an AMQP data section, in chunks (the payload chunk is not copied).
+        :return:
+        """
+        return [_DATA_SECTION + struct.pack('>I', self.size), self.view()]
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = self._file = None
+
+    def __repr__(self):
+        return "Payload(%s, size=%d, checksum=%08x)" % (self.path, self.size, self.checksum)
+
+
+def encode_with_payload(message, payload: Payload) -> List:
+    """
+    Encodes a proton message whose body is the given payload.
+    :param message: proton Message (its body is ignored)
+    :param payload:
+    :return: Encoded chunks, to be sent in order as a single delivery
+    """
+    body, inferred = message.body, message.inferred
+    message.body = b''
+    message.inferred = True
+    try:
+        encoded = message.encode()
+    finally:
+        message.body, message.inferred = body, inferred
+    if not encoded.endswith(_EMPTY_DATA_SECTION):
+        raise ValueError('Unable to encode message with payload (unexpected body section)')
+    return [encoded[:-len(_EMPTY_DATA_SECTION)]] + payload.encoded_body()
+
+
+class PayloadStore:
+    """
+    Directory of payload files, generated on first use and reused afterwards.
+    Checksums are kept in a manifest, so reused payloads are not read again.
+    """
+    MANIFEST = 'payloads.json'
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._manifest_path = os.path.join(directory, self.MANIFEST)
+        self._manifest = {}  # type: dict  # file name: checksum
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path) as manifest:
+                self._manifest = json.load(manifest)
+        self._payloads = {}  # type: dict  # file name: Payload
+
+    def get(self, size: int, kind: str='text', seed: int=0) -> Payload:
+        """
+        Returns the payload of the given size, kind and seed, generating it if needed.
+        Random payloads are not reused across runs (they are generated again by every store).
+        :param size:
+        :param kind:
+        :param seed:
+        :return:
+        """
+        name = 'payload-%s-%d-%d.bin' % (kind, size, seed)
+        payload = self._payloads.get(name)
+        if payload is not None:
+            return payload
+
+        path = os.path.join(self.directory, name)
+        if kind != 'random' and name in self._manifest and os.path.exists(path) and os.path.getsize(path) == size:
+            payload = Payload(path, size, self._manifest[name])
+        else:
+            payload = Payload.generate(path, size, kind, seed)
+            self._manifest[name] = payload.checksum
+            with open(self._manifest_path, 'w') as manifest:
+                json.dump(self._manifest, manifest, indent=2, sort_keys=True)
+        self._payloads[name] = payload
+        return payload
+
+    def sample(self, count: int, sizes: 'SizeDistribution', kind: str='text', seed: int=0) -> List[Payload]:
+        """
+        Returns count payloads with sizes drawn from the given distribution.
+        Payloads of equal sizes are the same file.
+        :param count:
+        :param sizes:
+        :param kind:
+        :param seed: Seed of the sizes and contents
+        :return:
+        """
+        generator = random.Random(seed)
+        return [self.get(sizes.sample(generator), kind, seed) for _ in range(count)]
+
+    def close(self):
+        for payload in self._payloads.values():
+            payload.close()
+
+
+class SizeDistribution:
+    """
+    Distribution of payload sizes.
+    """
+    def __init__(self, sizes: List[int], weights: List[float]=None):
+        """
+        :param sizes: Sizes in bytes
+        :param weights: Relative weight of each size (defaults to equally likely)
+        """
+        self.sizes = sizes
+        self.weights = weights
+
+    @staticmethod
+    def fixed(size: int) -> 'SizeDistribution':
+        return SizeDistribution([size])
+
+    @staticmethod
+    def log_uniform(minimum: int, maximum: int, buckets: int=8) -> 'SizeDistribution':
+        """
+        Sizes spread evenly on a logarithmic scale (i.e. 1KB, 4KB, 16KB... 1MB), equally likely.
+        :param minimum:
+        :param maximum:
+        :param buckets:
+        :return:
+        """
+        if buckets < 2 or minimum == maximum:
+            return SizeDistribution.fixed(minimum)
+        ratio = (maximum / minimum) ** (1.0 / (buckets - 1))
+        return SizeDistribution(sorted(set(int(round(minimum * ratio ** index)) for index in range(buckets))))
+
+    def sample(self, generator: random.Random) -> int:
+        if len(self.sizes) == 1:
+            return self.sizes[0]
+        return generator.choices(self.sizes, self.weights)[0]
+
+
+class PayloadVerifier:
+    """
+    Verifies received bodies against a set of payloads, by size and checksum.
+    """
+    def __init__(self, payloads: Iterable[Payload]):
+        self._checksums = {}  # type: dict  # size: set of checksums
+        for payload in payloads:
+            self._checksums.setdefault(payload.size, set()).add(payload.checksum)
+        self.verified = 0
+        self.corrupted = 0
+
+    def verify(self, data) -> bool:
+        """
+        Whether data is one of the payloads (counted as verified or corrupted).
+        :param data: Body (bytes-like, text is encoded as UTF-8)
+        :return:
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        checksums = self._checksums.get(len(data)) if data is not None else None
+        if checksums is not None and checksum(data) in checksums:
+            self.verified += 1
+            return True
+        self.corrupted += 1
+        return False
+
+
+def use_payload(command, payload: Payload):
+    """
+    Makes an external sender command send the payload (read from its file by the client).
+    The payload file must be readable from the node where the client runs.
+    :param command: Sender client command
+    :param payload:
+    :return:
+    """
+    command.message.msg_content = None
+    command.message.msg_content_from_file = payload.path
@@ -0,0 +1,299 @@
+"""
+Verifies message delivery (loss, duplication and ordering) by correlating the
+messages sent and received by any number of clients. Messages are identified by
+a sequence number within a stream (address, sender and message group), and
+sequences are kept in RangeSet instances, whose memory depends on the number of
+gaps rather than on the number of messages.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Iterator, List, Tuple
+
+from messaging_components.clients.latency import SEQUENCE_PROPERTY
+
+_TRAILING_NUMBER = re.compile(r'(\d+)$')
+
+
+class RangeSet:
+    """
+    Set of non-negative integers stored as sorted, disjoint [start, end) ranges.
+    Adding consecutive numbers (the usual case) extends the last range in constant time.
+    """
+    __slots__ = ('_starts', '_ends', 'count')
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+        self.count = 0
+
+    def add(self, number: int) -> bool:
+        """
+        Adds a number.
+        :param number:
+        :return: False if number was already present
+        """
+        starts, ends = self._starts, self._ends
+
+        # Fast path: number extends the last range
+        if ends and ends[-1] == number:
+            ends[-1] += 1
+            self.count += 1
+            return True
+
+        index = bisect_right(starts, number) - 1
+        if index >= 0 and number < ends[index]:
+            return False
+
+        merge_previous = index >= 0 and ends[index] == number
+        merge_next = index + 1 < len(starts) and starts[index + 1] == number + 1
+        if merge_previous and merge_next:
+            ends[index] = ends[index + 1]
+            del starts[index + 1]
+            del ends[index + 1]
+        elif merge_previous:
+            ends[index] += 1
+        elif merge_next:
+            starts[index + 1] = number
+        else:
+            starts.insert(index + 1, number)
+            ends.insert(index + 1, number + 1)
+        self.count += 1
+        return True
+
+    def __contains__(self, number: int) -> bool:
+        index = bisect_right(self._starts, number) - 1
+        return index >= 0 and number < self._ends[index]
+
+    def __len__(self):
+        return self.count
+
+    def ranges(self) -> List[Tuple[int, int]]:
+        """
+        :return: List of [start, end) ranges
+        """
+        return list(zip(self._starts, self._ends))
+
+    def difference(self, other: 'RangeSet') -> 'RangeSet':
+        """
+        Returns the numbers in this set that are not in other.
+        :param other:
+        :return:
+        """
+        result = RangeSet()
+        other_ranges = other.ranges()
+        position = 0
+        for start, end in zip(self._starts, self._ends):
+            while position < len(other_ranges) and other_ranges[position][1] <= start:
+                position += 1
+            current = start
+            index = position
+            while current < end:
+                if index < len(other_ranges) and other_ranges[index][0] < end:
+                    other_start, other_end = other_ranges[index]
+                    if other_start > current:
+                        result._append(current, other_start)
+                    current = max(current, other_end)
+                    index += 1
+                else:
+                    result._append(current, end)
+                    current = end
+        return result
+
+    def _append(self, start: int, end: int):
+        self._starts.append(start)
+        self._ends.append(end)
+        self.count += end - start
+
+    def __iter__(self) -> Iterator[int]:
+        for start, end in zip(self._starts, self._ends):
+            yield from range(start, end)
+
+    def __repr__(self):
+        return "RangeSet(%s)" % ', '.join('%d-%d' % (start, end - 1) for start, end in self.ranges()[:10])
+
+
+class StreamReport:
+    """
+    Verification result of a stream of messages (address, sender and message group).
+    """
+    __slots__ = ('stream', 'sent', 'received', 'lost', 'unexpected', 'duplicates', 'reordered')
+
+    def __init__(self, stream: tuple, sent: int, received: int, lost: RangeSet, unexpected: RangeSet,
+                 duplicates: int, reordered: int):
+        self.stream = stream
+        self.sent = sent
+        self.received = received
+        self.lost = lost
+        self.unexpected = unexpected
+        self.duplicates = duplicates
+        self.reordered = reordered
+
+    @property
+    def ok(self) -> bool:
+        return not (len(self.lost) or len(self.unexpected) or self.duplicates or self.reordered)
+
+    def __repr__(self):
+        return "StreamReport(%s sent=%d received=%d lost=%d unexpected=%d duplicates=%d reordered=%d)" % (
+            self.stream, self.sent, self.received, len(self.lost), len(self.unexpected), self.duplicates,
+            self.reordered)
+
+
+class _Stream:
+    __slots__ = ('sent', 'received', 'duplicates', 'reordered', 'last')
+
+    def __init__(self):
+        self.sent = RangeSet()
+        self.received = RangeSet()
+        self.duplicates = 0
+        self.reordered = 0
+        self.last = {}  # receiver: last received sequence
+
+
+def _field(record: dict, name: str):
+    value = record.get(name)
+    if value is None:
+        value = record.get(name.replace('_', '-'))
+    return value
+
+
+def record_sequence(record: dict) -> int:
+    """
+    Returns the sequence of a message record (as logged by external clients):
+    the sequence property (see: latency module), a number at the end of the message id
+    or the message group sequence.
+    :param record:
+    :return: Sequence or None
+    """
+    properties = record.get('properties') or {}
+    if SEQUENCE_PROPERTY in properties:
+        return int(properties[SEQUENCE_PROPERTY])
+
+    message_id = _field(record, 'id')
+    if message_id is not None:
+        match = _TRAILING_NUMBER.search(str(message_id))
+        if match:
+            return int(match.group(1))
+
+    group_sequence = _field(record, 'group_sequence')
+    if group_sequence is not None:
+        return int(group_sequence)
+    return None
+
+
+def record_sender(record: dict) -> str:
+    """
+    Returns the sender of a message record: its message id without the trailing sequence,
+    as clients number the ids of the messages they send (i.e. ID:a2c9...-0:1:1:1-7).
+    :param record:
+    :return: Sender or None (no message id, or no sequence in it)
+    """
+    message_id = _field(record, 'id')
+    if message_id is None:
+        return None
+    message_id = str(message_id)
+    match = _TRAILING_NUMBER.search(message_id)
+    return message_id[:match.start()] if match else None
+
+
+class MessageVerifier:
+    """
+    Correlates sent and received messages by stream and sequence.
+    Ordering is verified per stream and receiver, as it is only guaranteed
+    between a sender and each of the receivers.
+    """
+    def __init__(self):
+        self._streams = {}  # type: dict  # (address, sender, group): _Stream
+        self.unidentified = 0
+
+    def _stream(self, address: str, sender: str, group: str) -> _Stream:
+        key = (address, sender, group)
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = _Stream()
+        return stream
+
+    def add_sent(self, address: str, sequence: int, sender: str=None, group: str=None):
+        """
+        Records a sent message.
+        :param address:
+        :param sequence:
+        :param sender: Sender identification (sequences must be unique per sender)
+        :param group: Message group id
+        :return:
+        """
+        self._stream(address, sender, group).sent.add(sequence)
+
+    def add_received(self, address: str, sequence: int, sender: str=None, group: str=None, receiver: str=None):
+        """
+        Records a received message.
+        :param address:
+        :param sequence:
+        :param sender:
+        :param group:
+        :param receiver: Receiver identification
+        :return:
+        """
+        stream = self._stream(address, sender, group)
+        if not stream.received.add(sequence):
+            # Counted as duplicate only, even if older than the last received sequence
+            stream.duplicates += 1
+            return
+        last = stream.last.get(receiver)
+        if last is not None and sequence < last:
+            stream.reordered += 1
+        else:
+            stream.last[receiver] = sequence
+
+    def add_sent_record(self, record: dict, sender: str=None, address: str=None):
+        """
+        Records a sent message from a client output record (see: ClientOutputParser).
+        Records of the same sender are identified by their message id (see: record_sender()).
+        :param record:
+        :param sender: Used when the message id does not identify the sender
+        :param address: Used when record has no address
+        :return:
+        """
+        sequence = record_sequence(record)
+        if sequence is None:
+            self.unidentified += 1
+            return
+        self.add_sent(_field(record, 'address') or address, sequence, record_sender(record) or sender,
+                      _field(record, 'group_id'))
+
+    def add_received_record(self, record: dict, sender: str=None, receiver: str=None, address: str=None):
+        """
+        Records a received message from a client output record (see: ClientOutputParser).
+        Records of the same sender are identified by their message id (see: record_sender()).
+        :param record:
+        :param sender: Used when the message id does not identify the sender
+        :param receiver:
+        :param address: Used when record has no address
+        :return:
+        """
+        sequence = record_sequence(record)
+        if sequence is None:
+            self.unidentified += 1
+            return
+        self.add_received(_field(record, 'address') or address, sequence, record_sender(record) or sender,
+                          _field(record, 'group_id'), receiver)
+
+    def report(self) -> List[StreamReport]:
+        """
+        Verifies all streams.
+        :return:
+        """
+        reports = []
+        for key, stream in self._streams.items():
+            reports.append(StreamReport(key, len(stream.sent), len(stream.received),
+                                        stream.sent.difference(stream.received),
+                                        stream.received.difference(stream.sent),
+                                        stream.duplicates, stream.reordered))
+        return reports
+
+    def failures(self) -> List[StreamReport]:
+        """
+        Reports of the streams with lost, unexpected, duplicated or reordered messages.
+        :return:
+        """
+        return [report for report in self.report() if not report.ok]
@@ -1,6 +1,7 @@
 from messaging_components.node.node_docker import NodeDocker
 from .node_local import *
 from .node_ansible import *
+from .files import read_file, write_file
 from iqa_common.executor import *
 from messaging_abstract.node.node import Node
 import logging
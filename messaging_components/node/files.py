@@ -0,0 +1,47 @@
+"""
+Helpers to read and write text files on a Node using plain shell commands,
+so they work through any Executor (local, ansible or container).
+"""
+
+import shlex
+
+from iqa_common.executor import Command, Execution
+from messaging_abstract.node.node import Node
+
+# Marker that delimits the here-document used to write file contents
+EOF_MARKER = 'IQA_EOF_MARKER'
+
+
+def write_file(node: Node, path: str, content: str, timeout: int=60) -> Execution:
+    """
+    Writes (replaces) the given text content into path on the node.
+    :param node:
+    :param path:
+    :param content:
+    :param timeout:
+    :return:
+    """
+    if not content.endswith('\n'):
+        content += '\n'
+
+    script = "cat > %s <<'%s'\n%s%s\n" % (shlex.quote(path), EOF_MARKER, content, EOF_MARKER)
+    execution = node.execute(Command(['sh', '-c', script], stdout=True, stderr=True, timeout=timeout))
+    execution.wait()
+    return execution
+
+
+def read_file(node: Node, path: str, timeout: int=60) -> str:
+    """
+    Returns the content of path on the node, or None if it could not be read.
+    :param node:
+    :param path:
+    :param timeout:
+    :return:
+    """
+    execution = node.execute(Command(['cat', path], stdout=True, stderr=True, timeout=timeout))
+    execution.wait()
+
+    if not execution.completed_successfully():
+        return None
+
+    return execution.read_stdout()
@@ -1,5 +1,12 @@
+import inspect
+import io
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TextIO
+
 
 class _Attribute:
+    __slots__ = ('name', 'value', 'deprecated')
+
     def __init__(self, name, value, deprecated=False):
         self.name = name
         self.value = value
@@ -12,46 +19,139 @@ class _Attribute:
     def __str__(self):
         return self.value
 
-    # def __get__(self, instance, owner):
-    #     return self
+
+class _BoundAttribute(_Attribute):
+    """
+    _Attribute view over a field stored in a _Section,
+    so reading and setting its value reads and sets the section field.
+    """
+    __slots__ = ('_section', '_index')
+
+    def __init__(self, section, index):
+        self._section = section
+        self._index = index
+        self.name = section._field_name(index)
+        self.deprecated = False
+
+    @property
+    def value(self):
+        return self._section._values[self._index]
+
+    @value.setter
+    def value(self, value):
+        self._section._values[self._index] = value
+
+
+class _Field:
+    """
+    Descriptor for a section field. Getting it returns an _Attribute view,
+    setting it (with a plain value or an _Attribute) sets the field value.
+    """
+    __slots__ = ('index', 'name')
+
+    def __init__(self, index, name):
+        self.index = index
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return _BoundAttribute(instance, self.index)
 
     def __set__(self, instance, value):
-        self.value = value
+        if isinstance(value, _Attribute):
+            if value.name != self.name and value.name is not None:
+                # Rendered with the name of the _Attribute
+                instance._rename(self.index, value.name)
+            value = value.value
+        instance._values[self.index] = value
+
 
+class _SectionMeta(type):
+    """
+    Builds the field table of each section class from the parameters of its __init__
+    method, so field values are kept in a single list per instance. Fields of a subclass
+    extend the fields of its base section.
+    """
+    def __new__(mcs, name, bases, namespace):
+        if '__init__' in namespace and '_fields' not in namespace:
+            inherited = next((base._fields for base in bases if isinstance(base, _SectionMeta)), ())
+            params = inspect.signature(namespace['__init__']).parameters.values()
+            namespace['_fields'] = inherited + tuple(param.name for param in params
+                                                     if param.name != 'self' and param.name not in inherited
+                                                     and param.kind == param.POSITIONAL_OR_KEYWORD)
+        namespace.setdefault('__slots__', ())
 
-class _Section:
+        cls = super(_SectionMeta, mcs).__new__(mcs, name, bases, namespace)
+        if '_fields' in namespace:
+            cls._index = {field: index for index, field in enumerate(cls._fields)}
+            for index, field in enumerate(cls._fields):
+                setattr(cls, field, _Field(index, field))
+        return cls
+
+
+class _Section(metaclass=_SectionMeta):
+    # Attributes other than fields (i.e. undeclared _Attribute) are kept in __dict__
+    __slots__ = ('_values', '_names', '__dict__')
+    _fields = ()
+    _index = {}
     section_name = None
     deprecated = False
 
-    # def get_config(self):
-    #     sec = '%s: {\n' % self.section_name
-    #     for x in self.__dict__.items():
-    #         for value in x:
-    #             if isinstance(value, _Attribute):
-    #                 val = value.value
-    #                 if val is not None:
-    #                     sec += '    %s: %s\n' % (value.name, val)
-    #     sec += '}'
-    #     return sec
+    def __new__(cls, *args, **kwargs):
+        section = super(_Section, cls).__new__(cls)
+        object.__setattr__(section, '_values', [None] * len(cls._fields))
+        object.__setattr__(section, '_names', None)
+        return section
+
+    def __setattr__(self, name, value):
+        if name not in self._index:
+            # Setting a plain value to an undeclared _Attribute sets its value
+            attribute = self.__dict__.get(name)
+            if isinstance(attribute, _Attribute) and not isinstance(value, _Attribute):
+                attribute.value = value
+                return
+        object.__setattr__(self, name, value)
+
+    def _rename(self, index: int, name: str):
+        if self._names is None:
+            self._names = {}
+        self._names[index] = name
+
+    def _field_name(self, index: int) -> str:
+        if self._names is not None and index in self._names:
+            return self._names[index]
+        return self._fields[index]
+
+    def _items(self):
+        """
+        Attributes that have a value set, as (name, value) pairs in rendering order.
+        :return:
+        """
+        for index, value in enumerate(self._values):
+            if value is not None:
+                yield self._field_name(index), value
+        if self.__dict__:
+            for attribute in self.__dict__.values():
+                if isinstance(attribute, _Attribute) and attribute.value is not None:
+                    yield attribute.name, attribute.value
+
+    def get_config(self):
+        """Get in config format"""
+        stream = io.StringIO()
+        _write_section(self, stream.write)
+        return stream.getvalue()
 
     def __str__(self):
         return self.get_config()
 
-    def __getattribute__(self, name):
-        value = object.__getattribute__(self, name)
-        if hasattr(value, '__get__'):
-            value = value.__get__(self, self.__class__)
-        return value
-
-    def __setattr__(self, name, value):
-        try:
-            obj = object.__getattribute__(self, name)
-        except AttributeError:
-            pass
-        else:
-            if hasattr(obj, '__set__'):
-                return obj.__set__(self, value)
-        return object.__setattr__(self, name, value)
+    def to_dict(self) -> dict:
+        """
+        Generate a dict with all attributes that have a value set,
+        keyed by their name in the router configuration (and management) schema.
+        :return:
+        """
+        return dict(self._items())
 
 
 class Config(list):
@@ -62,20 +162,64 @@ class Config(list):
     def add_section(self, section: _Section):
         self.append(section)
 
-    def get_config(self):
-        conf = ''
-        i = False
-        num_sections = len(self)
+    def get_config(self) -> str:
+        """
+        Renders the whole configuration (qdrouterd.conf format).
+        :return:
+        """
+        stream = io.StringIO()
+        self.write(stream)
+        return stream.getvalue()
+
+    def write(self, stream: TextIO):
+        """
+        Renders the configuration into the given text stream in a single pass.
+        :param stream:
+        :return:
+        """
+        write = stream.write
+        separator = ''
         for section in self:
-            i += 1
-            conf += '%s: {\n' % section.section_name
-            for attributes in section.__dict__.items():
-                for attr in attributes:
-                    if isinstance(attr, _Attribute):
-                        tmp_val = attr.value
-                        if tmp_val is not None:
-                            conf += '    %s: %s\n' % (attr.name, tmp_val)
-            conf += '}\n'
-            if i < num_sections:
-                conf += '\n'
-        return conf
+            write(separator)
+            _write_section(section, write)
+            separator = '\n'
+
+    def save(self, path: str):
+        """
+        Renders the configuration into the given file.
+        :param path:
+        :return:
+        """
+        with open(path, 'w') as stream:
+            self.write(stream)
+
+
+def _write_section(section: _Section, write):
+    """
+    Writes a single section based on the field table of its class.
+    :param section:
+    :param write: write method of a text stream
+    :return:
+    """
+    write('%s: {\n' % section.section_name)
+    for name, value in section._items():
+        write('    %s: %s\n' % (name, value))
+    write('}\n')
+
+
+def _save_config(path: str, config: Config) -> str:
+    config.save(path)
+    return path
+
+
+def save_configs(configs: dict, max_workers: int=None, processes: bool=True) -> list:
+    """
+    Renders many configurations (i.e. all routers of a large topology) in parallel.
+    :param configs: dict of file path: Config
+    :param max_workers: Maximum number of workers (defaults to number of CPUs)
+    :param processes: Render using worker processes (default) or threads
+    :return: List of written paths
+    """
+    pool_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with pool_class(max_workers=max_workers) as pool:
+        return list(pool.map(_save_config, configs.keys(), configs.values()))
@@ -0,0 +1,240 @@
+"""
+Computes the difference between a desired Config and the entities configured
+on a running router (as returned by RouterQuery), so that only the delta needs
+to be applied through management. Changes that cannot be applied at runtime
+are reported, so the caller can fall back to rewriting the configuration file
+and restarting the router.
+"""
+
+import logging
+
+from . import Config, _Section
+from . import sections
+
+# Sections that can be compared against live entities:
+# section_name: (RouterQuery method, key attributes, operations supported at runtime)
+LIVE_ENTITIES = {
+    'address': ('config_address', ('prefix',), ('CREATE', 'DELETE')),
+    'linkRoute': ('config_linkroute', ('prefix', 'dir'), ('CREATE', 'DELETE')),
+    'autoLink': ('config_autolink', ('addr', 'dir'), ('CREATE', 'DELETE')),
+    'log': ('log', ('module',), ('UPDATE',)),
+    'listener': ('listener', ('port',), ('CREATE',)),
+    'connector': ('connector', ('host', 'port'), ('CREATE',)),
+    'sslProfile': ('ssl_profile', ('name',), ('CREATE',)),
+    'router': ('router', (), ()),
+    'policy': ('policy', (), ()),
+}
+
+# Newer routers report some deprecated configuration attributes with a different name
+LIVE_ATTRIBUTE_ALIASES = {
+    'dir': 'direction',
+    'addr': 'address',
+}
+
+_TRUE_VALUES = ('yes', 'true')
+_FALSE_VALUES = ('no', 'false')
+
+
+def _normalize(value):
+    """
+    Normalizes values from config files and management records,
+    so that 'yes', 'true' and True (or '5672' and 5672) compare equal.
+    """
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip()
+    if text.lower() in _TRUE_VALUES:
+        return True
+    if text.lower() in _FALSE_VALUES:
+        return False
+    return text
+
+
+def live_value(record, name: str):
+    """
+    Returns the value of the given configuration attribute from a management record.
+    :param record:
+    :param name:
+    :return:
+    """
+    if hasattr(record, name):
+        return getattr(record, name)
+    return getattr(record, LIVE_ATTRIBUTE_ALIASES.get(name, name), None)
+
+
+def query_live_entities(query, section_names=None) -> dict:
+    """
+    Queries the router for all entities that can be compared with configuration sections.
+    :param query: RouterQuery (or QDManage) instance
+    :param section_names: Restrict queries to these section names
+    :return: dict of section_name: list of records
+    """
+    live = {}
+    for section_name, (method, _, _) in LIVE_ENTITIES.items():
+        if section_names is not None and section_name not in section_names:
+            continue
+        live[section_name] = getattr(query, method)()
+    return live
+
+
+def section_from_record(section_name: str, record) -> _Section:
+    """
+    Creates a configuration section populated from a management record.
+    :param section_name:
+    :param record:
+    :return:
+    """
+    section_class = getattr(sections, section_name)
+    kwargs = {}
+    for name in section_class._fields:
+        value = live_value(record, name)
+        if value is not None:
+            kwargs[name] = value
+    return section_class(**kwargs)
+
+
+def config_from_live_entities(live: dict) -> Config:
+    """
+    Creates a Config from the records returned by query_live_entities.
+    :param live:
+    :return:
+    """
+    config = Config()
+    for section_name, records in live.items():
+        for record in records:
+            config.add_section(section_from_record(section_name, record))
+    return config
+
+
+class ConfigDiff(object):
+    """
+    Delta between a desired Config and the live entities of a router.
+    """
+    def __init__(self):
+        self.create = []  # type: list  # sections
+        self.update = []  # type: list  # (section, record)
+        self.delete = []  # type: list  # (section_name, record)
+        self.restart = []  # type: list  # (section_name, reason)
+        self._logger = logging.getLogger(self.__module__)
+
+    @property
+    def restart_required(self) -> bool:
+        return bool(self.restart)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.create or self.update or self.delete or self.restart)
+
+    @staticmethod
+    def compute(config: Config, live: dict) -> 'ConfigDiff':
+        """
+        Computes the difference between desired config and the live entities.
+        :param config: Desired configuration
+        :param live: Live records per section name (see: query_live_entities())
+        :return:
+        """
+        diff = ConfigDiff()
+
+        desired = {}
+        for section in config:
+            desired.setdefault(section.section_name, []).append(section)
+
+        for section_name in set(desired) | set(live):
+            if section_name not in LIVE_ENTITIES:
+                diff._logger.debug("Section '%s' cannot be compared with live entities" % section_name)
+                continue
+            diff._compare(section_name, desired.get(section_name, []), live.get(section_name, []))
+
+        return diff
+
+    def _compare(self, section_name: str, desired: list, records: list):
+        _, key_attributes, operations = LIVE_ENTITIES[section_name]
+
+        live_by_key = {self._key(key_attributes, lambda name: live_value(record, name)): record
+                       for record in records}
+        desired_by_key = {self._key(key_attributes, lambda name: getattr(section, name).value): section
+                          for section in desired}
+
+        for key, section in desired_by_key.items():
+            record = live_by_key.get(key)
+            if record is None:
+                if 'CREATE' in operations:
+                    self.create.append(section)
+                else:
+                    self.restart.append((section_name, 'new entity %s' % (key,)))
+                continue
+
+            changed = self.changed_attributes(section, record)
+            if not changed:
+                continue
+            if 'UPDATE' in operations:
+                self.update.append((section, record))
+            elif 'CREATE' in operations and 'DELETE' in operations:
+                self.delete.append((section_name, record))
+                self.create.append(section)
+            else:
+                self.restart.append((section_name, 'attributes changed: %s' % ', '.join(changed)))
+
+        for key, record in live_by_key.items():
+            if key in desired_by_key:
+                continue
+            if 'DELETE' in operations:
+                self.delete.append((section_name, record))
+            elif section_name in ('listener', 'connector', 'sslProfile'):
+                self.restart.append((section_name, 'entity removed %s' % (key,)))
+
+    @staticmethod
+    def _key(key_attributes: tuple, getter) -> tuple:
+        values = (getter(name) for name in key_attributes)
+        return tuple(None if value is None else _normalize(value) for value in values)
+
+    @staticmethod
+    def changed_attributes(section: _Section, record) -> list:
+        """
+        Returns the names of attributes set on section whose value differs from the live record.
+        :param section:
+        :param record:
+        :return:
+        """
+        changed = []
+        for name, value in section.to_dict().items():
+            if name == 'name':
+                continue
+            current = live_value(record, name)
+            if current is None or _normalize(current) != _normalize(value):
+                changed.append(name)
+        return changed
+
+    def apply(self, manage) -> list:
+        """
+        Applies the runtime changes through management. Entities are deleted first,
+        so that entities recreated with different attributes do not clash.
+        :param manage: QDManage instance
+        :return: List of QDManageResult
+        """
+        # Imported here so the config package does not depend on proton
+        from ..management.qdmanage import SECTION_ENTITY_TYPES
+
+        results = []
+        for section_name in set(section_name for section_name, _ in self.delete):
+            records = [record for name, record in self.delete if name == section_name]
+            results += manage.delete_many(records, SECTION_ENTITY_TYPES[section_name])
+
+        if self.create:
+            results += manage.create_many(self.create)
+
+        for section_name in set(section.section_name for section, _ in self.update):
+            entities = []
+            for section, record in self.update:
+                if section.section_name != section_name:
+                    continue
+                attributes = section.to_dict()
+                attributes['identity'] = record.identity
+                entities.append(attributes)
+            results += manage.update_many(entities, SECTION_ENTITY_TYPES[section_name])
+
+        return results
+
+    def __repr__(self):
+        return "ConfigDiff(create=%d, update=%d, delete=%d, restart=%s)" % (len(self.create), len(self.update),
+                                                                           len(self.delete), self.restart)
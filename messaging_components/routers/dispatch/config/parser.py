@@ -0,0 +1,179 @@
+"""
+Streaming parser for qdrouterd.conf files, building a Config made of the
+sections defined in the sections module. Input is read line by line, so
+large generated configurations are parsed in linear time.
+"""
+
+import inspect
+import io
+import logging
+import re
+from typing import Iterable
+
+from . import Config, _Section
+from . import sections
+
+_SECTION_START = re.compile(r'^([A-Za-z][\w.-]*)\s*:?\s*\{$')
+_SECTION_END = '}'
+
+_logger = logging.getLogger(__name__)
+
+
+class ConfigParseError(ValueError):
+    """
+    Raised when the configuration cannot be parsed, indicating the related line.
+    """
+    def __init__(self, message: str, line_number: int, source: str=None):
+        self.line_number = line_number
+        self.source = source
+        location = '%s:%d' % (source, line_number) if source else 'line %d' % line_number
+        super(ConfigParseError, self).__init__('%s: %s' % (location, message))
+
+
+# Section classes (and their accepted attributes) by section name
+_section_classes = {}
+
+
+def _section_class(section_name: str) -> tuple:
+    """
+    Returns the section class and the set of attributes it accepts.
+    :param section_name:
+    :return: (class, attribute names) or (None, None) if not supported
+    """
+    if section_name not in _section_classes:
+        section_class = getattr(sections, section_name, None)
+        if not (inspect.isclass(section_class) and issubclass(section_class, _Section)):
+            _section_classes[section_name] = (None, None)
+        else:
+            _section_classes[section_name] = (section_class, frozenset(section_class._fields))
+    return _section_classes[section_name]
+
+
+def _unquote(value: str) -> str:
+    if len(value) > 1 and value[0] == value[-1] and value[0] in ('"', "'"):
+        return value[1:-1]
+    return value
+
+
+def _strip_comment(line: str) -> str:
+    """
+    Removes a trailing comment (# preceded by whitespace, outside of quoted values).
+    :param line: Stripped line
+    :return:
+    """
+    quote = None
+    for index, char in enumerate(line):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char == '#' and index and line[index - 1].isspace():
+            return line[:index].rstrip()
+    return line
+
+
+def parse(lines: Iterable[str], strict: bool=False, source: str=None) -> Config:
+    """
+    Parses the given configuration lines (i.e. an open file) into a Config.
+    :param lines: Iterable of lines in qdrouterd.conf format
+    :param strict: Raise ConfigParseError on unknown sections, attributes and nested blocks
+                   (i.e. vhost groups), instead of logging and skipping them
+    :param source: Name of the source (used in error messages)
+    :return:
+    """
+    config = Config()
+    section_name = None
+    section_class = None
+    accepted = None
+    attributes = None
+    section_line = 0
+    line_number = 0
+    # Depth of the nested block being skipped (i.e. vhost groups)
+    nested = 0
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line[0] == '#':
+            continue
+        line = _strip_comment(line)
+
+        if section_name is None:
+            match = _SECTION_START.match(line)
+            if not match:
+                raise ConfigParseError("expected section start, found '%s'" % line, line_number, source)
+            section_name = match.group(1)
+            section_line = line_number
+            section_class, accepted = _section_class(section_name)
+            if section_class is None:
+                if strict:
+                    raise ConfigParseError("unknown section '%s'" % section_name, line_number, source)
+                _logger.warning("Skipping unknown section '%s' at line %d" % (section_name, line_number))
+            attributes = {}
+            continue
+
+        if nested:
+            if line == _SECTION_END:
+                nested -= 1
+            elif line[-1] == '{':
+                nested += 1
+            continue
+
+        if line == _SECTION_END:
+            if section_class is not None:
+                config.add_section(section_class(**attributes))
+            section_name = None
+            continue
+
+        if line[-1] == '{':
+            # Nested blocks are attributes (i.e. groups: {), otherwise the section is not closed
+            if strict or ':' not in line:
+                raise ConfigParseError("nested section inside '%s' is not supported" % section_name,
+                                       line_number, source)
+            if section_class is not None:
+                _logger.warning("Skipping nested block of section '%s' at line %d" % (section_name, line_number))
+            nested = 1
+            continue
+        name, colon, value = line.partition(':')
+        name = name.rstrip()
+        if not colon or not name:
+            raise ConfigParseError("invalid attribute '%s'" % line, line_number, source)
+
+        value = value.strip()
+        if section_class is None:
+            continue
+        if name not in accepted:
+            if strict:
+                raise ConfigParseError("unknown attribute '%s' for section '%s'" % (name, section_name),
+                                       line_number, source)
+            _logger.warning("Skipping unknown attribute '%s' of section '%s' at line %d"
+                            % (name, section_name, line_number))
+            continue
+        attributes[name] = _unquote(value)
+
+    if section_name is not None:
+        raise ConfigParseError("section '%s' started at line %d is not closed" % (section_name, section_line),
+                               line_number, source)
+
+    return config
+
+
+def parse_string(text: str, strict: bool=False) -> Config:
+    """
+    Parses configuration from a string.
+    :param text:
+    :param strict:
+    :return:
+    """
+    return parse(io.StringIO(text), strict=strict)
+
+
+def parse_file(path: str, strict: bool=False) -> Config:
+    """
+    Parses configuration from the given file, streaming its content.
+    :param path:
+    :param strict:
+    :return:
+    """
+    with open(path) as stream:
+        return parse(stream, strict=strict, source=path)
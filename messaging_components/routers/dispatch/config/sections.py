@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from . import _Section, _Attribute
+from . import _Section
 
 
 class addrPort(_Section):
@@ -28,10 +28,10 @@ class addrPort(_Section):
         :type name: string
         :return: list
         """
-        self.host = _Attribute(name='host', value=host)
-        self.port = _Attribute(name='port', value=port)
-        self.protocolFamily = _Attribute(name='protocolFamily', value=protocolFamily)
-        self.name = _Attribute(name='name', value=name)
+        self.host = host
+        self.port = port
+        self.protocolFamily = protocolFamily
+        self.name = name
 
 
 class connectionRole(_Section):
@@ -63,9 +63,9 @@ class connectionRole(_Section):
         :return:
         """
 
-        self.role = _Attribute(name='role', value=role)
-        self.cost = _Attribute(name='cost', value=cost)
-        self.name = _Attribute(name='name', value=name)
+        self.role = role
+        self.cost = cost
+        self.name = name
 
 
 class sslProfile(_Section):
@@ -126,14 +126,14 @@ class sslProfile(_Section):
         :return: list
         """
 
-        self.certDb = _Attribute(name='certDb', value=certDb)
-        self.certFile = _Attribute(name='certFile', value=certFile)
-        self.keyFile = _Attribute(name='keyFile', value=keyFile)
-        self.passwordFile = _Attribute(name='passwordFile', value=passwordFile)
-        self.password = _Attribute(name='password', value=password)
-        self.uidFormat = _Attribute(name='uidFormat', value=uidFormat)
-        self.displayNameFile = _Attribute(name='displayNameFile', value=displayNameFile)
-        self.name = _Attribute(name='name', value=name)
+        self.certDb = certDb
+        self.certFile = certFile
+        self.keyFile = keyFile
+        self.passwordFile = passwordFile
+        self.password = password
+        self.uidFormat = uidFormat
+        self.displayNameFile = displayNameFile
+        self.name = name
 
 
 class router(_Section):
@@ -189,17 +189,17 @@ class router(_Section):
         :return: list
         """
 
-        self.id = _Attribute(name='id', value=id)
-        self.mode = _Attribute(name='mode', value=mode)
-        self.helloInterval = _Attribute(name='helloInterval', value=helloInterval)
-        self.helloMaxAge = _Attribute(name='helloMaxAge', value=helloMaxAge)
-        self.raInterval = _Attribute(name='raInterval', value=raInterval)
-        self.raIntervalFlux = _Attribute(name='raIntervalFlux', value=raIntervalFlux)
-        self.remoteLsMaxAge = _Attribute(name='remoteLsMaxAge', value=remoteLsMaxAge)
-        self.workerThreads = _Attribute(name='workerThreads', value=workerThreads)
-        self.debugDump = _Attribute(name='debugDump', value=debugDump)
-        self.saslConfigPath = _Attribute(name='saslConfigPath', value=saslConfigPath)
-        self.saslConfigName = _Attribute(name='saslConfigName', value=saslConfigName)
+        self.id = id
+        self.mode = mode
+        self.helloInterval = helloInterval
+        self.helloMaxAge = helloMaxAge
+        self.raInterval = raInterval
+        self.raIntervalFlux = raIntervalFlux
+        self.remoteLsMaxAge = remoteLsMaxAge
+        self.workerThreads = workerThreads
+        self.debugDump = debugDump
+        self.saslConfigPath = saslConfigPath
+        self.saslConfigName = saslConfigName
 
 
 class listener(_Section):
@@ -334,31 +334,31 @@ class listener(_Section):
         :return: list
         """
 
-        self.host = _Attribute(name='host', value=host)
-        self.port = _Attribute(name='port', value=port)
-        self.protocolFamily = _Attribute(name='protocolFamily', value=protocolFamily)
-        self.role = _Attribute(name='role', value=role)
-        self.cost = _Attribute(name='cost', value=cost)
-        self.certDb = _Attribute(name='certDb', value=certDb)
-        self.certFile = _Attribute(name='certFile', value=certFile)
-        self.keyFile = _Attribute(name='keyFile', value=keyFile)
-        self.passwordFile = _Attribute(name='passwordFile', value=passwordFile)
-        self.password = _Attribute(name='password', value=password)
-        self.uidFormat = _Attribute(name='uidFormat', value=uidFormat)
-        self.displayNameFile = _Attribute(name='displayNameFile', value=displayNameFile)
-        self.saslMechanism = _Attribute(name='saslMechanism', value=saslMechanism)
-        self.authenticatePeer = _Attribute(name='authenticatePeer', value=authenticatePeer)
-        self.requireEncryption = _Attribute(name='requireEncryption', value=requireEncryption)
-        self.requireSsl = _Attribute(name='requireSsl', value=requireSsl)
-        self.trustedCerts = _Attribute(name='trustedCerts', value=trustedCerts)
-        self.maxFrameSize = _Attribute(name='maxFrameSize', value=maxFrameSize)
-        self.idleTimeoutSeconds = _Attribute(name='idleTimeoutSeconds', value=idleTimeoutSeconds)
-        self.stripAnnotations = _Attribute(name='stripAnnotations', value=stripAnnotations)
-        self.linkCapacity = _Attribute(name='linkCapacity', value=linkCapacity)
-        self.addrPort = _Attribute(name='addrPort', value=addrPort)
-        self.connectionRole = _Attribute(name='connectionRole', value=connectionRole)
-        self.sslProfile = _Attribute(name='sslProfile', value=sslProfile)
-        self.name = _Attribute(name='name', value=name)
+        self.host = host
+        self.port = port
+        self.protocolFamily = protocolFamily
+        self.role = role
+        self.cost = cost
+        self.certDb = certDb
+        self.certFile = certFile
+        self.keyFile = keyFile
+        self.passwordFile = passwordFile
+        self.password = password
+        self.uidFormat = uidFormat
+        self.displayNameFile = displayNameFile
+        self.saslMechanism = saslMechanism
+        self.authenticatePeer = authenticatePeer
+        self.requireEncryption = requireEncryption
+        self.requireSsl = requireSsl
+        self.trustedCerts = trustedCerts
+        self.maxFrameSize = maxFrameSize
+        self.idleTimeoutSeconds = idleTimeoutSeconds
+        self.stripAnnotations = stripAnnotations
+        self.linkCapacity = linkCapacity
+        self.addrPort = addrPort
+        self.connectionRole = connectionRole
+        self.sslProfile = sslProfile
+        self.name = name
 
 
 class connector(_Section):
@@ -490,31 +490,31 @@ class connector(_Section):
         :return: list
         """
 
-        self.host = _Attribute(name='host', value=host)
-        self.port = _Attribute(name='port', value=port)
-        self.protocolFamily = _Attribute(name='protocolFamily', value=protocolFamily)
-        self.role = _Attribute(name='role', value=role)
-        self.cost = _Attribute(name='cost', value=cost)
-        self.certDb = _Attribute(name='certDb', value=certDb)
-        self.certFile = _Attribute(name='certFile', value=certFile)
-        self.keyFile = _Attribute(name='keyFile', value=keyFile)
-        self.passwordFile = _Attribute(name='passwordFile', value=passwordFile)
-        self.password = _Attribute(name='password', value=password)
-        self.uidFormat = _Attribute(name='uidFormat', value=uidFormat)
-        self.displayNameFile = _Attribute(name='displayNameFile', value=displayNameFile)
-        self.saslMechanisms = _Attribute(name='saslMechanisms', value=saslMechanisms)
-        self.allowRedirect = _Attribute(name='allowRedirect', value=allowRedirect)
-        self.maxFrameSize = _Attribute(name='maxFrameSize', value=maxFrameSize)
-        self.idleTimeoutSeconds = _Attribute(name='idleTimeoutSeconds', value=idleTimeoutSeconds)
-        self.stripAnnotations = _Attribute(name='stripAnnotations', value=stripAnnotations)
-        self.linkCapacity = _Attribute(name='linkCapacity', value=linkCapacity)
-        self.verifyHostName = _Attribute(name='verifyHostName', value=verifyHostName)
-        self.saslUsername = _Attribute(name='saslUsername', value=saslUsername)
-        self.saslPassword = _Attribute(name='saslPassword', value=saslPassword)
-        self.addrPort = _Attribute(name='addrPort', value=addrPort)
-        self.connectionRole = _Attribute(name='connectionRole', value=connectionRole)
-        self.sslProfile = _Attribute(name='sslProfile', value=sslProfile)
-        self.name = _Attribute(name='name', value=name)
+        self.host = host
+        self.port = port
+        self.protocolFamily = protocolFamily
+        self.role = role
+        self.cost = cost
+        self.certDb = certDb
+        self.certFile = certFile
+        self.keyFile = keyFile
+        self.passwordFile = passwordFile
+        self.password = password
+        self.uidFormat = uidFormat
+        self.displayNameFile = displayNameFile
+        self.saslMechanisms = saslMechanisms
+        self.allowRedirect = allowRedirect
+        self.maxFrameSize = maxFrameSize
+        self.idleTimeoutSeconds = idleTimeoutSeconds
+        self.stripAnnotations = stripAnnotations
+        self.linkCapacity = linkCapacity
+        self.verifyHostName = verifyHostName
+        self.saslUsername = saslUsername
+        self.saslPassword = saslPassword
+        self.addrPort = addrPort
+        self.connectionRole = connectionRole
+        self.sslProfile = sslProfile
+        self.name = name
 
 
 class log(_Section):
@@ -551,11 +551,11 @@ class log(_Section):
         :return: list
         """
 
-        self.module = _Attribute(name='module', value=module)
-        self.enable = _Attribute(name='enable', value=enable)
-        self.timestamp = _Attribute(name='timestamp', value=timestamp)
-        self.source = _Attribute(name='source', value=source)
-        self.output = _Attribute(name='output', value=output)
+        self.module = module
+        self.enable = enable
+        self.timestamp = timestamp
+        self.source = source
+        self.output = output
 
 
 class address(_Section):
@@ -587,11 +587,11 @@ class address(_Section):
 
         :return: list
         """
-        self.prefix = _Attribute(name='prefix', value=prefix)
-        self.distribution = _Attribute(name='distribution', value=distribution)
-        self.waypoint = _Attribute(name='waypoint', value=waypoint)
-        self.ingressPhase = _Attribute(name='ingressPhase', value=ingressPhase)
-        self.egressPhase = _Attribute(name='egressPhase', value=egressPhase)
+        self.prefix = prefix
+        self.distribution = distribution
+        self.waypoint = waypoint
+        self.ingressPhase = ingressPhase
+        self.egressPhase = egressPhase
 
 
 class linkRoute(_Section):
@@ -614,11 +614,11 @@ class linkRoute(_Section):
         :return:
         """
 
-        self.prefix = _Attribute(name='prefix', value=prefix)
-        self.containerId = _Attribute(name='containerId', value=containerId)
-        self.connection = _Attribute(name='connection', value=connection)
-        self.distribution = _Attribute(name='distribution', value=distribution)
-        self.dir = _Attribute(name='dir', value=dir)
+        self.prefix = prefix
+        self.containerId = containerId
+        self.connection = connection
+        self.distribution = distribution
+        self.dir = dir
 
 
 class autoLink(_Section):
@@ -649,11 +649,11 @@ class autoLink(_Section):
         :return: list
         """
 
-        self.addr = _Attribute(name='addr', value=addr)
-        self.dir = _Attribute(name='dir', value=dir)
-        self.phase = _Attribute(name='phase', value=phase)
-        self.containerId = _Attribute(name='containerId', value=containerId)
-        self.connection = _Attribute(name='connection', value=connection)
+        self.addr = addr
+        self.dir = dir
+        self.phase = phase
+        self.containerId = containerId
+        self.connection = connection
 
 
 class policy(_Section):
@@ -690,11 +690,11 @@ class policy(_Section):
         :return:
         """
 
-        self.maximumConnections = _Attribute(name='maximumConnections', value=maximumConnections)
-        self.enableAccessRules = _Attribute(name='enableAccessRules', value=enableAccessRules)
-        self.policyFolder = _Attribute(name='policyFolder', value=policyFolder)
-        self.defaultApplication = _Attribute(name='defaultApplication', value=defaultApplication)
-        self.defaultApplicationEnabled = _Attribute(name='defaultApplicationEnabled', value=defaultApplicationEnabled)
+        self.maximumConnections = maximumConnections
+        self.enableAccessRules = enableAccessRules
+        self.policyFolder = policyFolder
+        self.defaultApplication = defaultApplication
+        self.defaultApplicationEnabled = defaultApplicationEnabled
 
 
 class policyRuleset(_Section):
@@ -732,11 +732,11 @@ class policyRuleset(_Section):
         :return: list
         """
 
-        self.maxConnections = _Attribute(name='maxConnections', value=maxConnections)
-        self.maxConnPerUser = _Attribute(name='maxConnPerUser', value=maxConnPerUser)
-        self.maxConnPerHost = _Attribute(name='maxConnPerHost', value=maxConnPerHost)
-        self.userGroups = _Attribute(name='userGroups', value=userGroups)
-        self.ingressHostGroups = _Attribute(name='ingressHostGroups', value=ingressHostGroups)
-        self.ingressPolicies = _Attribute(name='ingressPolicies', value=ingressPolicies)
-        self.connectionAllowDefault = _Attribute(name='connectionAllowDefault', value=connectionAllowDefault)
-        self.settings = _Attribute(name='settings', value=settings)
+        self.maxConnections = maxConnections
+        self.maxConnPerUser = maxConnPerUser
+        self.maxConnPerHost = maxConnPerHost
+        self.userGroups = userGroups
+        self.ingressHostGroups = ingressHostGroups
+        self.ingressPolicies = ingressPolicies
+        self.connectionAllowDefault = connectionAllowDefault
+        self.settings = settings
@@ -0,0 +1,211 @@
+"""
+Generates router network topologies (full mesh, ring, hub and spoke, interior and edge tiers),
+emitting one Config per router with consistent listener/connector pairs, inter-router costs
+and port allocation. Connections are produced lazily while each router config is built,
+so configs can be streamed to disk one at a time.
+"""
+
+import os
+from typing import Callable, Iterator, List, Tuple, Union
+
+from . import Config
+from .sections import connector, listener, router
+
+# Cost of an inter-router connection: fixed value or function(from_router, to_router)
+Cost = Union[int, Callable[['TopologyRouter', 'TopologyRouter'], int], None]
+
+
+class TopologyRouter(object):
+    """
+    A router of the topology, with its allocated host and ports.
+    """
+    __slots__ = ('index', 'id', 'mode', 'host', 'port', 'inter_router_port', 'edge_port')
+
+    def __init__(self, index: int, router_id: str, mode: str, host: str):
+        self.index = index
+        self.id = router_id
+        self.mode = mode
+        self.host = host
+        self.port = None  # type: int
+        self.inter_router_port = None  # type: int
+        self.edge_port = None  # type: int
+
+    def __repr__(self):
+        return "TopologyRouter(%s %s %s:%s)" % (self.id, self.mode, self.host, self.port)
+
+
+class Topology(object):
+    """
+    Base router network topology. Implementations define to which routers
+    each router connects, through connections().
+    Routers are spread across the given hosts (round robin) and ports are
+    allocated sequentially per host, starting at base_port.
+    """
+    def __init__(self, hosts: List[str]=None, base_port: int=5672, cost: Cost=None, id_prefix: str='Router.'):
+        self.hosts = hosts or ['127.0.0.1']
+        self.base_port = base_port
+        self.cost = cost
+        self.id_prefix = id_prefix
+        self.routers = []  # type: List[TopologyRouter]
+        self._next_port = {}
+
+    def add_router(self, mode: str='interior', router_id: str=None) -> TopologyRouter:
+        """
+        Adds a router to the topology, allocating its host and ports.
+        :param mode: interior or edge
+        :param router_id:
+        :return:
+        """
+        index = len(self.routers)
+        host = self.hosts[index % len(self.hosts)]
+        topology_router = TopologyRouter(index, router_id or '%s%d' % (self.id_prefix, index), mode, host)
+        topology_router.port = self._allocate_port(host)
+        if mode == 'interior':
+            topology_router.inter_router_port = self._allocate_port(host)
+        self.routers.append(topology_router)
+        return topology_router
+
+    def _allocate_port(self, host: str) -> int:
+        port = self._next_port.get(host, self.base_port)
+        self._next_port[host] = port + 1
+        return port
+
+    def connections(self, topology_router: TopologyRouter) -> Iterator[Tuple[TopologyRouter, str]]:
+        """
+        Yields the routers (and connection role) that the given router connects to.
+        Each link must be yielded by only one of its ends.
+        :param topology_router:
+        :return:
+        """
+        raise NotImplementedError()
+
+    def link_cost(self, from_router: TopologyRouter, to_router: TopologyRouter):
+        if callable(self.cost):
+            return self.cost(from_router, to_router)
+        return self.cost
+
+    def config(self, topology_router: TopologyRouter) -> Config:
+        """
+        Builds the configuration of the given router.
+        :param topology_router:
+        :return:
+        """
+        config = Config()
+        config.add_section(router(id=topology_router.id, mode=topology_router.mode))
+        config.add_section(listener(host='0.0.0.0', port=topology_router.port, role='normal'))
+        if topology_router.inter_router_port:
+            config.add_section(listener(host='0.0.0.0', port=topology_router.inter_router_port,
+                                        role='inter-router'))
+        if topology_router.edge_port:
+            config.add_section(listener(host='0.0.0.0', port=topology_router.edge_port, role='edge'))
+
+        for peer, role in self.connections(topology_router):
+            port = peer.edge_port if role == 'edge' else peer.inter_router_port
+            cost = self.link_cost(topology_router, peer) if role == 'inter-router' else None
+            config.add_section(connector(name='%s-%s' % (topology_router.id, peer.id), host=peer.host, port=port,
+                                         role=role, cost=cost))
+        return config
+
+    def configs(self) -> Iterator[Tuple[TopologyRouter, Config]]:
+        """
+        Lazily yields every router with its configuration.
+        :return:
+        """
+        for topology_router in self.routers:
+            yield topology_router, self.config(topology_router)
+
+    def save(self, directory: str, suffix: str='.conf') -> List[str]:
+        """
+        Streams the configuration of every router to directory, named by router id.
+        Only one router configuration is kept in memory at a time.
+        :param directory:
+        :param suffix:
+        :return: List of written paths
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for topology_router, config in self.configs():
+            path = os.path.join(directory, topology_router.id + suffix)
+            config.save(path)
+            paths.append(path)
+        return paths
+
+
+class FullMesh(Topology):
+    """
+    Every interior router connects to all the others (each router connects to the ones created before it).
+    """
+    def __init__(self, routers: int, **kwargs):
+        super(FullMesh, self).__init__(**kwargs)
+        for _ in range(routers):
+            self.add_router()
+
+    def connections(self, topology_router: TopologyRouter):
+        for peer in self.routers[:topology_router.index]:
+            yield peer, 'inter-router'
+
+
+class Ring(Topology):
+    """
+    Each interior router connects to the previous one, and the first one closes the ring.
+    """
+    def __init__(self, routers: int, **kwargs):
+        super(Ring, self).__init__(**kwargs)
+        for _ in range(routers):
+            self.add_router()
+
+    def connections(self, topology_router: TopologyRouter):
+        if topology_router.index > 0:
+            yield self.routers[topology_router.index - 1], 'inter-router'
+        elif len(self.routers) > 2:
+            yield self.routers[-1], 'inter-router'
+
+
+class HubAndSpoke(Topology):
+    """
+    Spoke routers connect to one of the hubs (round robin), hubs are fully meshed.
+    """
+    def __init__(self, routers: int, hubs: int=1, **kwargs):
+        if hubs < 1:
+            raise ValueError('At least one hub is required (hubs=%d)' % hubs)
+        super(HubAndSpoke, self).__init__(**kwargs)
+        self.hubs = hubs
+        for index in range(routers):
+            self.add_router(router_id='%s%s%d' % (self.id_prefix, 'Hub' if index < hubs else 'Spoke', index))
+
+    def connections(self, topology_router: TopologyRouter):
+        if topology_router.index < self.hubs:
+            for peer in self.routers[:topology_router.index]:
+                yield peer, 'inter-router'
+        else:
+            yield self.routers[topology_router.index % self.hubs], 'inter-router'
+
+
+class Tiered(Topology):
+    """
+    Interior routers (full mesh or ring) with edge routers connected to them (round robin).
+    """
+    def __init__(self, interior: int, edges: int, interior_ring: bool=False, **kwargs):
+        if edges > 0 and interior < 1:
+            raise ValueError('Edge routers need at least one interior router (interior=%d)' % interior)
+        super(Tiered, self).__init__(**kwargs)
+        self.interior = interior
+        self.interior_ring = interior_ring
+        for index in range(interior):
+            interior_router = self.add_router(router_id='%sI%d' % (self.id_prefix, index))
+            if edges:
+                interior_router.edge_port = self._allocate_port(interior_router.host)
+        for index in range(edges):
+            self.add_router(mode='edge', router_id='%sE%d' % (self.id_prefix, index))
+
+    def connections(self, topology_router: TopologyRouter):
+        index = topology_router.index
+        if topology_router.mode == 'edge':
+            yield self.routers[(index - self.interior) % self.interior], 'edge'
+        elif not self.interior_ring:
+            for peer in self.routers[:index]:
+                yield peer, 'inter-router'
+        elif index > 0:
+            yield self.routers[index - 1], 'inter-router'
+        elif self.interior > 2:
+            yield self.routers[self.interior - 1], 'inter-router'
@@ -1,13 +1,21 @@
+import io
+
 from autologging import logged, traced
 from iqa_common.executor import Executor
 from messaging_abstract.component.server.router import Router
 from messaging_abstract.component.server.service import Service
 from messaging_abstract.node.node import Node
 
-from .management import QDManage, QDStat
+from messaging_components.config.config import IQAConfigurationException
+from messaging_components.node.files import read_file, write_file
+from .management import AllocatorProfiler, QDManage, QDStat
 from .config import Config
+from .config.diff import ConfigDiff, config_from_live_entities, query_live_entities
+from .config.parser import parse
 from .log import Log
 
+CONFIG_FILE = '/etc/qpid-dispatch/qdrouterd.conf'
+
 
 @logged
 @traced
@@ -25,34 +33,81 @@ class Dispatch(Router):
         self.qdmanage = QDManage()
         self.qdstat = QDStat()
         self.config = Config()  # TODO - pass config as param to constructor
-        self.log = Log()
+        self.log = Log(node=node)
         self._version = None
 
-    @staticmethod
-    def config_refresh_remote_to_testsuite():
-        # TODO - This seems like a candidate to be part of Config class
+    def config_refresh_remote_to_testsuite(self):
         """
         Syncing router config from remote to test_suite
         :return:
         """
-        pass
+        self.config = self.config_dump()
+
+    def config_dump(self) -> Config:
+        """
+        Dump (remote) router configuration and create Config(),
+        based on the entities that are currently configured on the running router.
+        :return:
+        """
+        return config_from_live_entities(query_live_entities(self._get_management_client()))
+
+    def config_read(self, config_src: str=CONFIG_FILE) -> Config:
+        """
+        Reads and parses the router configuration file from the router node.
+        :param config_src: Path of the configuration file on the router node
+        :return:
+        """
+        content = read_file(self.node, config_src)
+        if content is None:
+            raise IQAConfigurationException('Unable to read %s from %s' % (config_src, self.node.hostname))
+        return parse(io.StringIO(content), source=config_src)
+
+    def set_config(self, config_src: Config, config_dst: str=CONFIG_FILE) -> ConfigDiff:
+        """
+        Set configuration from config_src into the running router.
+        Only the difference against the live router entities is applied through management.
+        The whole configuration is also written to config_dst and, in case some change
+        cannot be applied at runtime, the router service is restarted.
+        :param config_src: Desired configuration
+        :param config_dst: Path of the configuration file on the router node
+        :return: The computed difference
+        """
+        manage = self._get_management_client()
+        diff = ConfigDiff.compute(config_src, query_live_entities(manage))
+        self.__log.info("Applying configuration to %s: %s" % (self.name, diff))
+
+        if config_dst:
+            # Nothing is applied if the file cannot be written (a restart would load the stale file)
+            execution = write_file(self.node, config_dst, config_src.get_config())
+            if not execution.completed_successfully():
+                raise IQAConfigurationException('Unable to write configuration file %s on %s'
+                                                % (config_dst, self.node.hostname))
+
+        if diff.restart_required:
+            self.__log.info("Restarting %s due to changes not applicable at runtime: %s" % (self.name, diff.restart))
+            self.service.restart()
+        else:
+            failures = [result for result in diff.apply(manage) if not result.success]
+            if failures:
+                raise IQAConfigurationException('Unable to apply %d configuration changes on %s: %s'
+                                                % (len(failures), self.name, failures))
+
+        self.config = config_src
+        return diff
 
-    @staticmethod
-    def config_dump():
-        # TODO - This seems like a candidate to be part of Config class
+    def allocator_profiler(self) -> AllocatorProfiler:
         """
-        Dump (remote) router configuration file and create Config()
+        Creates a memory profiler that samples the allocator statistics of this router.
         :return:
         """
+        return AllocatorProfiler(self._get_management_client())
 
-    def set_config(self, config_src, config_dst):
-        # TODO - Need to describe the purpose of this method (unclear at the moment)
+    def _get_management_client(self) -> QDManage:
         """
-        Set configuration from
-        :param config_src:
-        :param config_dst:
+        Creates a new management client connected to this router.
         :return:
         """
+        return QDManage(host=self.node.get_ip(), port=self.port, router=self)
 
     @property
     def version(self):
@@ -1,8 +1,220 @@
-# Getting log from current service ran
-# journalctl -u qdrouterd --since "$(echo $(systemctl show -p ActiveEnterTimestamp qdrouterd) | awk '{print $2 $3}')" --no-pager
-#
-#
+"""
+Incremental reader for router logs, either from the systemd journal or from a log file
+on the router node. Only new lines are fetched on each refresh (from the last journal
+cursor or file offset), parsed into LogRecord instances and kept in a bounded buffer
+indexed by module and level.
+"""
+
+import logging
+import re
+import shlex
+from collections import deque
+from datetime import datetime
+
+from iqa_common.executor import Command
+from messaging_abstract.node.node import Node
+
+# i.e.: 2019-03-07 10:12:34.123456 -0500 SERVER (info) Container Name: Router.A
+_RECORD = re.compile(r'^(?P<timestamp>.*?)\s*\b(?P<module>[A-Z][A-Z_]*) '
+                     r'\((?P<level>trace|debug|info|notice|warning|error|critical)\) (?P<message>.*)$')
+_TIMESTAMP_FORMATS = ('%Y-%m-%d %H:%M:%S.%f %z', '%a %b %d %H:%M:%S %Y')
+_CURSOR_PREFIX = '-- cursor: '
+_MARKER_PREFIX = '-- '
+
+
+class LogRecord:
+    """
+    A parsed router log line.
+    """
+    __slots__ = ('timestamp', 'module', 'level', 'message')
+
+    def __init__(self, timestamp: str, module: str, level: str, message: str):
+        self.timestamp = timestamp
+        self.module = module
+        self.level = level
+        self.message = message
+
+    @property
+    def datetime(self) -> datetime:
+        """
+        Timestamp as datetime, or None if its format is not recognized.
+        :return:
+        """
+        timestamp = ' '.join(self.timestamp.split())
+        for timestamp_format in _TIMESTAMP_FORMATS:
+            try:
+                return datetime.strptime(timestamp, timestamp_format)
+            except ValueError:
+                continue
+        return None
+
+    def __repr__(self):
+        return "%s %s (%s) %s" % (self.timestamp, self.module, self.level, self.message)
 
 
 class Log:
-    pass
\ No newline at end of file
+    """
+    Router log, read incrementally from the journal of the given systemd unit,
+    or from path (when defined) on the router node.
+    """
+    def __init__(self, node: Node=None, path: str=None, unit: str='qdrouterd', max_records: int=100000,
+                 timeout: int=60):
+        self.node = node
+        self.path = path
+        self.unit = unit
+        self.timeout = timeout
+        self.cursor = None  # type: str
+        self.offset = 0
+        self._records = deque()
+        self._by_module = {}
+        self._by_level = {}
+        self._max_records = max_records
+        self._logger = logging.getLogger(self.__module__)
+
+    def refresh(self, store: bool=True) -> list:
+        """
+        Reads the log lines written since the last refresh.
+        When no refresh has been done yet, the journal is read since the unit was started
+        (or the whole file is read).
+        :param store: Keep the new records in the buffer (False only moves the position forward)
+        :return: New records
+        """
+        if self.node is None:
+            raise ValueError('Log has no node to read from')
+
+        if self.path:
+            lines = self._read_file()
+        else:
+            lines = self._read_journal()
+
+        return self.feed(lines, store)
+
+    def _execute(self, script: str) -> str:
+        execution = self.node.execute(Command(['sh', '-c', script], stdout=True, stderr=True,
+                                              timeout=self.timeout))
+        execution.wait()
+        if not execution.completed_successfully():
+            self._logger.warning("Unable to read log from %s" % self.node.hostname)
+            return ''
+        return execution.read_stdout() or ''
+
+    def _read_journal(self) -> list:
+        unit = shlex.quote(self.unit)
+        script = 'journalctl -u %s --no-pager -q -o cat --show-cursor' % unit
+        if self.cursor:
+            script += ' --after-cursor=%s' % shlex.quote(self.cursor)
+        else:
+            script += (' --since "$(systemctl show -p ActiveEnterTimestamp --value %s | awk \'{print $2, $3}\')"'
+                       % unit)
+
+        lines = self._execute(script).splitlines()
+        if lines and lines[-1].startswith(_CURSOR_PREFIX):
+            self.cursor = lines.pop()[len(_CURSOR_PREFIX):]
+        # journalctl markers (i.e. -- No entries --, -- Boot ... --) are not part of the log
+        return [line for line in lines if not line.startswith(_MARKER_PREFIX)]
+
+    def _read_file(self) -> list:
+        content = self._execute('tail -c +%d %s' % (self.offset + 1, shlex.quote(self.path)))
+        lines = content.splitlines(keepends=True)
+        # The last line might still be being written, leave it for the next refresh
+        if lines and not lines[-1].endswith('\n'):
+            lines.pop()
+        self.offset += sum(len(line.encode()) for line in lines)
+        return lines
+
+    def feed(self, lines, store: bool=True) -> list:
+        """
+        Parses the given log lines, adding the records to the buffer.
+        Lines that are not log records (i.e. backtraces) are appended to the previous record message.
+        :param lines:
+        :param store:
+        :return: New records
+        """
+        records = []
+        last = self._records[-1] if self._records else None
+        for line in lines:
+            line = line.rstrip('\n')
+            match = _RECORD.match(line)
+            if match is None:
+                if last is not None and line:
+                    last.message += '\n' + line
+                continue
+            last = LogRecord(**match.groupdict())
+            records.append(last)
+            if store:
+                self._store(last)
+        return records
+
+    def _store(self, record: LogRecord):
+        if len(self._records) >= self._max_records:
+            # Records are indexed in the same order as the buffer, so the oldest one is leftmost everywhere
+            evicted = self._records.popleft()
+            self._by_module[evicted.module].popleft()
+            self._by_level[evicted.level].popleft()
+        self._records.append(record)
+        self._by_module.setdefault(record.module, deque()).append(record)
+        self._by_level.setdefault(record.level, deque()).append(record)
+
+    def records(self, module: str=None, level: str=None) -> list:
+        """
+        Returns the buffered records, optionally filtered by module and level.
+        :param module:
+        :param level:
+        :return:
+        """
+        if module is None and level is None:
+            return list(self._records)
+        if level is None:
+            return list(self._by_module.get(module, ()))
+        if module is None:
+            return list(self._by_level.get(level, ()))
+
+        by_module = self._by_module.get(module, ())
+        by_level = self._by_level.get(level, ())
+        if len(by_module) <= len(by_level):
+            return [record for record in by_module if record.level == level]
+        return [record for record in by_level if record.module == module]
+
+    def count(self, module: str=None, level: str=None) -> int:
+        """
+        Returns the number of buffered records with the given module and level.
+        :param module:
+        :param level:
+        :return:
+        """
+        if module is None and level is None:
+            return len(self._records)
+        if level is None:
+            return len(self._by_module.get(module, ()))
+        if module is None:
+            return len(self._by_level.get(level, ()))
+        return len(self.records(module, level))
+
+    def find(self, pattern: str, module: str=None, level: str=None) -> list:
+        """
+        Returns the buffered records whose message matches the regular expression.
+        :param pattern:
+        :param module:
+        :param level:
+        :return:
+        """
+        regex = re.compile(pattern)
+        return [record for record in self.records(module, level) if regex.search(record.message)]
+
+    def clear(self):
+        """
+        Clears the buffered records, keeping the read position.
+        :return:
+        """
+        self._records.clear()
+        self._by_module.clear()
+        self._by_level.clear()
+
+    def reset(self):
+        """
+        Clears the buffered records and the read position (i.e. after the log file is rotated).
+        :return:
+        """
+        self.clear()
+        self.cursor = None
+        self.offset = 0
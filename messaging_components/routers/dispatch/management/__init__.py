@@ -1,3 +1,4 @@
-from .qdmanage import QDManage
+from .allocator import AllocatorProfiler
+from .qdmanage import QDManage, QDManageResult
 from .qdstat import QDStat
 from .query import RouterQuery
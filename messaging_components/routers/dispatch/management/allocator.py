@@ -0,0 +1,239 @@
+"""
+Memory profiling based on the router allocator statistics
+(org.apache.qpid.dispatch.allocator). Samples are taken over time and
+the bytes held by each allocated type are fit to a linear trend, so types
+that keep growing while the router is under load can be flagged as leaking.
+"""
+
+import json
+import logging
+import threading
+import time
+from array import array
+from typing import List
+
+
+def allocated_bytes(record) -> int:
+    """
+    Bytes currently allocated from the heap for the type of the given allocator record.
+    :param record:
+    :return:
+    """
+    return record.typeSize * (record.totalAllocFromHeap - record.totalFreeToHeap)
+
+
+class AllocatorSeries:
+    """
+    Allocated bytes of a single type over time.
+    """
+    __slots__ = ('type_name', 'type_size', 'times', 'values')
+
+    def __init__(self, type_name: str, type_size: int):
+        self.type_name = type_name
+        self.type_size = type_size
+        self.times = array('d')
+        self.values = array('q')
+
+    def add(self, timestamp: float, value: int):
+        self.times.append(timestamp)
+        self.values.append(value)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class AllocatorTrend:
+    """
+    Linear trend of the allocated bytes of a type.
+    """
+    __slots__ = ('type_name', 'slope', 'r_squared', 'growth', 'increasing', 'leaking')
+
+    def __init__(self, type_name: str, slope: float, r_squared: float, growth: int, increasing: float,
+                 leaking: bool):
+        self.type_name = type_name
+        self.slope = slope  # bytes per second
+        self.r_squared = r_squared  # goodness of the linear fit
+        self.growth = growth  # bytes between first and last samples
+        self.increasing = increasing  # ratio of samples that grew
+        self.leaking = leaking
+
+    def __repr__(self):
+        return "AllocatorTrend(%s slope=%.1fB/s r2=%.2f growth=%dB leaking=%s)" % (
+            self.type_name, self.slope, self.r_squared, self.growth, self.leaking)
+
+
+def linear_fit(times, values) -> tuple:
+    """
+    Least squares fit of values over times.
+    :param times:
+    :param values:
+    :return: (slope, r_squared)
+    """
+    count = len(values)
+    if count < 2:
+        return 0.0, 0.0
+
+    mean_time = sum(times) / count
+    mean_value = sum(values) / count
+    covariance = variance_time = variance_value = 0.0
+    for timestamp, value in zip(times, values):
+        delta_time = timestamp - mean_time
+        delta_value = value - mean_value
+        covariance += delta_time * delta_value
+        variance_time += delta_time * delta_time
+        variance_value += delta_value * delta_value
+
+    if not variance_time:
+        return 0.0, 0.0
+    slope = covariance / variance_time
+    if not variance_value:
+        return slope, 1.0
+    return slope, covariance * covariance / (variance_time * variance_value)
+
+
+class AllocatorProfiler:
+    """
+    Samples the allocator statistics of a router through a RouterQuery (or QDManage) instance.
+    """
+    def __init__(self, query=None):
+        self.query = query
+        self.series = {}  # type: dict  # type_name: AllocatorSeries
+        self._thread = None
+        self._stop = threading.Event()
+        self._logger = logging.getLogger(self.__module__)
+
+    def sample(self, records: list=None, timestamp: float=None):
+        """
+        Stores a sample of allocated bytes for every type.
+        :param records: Allocator records (queried from the router when not provided)
+        :param timestamp: Sample time (defaults to now)
+        :return:
+        """
+        if records is None:
+            records = self.query.allocator()
+        if timestamp is None:
+            timestamp = time.time()
+
+        for record in records:
+            series = self.series.get(record.typeName)
+            if series is None:
+                series = self.series[record.typeName] = AllocatorSeries(record.typeName, record.typeSize)
+            series.add(timestamp, allocated_bytes(record))
+
+    def start(self, interval: float=5.0):
+        """
+        Starts sampling periodically in a background thread.
+        :param interval: Seconds between samples
+        :return:
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def _run(self, interval: float):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as ex:
+                self._logger.warning("Unable to sample allocator statistics: %s" % ex)
+            self._stop.wait(interval)
+
+    def stop(self):
+        """
+        Stops sampling in background.
+        :return:
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def trend(self, type_name: str, skip: int=0, min_slope: float=0.0, min_growth: int=0,
+              min_r_squared: float=0.8, min_increasing: float=0.5) -> AllocatorTrend:
+        """
+        Computes the trend of the given type.
+        A type is considered leaking when it grows steadily: the fitted slope and total growth
+        exceed the given minimums, the fit is good (r squared) and most samples do not decrease.
+        :param type_name:
+        :param skip: Samples to ignore at the beginning (warm up)
+        :param min_slope: Minimum bytes per second
+        :param min_growth: Minimum bytes grown
+        :param min_r_squared:
+        :param min_increasing: Minimum ratio of samples that grew or stayed the same
+        :return:
+        """
+        series = self.series[type_name]
+        times = series.times[skip:]
+        values = series.values[skip:]
+        slope, r_squared = linear_fit(times, values)
+
+        growth = values[-1] - values[0] if values else 0
+        steps = len(values) - 1
+        increasing = sum(1 for previous, current in zip(values, values[1:]) if current >= previous) / steps \
+            if steps > 0 else 0.0
+
+        leaking = steps > 0 and slope > min_slope and growth > min_growth \
+            and r_squared >= min_r_squared and increasing >= min_increasing
+        return AllocatorTrend(type_name, slope, r_squared, growth, increasing, leaking)
+
+    def trends(self, **kwargs) -> List[AllocatorTrend]:
+        """
+        Computes the trend of all types, sorted by growth rate (highest first).
+        :param kwargs: See: trend()
+        :return:
+        """
+        trends = [self.trend(type_name, **kwargs) for type_name in self.series]
+        return sorted(trends, key=lambda trend: trend.slope, reverse=True)
+
+    def leaks(self, **kwargs) -> List[AllocatorTrend]:
+        """
+        Returns the trends of the types that are considered leaking.
+        :param kwargs: See: trend()
+        :return:
+        """
+        return [trend for trend in self.trends(**kwargs) if trend.leaking]
+
+    def export(self) -> dict:
+        """
+        Exports the samples compactly: timestamps (in milliseconds) and values are delta encoded.
+        :return:
+        """
+        types = {}
+        for type_name, series in self.series.items():
+            times = [int(round(timestamp * 1000)) for timestamp in series.times]
+            types[type_name] = {
+                'size': series.type_size,
+                'start': times[0] if times else 0,
+                'times': [current - previous for previous, current in zip(times, times[1:])],
+                'values': [series.values[0]] + [current - previous for previous, current
+                                                in zip(series.values, series.values[1:])] if times else [],
+            }
+        return {'version': 1, 'types': types}
+
+    def save(self, path: str):
+        """
+        Saves exported samples as JSON.
+        :param path:
+        :return:
+        """
+        with open(path, 'w') as stream:
+            json.dump(self.export(), stream, separators=(',', ':'))
+
+    @staticmethod
+    def load(exported: dict) -> 'AllocatorProfiler':
+        """
+        Creates a profiler from exported samples (see: export()).
+        :param exported:
+        :return:
+        """
+        profiler = AllocatorProfiler()
+        for type_name, data in exported['types'].items():
+            series = profiler.series[type_name] = AllocatorSeries(type_name, data['size'])
+            timestamp = data['start']
+            value = 0
+            for index, value_delta in enumerate(data['values']):
+                if index:
+                    timestamp += data['times'][index - 1]
+                value += value_delta
+                series.add(timestamp / 1000.0, value)
+        return profiler
@@ -1,6 +1,243 @@
-# @TODO QDManage implementation
+"""
+Native implementation of qdmanage operations (CREATE, UPDATE, DELETE),
+talking the AMQP management protocol directly to the router's $management node.
+Bulk operations are pipelined over a single connection, instead of spawning
+one qdmanage process per entity.
+"""
 
+from collections.abc import Mapping
+from typing import Iterable, List, Union
 
-class QDManage:
-    def __init__(self, ):
-        pass
+import proton
+from messaging_abstract.component import Router
+from proton import Timeout
+from proton.reactor import AtMostOnce
+from proton.utils import BlockingConnection
+
+from ..config import _Section
+from .query import RouterQuery
+
+# Management entity types related with each configuration section
+SECTION_ENTITY_TYPES = {
+    'router': 'org.apache.qpid.dispatch.router',
+    'listener': 'org.apache.qpid.dispatch.listener',
+    'connector': 'org.apache.qpid.dispatch.connector',
+    'sslProfile': 'org.apache.qpid.dispatch.sslProfile',
+    'log': 'org.apache.qpid.dispatch.log',
+    'address': 'org.apache.qpid.dispatch.router.config.address',
+    'linkRoute': 'org.apache.qpid.dispatch.router.config.linkRoute',
+    'autoLink': 'org.apache.qpid.dispatch.router.config.autoLink',
+    'policy': 'org.apache.qpid.dispatch.policy',
+}
+
+
+class QDManageResult(object):
+    """
+    Outcome of a single management operation against one entity.
+    """
+    def __init__(self, operation: str, entity_type: str, name: str=None, identity: str=None):
+        self.operation = operation
+        self.entity_type = entity_type
+        self.name = name
+        self.identity = identity
+        self.status_code = None  # type: int
+        self.status_description = None  # type: str
+        self.body = None  # type: dict
+
+    @property
+    def success(self) -> bool:
+        return self.status_code is not None and 200 <= self.status_code < 300
+
+    def __repr__(self):
+        return "QDManageResult(%s %s name=%s status=%s %s)" % (self.operation, self.entity_type, self.name,
+                                                              self.status_code, self.status_description)
+
+
+class QDManage(RouterQuery):
+    """
+    Provides CREATE, UPDATE and DELETE management operations against the Dispatch Router,
+    besides the QUERY operations inherited from RouterQuery.
+
+    Entities can be given as sections from the config module (address, linkRoute, autoLink, ...)
+    or as plain dicts of attributes. Bulk operations send up to `window` requests before
+    waiting for the related responses, all through the same connection.
+    """
+    def __init__(self, host="0.0.0.0", port=5672, router: Router=None, window: int=500, timeout: int=60):
+        super(QDManage, self).__init__(host, port, router)
+        self.window = window
+        self.timeout = timeout
+
+    def create(self, entity: Union[_Section, dict], entity_type: str=None, name: str=None) -> QDManageResult:
+        """
+        Creates a single entity.
+        :param entity: Section instance or dict of attributes
+        :param entity_type: Required when entity is a dict
+        :param name: Name of the new entity (optional)
+        :return:
+        """
+        result, body = self._entity_request('CREATE', entity, entity_type)
+        if name:
+            result.name = body['name'] = name
+        return self._execute([(result, body)])[0]
+
+    def create_many(self, entities: Iterable[Union[_Section, dict]], entity_type: str=None) -> List[QDManageResult]:
+        """
+        Creates all given entities, pipelining requests over one connection.
+        :param entities: Section instances or dicts of attributes
+        :param entity_type: Required when entities are dicts
+        :return: One result per entity (same order)
+        """
+        return self._execute([self._entity_request('CREATE', entity, entity_type) for entity in entities])
+
+    def update(self, entity: Union[_Section, dict], entity_type: str=None) -> QDManageResult:
+        """
+        Updates a single entity, which is identified by its name attribute.
+        :param entity:
+        :param entity_type:
+        :return:
+        """
+        return self.update_many([entity], entity_type)[0]
+
+    def update_many(self, entities: Iterable[Union[_Section, dict]], entity_type: str=None) -> List[QDManageResult]:
+        """
+        Updates all given entities (identified by their name attribute).
+        :param entities:
+        :param entity_type:
+        :return: One result per entity (same order)
+        """
+        return self._execute([self._entity_request('UPDATE', entity, entity_type) for entity in entities])
+
+    def delete(self, entity, entity_type: str=None) -> QDManageResult:
+        """
+        Deletes a single entity.
+        :param entity: Entity name, record returned by a query or a named section
+        :param entity_type:
+        :return:
+        """
+        return self.delete_many([entity], entity_type)[0]
+
+    def delete_many(self, entities: Iterable, entity_type: str=None) -> List[QDManageResult]:
+        """
+        Deletes all given entities. Each entity can be its name, a record returned
+        by RouterQuery or a dict (deleted by identity, or name) or a section with a name attribute.
+        :param entities:
+        :param entity_type:
+        :return: One result per entity (same order)
+        """
+        requests = []
+        for entity in entities:
+            if isinstance(entity, _Section):
+                result, _ = self._entity_request('DELETE', entity, entity_type)
+            elif isinstance(entity, str):
+                result = QDManageResult('DELETE', entity_type, name=entity)
+            elif isinstance(entity, Mapping):
+                result = QDManageResult('DELETE', entity_type, name=entity.get('name'),
+                                        identity=entity.get('identity'))
+            else:
+                result = QDManageResult('DELETE', entity_type, name=getattr(entity, 'name', None),
+                                        identity=getattr(entity, 'identity', None))
+            requests.append((result, {}))
+
+        return self._execute(requests)
+
+    @staticmethod
+    def _entity_request(operation: str, entity: Union[_Section, dict], entity_type: str=None) -> tuple:
+        """
+        Returns the result (holding the request properties) and the body
+        of a management request for the given entity.
+        :param operation:
+        :param entity:
+        :param entity_type:
+        :return:
+        """
+        if isinstance(entity, _Section):
+            entity_type = entity_type or SECTION_ENTITY_TYPES.get(entity.section_name)
+            attributes = entity.to_dict()
+        else:
+            attributes = dict(entity)
+
+        if not entity_type:
+            raise ValueError('Unable to determine entity type for: %s' % type(entity).__name__)
+
+        result = QDManageResult(operation, entity_type, name=attributes.get('name'),
+                                identity=attributes.pop('identity', None))
+        return result, attributes
+
+    def _execute(self, requests: list) -> List[QDManageResult]:
+        """
+        Sends all requests through a single connection, in batches of self.window
+        outstanding requests, and updates each result with the related response.
+        When responses time out, the remaining requests are not sent (and fail).
+        :param requests: list of (QDManageResult, body)
+        :return:
+        """
+        results = [result for result, _ in requests]
+        if not requests:
+            return results
+
+        url = self._management_url()
+        self._logger.info("Sending %d %s requests to router at: %s" % (len(requests), results[0].operation, url))
+        self._logger.debug("Connection options: %s" % self._connection_options)
+
+        connection = BlockingConnection(url, timeout=self.timeout, **self._connection_options)
+        try:
+            # Responses arrive through a dynamic reply queue, requests are sent pre-settled
+            receiver = connection.create_receiver(None, dynamic=True, credit=self.window)
+            reply_to = receiver.remote_source.address
+            sender = connection.create_sender(url.path, options=AtMostOnce())
+
+            for start in range(0, len(requests), self.window):
+                pending = {}
+                for correlation_id, (result, body) in enumerate(requests[start:start + self.window], start):
+                    sender.send(self._request_message(result, body, reply_to, correlation_id))
+                    pending[correlation_id] = result
+
+                while pending:
+                    try:
+                        response = receiver.receive(timeout=self.timeout)
+                    except Timeout:
+                        unsent = results[start + self.window:]
+                        self._logger.error("Timed out waiting for %d management responses (%d requests not sent)"
+                                           % (len(pending), len(unsent)))
+                        for result in pending.values():
+                            result.status_description = 'Timed out waiting for response'
+                        for result in unsent:
+                            result.status_description = 'Not sent, timed out waiting for previous responses'
+                        return results
+                    receiver.accept()
+
+                    result = pending.pop(response.correlation_id, None)
+                    if result is None:
+                        continue
+                    result.status_code = response.properties.get('statusCode')
+                    result.status_description = response.properties.get('statusDescription')
+                    result.body = response.body
+        finally:
+            connection.close()
+
+        failures = [result for result in results if not result.success]
+        if failures:
+            self._logger.warning("%d of %d management requests failed (first: %s)"
+                                 % (len(failures), len(results), failures[0]))
+
+        return results
+
+    @staticmethod
+    def _request_message(result: QDManageResult, body: dict, reply_to: str, correlation_id: int) -> proton.Message:
+        """
+        Builds the management request message.
+        :param result:
+        :param body:
+        :param reply_to:
+        :param correlation_id:
+        :return:
+        """
+        properties = {u'operation': result.operation}
+        if result.entity_type:
+            properties[u'type'] = result.entity_type
+        if result.identity:
+            properties[u'identity'] = result.identity
+        elif result.name:
+            properties[u'name'] = result.name
+
+        return proton.Message(properties=properties, body=body, reply_to=reply_to, correlation_id=correlation_id)
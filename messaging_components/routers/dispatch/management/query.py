@@ -53,14 +53,9 @@ class RouterQuery(object):
         :param entity_type:
         :return:
         """
-        # Scheme to use
-        scheme = 'amqp'
-        if self._connection_options['ssl_domain']:
-            scheme = 'amqps'
-
         # URL to test
-        url = Url("%s://%s:%s/$management" % (scheme, self.host, self.port))
-        self._logger.info("Querying router at: %s://%s:%s/$management" % (scheme, self.host, self.port))
+        url = self._management_url()
+        self._logger.info("Querying router at: %s" % url)
 
         # Proton connection
         self._logger.debug("Connection options: %s" % self._connection_options)
@@ -90,6 +85,18 @@ class RouterQuery(object):
 
         return records
 
+    def _management_url(self) -> Url:
+        """
+        Returns the URL of the router's management node, using amqps
+        when SSL credentials have been provided.
+        :return:
+        """
+        scheme = 'amqp'
+        if self._connection_options['ssl_domain']:
+            scheme = 'amqps'
+
+        return Url("%s://%s:%s/$management" % (scheme, self.host, self.port))
+
     # Entities that can be queried
     def listener(self):
         return self.query(entity_type='org.apache.qpid.dispatch.listener')
@@ -0,0 +1,58 @@
+import math
+
+from messaging_components.benchmarks.capacity import CapacityStore, CapacityTrial, CapacityTuner, \
+    golden_section_search
+
+
+class FakeTrial(CapacityTrial):
+    """Throughput peaks at capacity 300 (on a logarithmic scale)."""
+    def __init__(self):
+        self.runs = []
+
+    def run(self, implementation, capacity):
+        self.runs.append((implementation, capacity))
+        return 10000 - 1000 * (math.log2(capacity) - math.log2(300)) ** 2
+
+
+class Options:
+    capacity = None
+
+
+class FakeCommand:
+    control = Options()
+
+
+class FakeReceiver:
+    implementation = 'python'
+    command = FakeCommand()
+
+
+def test_golden_section_search():
+    trial = FakeTrial()
+    best, value, evaluations = golden_section_search(lambda capacity: trial.run('python', capacity), 1, 10000, 12)
+    assert len(evaluations) <= 12
+    assert 200 <= best <= 450
+    assert value == max(evaluations.values())
+
+    best, _, _ = golden_section_search(lambda value: -abs(value - 7), 0, 20, 20, log_scale=False)
+    assert best == 7
+
+
+def test_tuner(tmpdir):
+    path = str(tmpdir.join('capacity.json'))
+    trial = FakeTrial()
+    tuner = CapacityTuner(trial, CapacityStore(path), 'artemis', max_trials=8)
+    results = tuner.tune_all(['python', 'java'])
+    assert len(trial.runs) <= 16
+    assert all(200 <= result.capacity <= 450 for result in results)
+
+    # Stored results are reused by later runs
+    trial.runs = []
+    tuner = CapacityTuner(trial, CapacityStore(path), 'artemis')
+    assert tuner.tune('java').capacity == results[1].capacity
+    assert trial.runs == []
+
+    receiver = FakeReceiver()
+    assert tuner.apply(receiver)
+    assert receiver.command.control.capacity == results[0].capacity
+    assert not CapacityTuner(trial, CapacityStore(path), 'dispatch').apply(receiver)
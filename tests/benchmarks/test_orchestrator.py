@@ -0,0 +1,127 @@
+import subprocess
+import threading
+import time
+
+from iqa_common.executor import Command
+from messaging_abstract.component import Sender
+
+from messaging_components.benchmarks.orchestrator import ClientGroup, LoadOrchestrator, place
+from messaging_components.clients.external import ClientFactory
+from messaging_components.clients.external.client_external import synchronized_command
+
+
+class FakeNode:
+    def __init__(self, hostname):
+        self.hostname = hostname
+        self.executor = None
+
+
+class Options:
+    count = None
+
+
+class FakeCommand:
+    def __init__(self):
+        self.control = Options()
+
+
+class FakeExecution:
+    def wait(self):
+        pass
+
+    def completed_successfully(self):
+        return True
+
+
+class FakeSender(Sender):
+    sent = []
+
+    def __init__(self, name, node, executor, url=None, **kwargs):
+        self.name = name
+        self.node = node
+        self.url = url
+        self.command = FakeCommand()
+        self.start_at = None
+        self.execution = None
+
+    def send(self, message):
+        FakeSender.sent.append((self.name, self.node.hostname, self.start_at, self.command.control.count, message))
+        self.execution = FakeExecution()
+
+
+def test_place_balances_by_cpus():
+    nodes = [FakeNode('small'), FakeNode('large')]
+    groups = [ClientGroup('python', 'sender', 6, 'amqp://broker/queue'),
+              ClientGroup('java', 'receiver', 3, 'amqp://broker/queue', cost=2.0)]
+    placements = place(groups, nodes, {'small': 1, 'large': 3})
+
+    assert len(placements) == 9
+    load = {'small': 0.0, 'large': 0.0}
+    for placement in placements:
+        load[placement.node.hostname] += placement.group.cost
+    assert load == {'small': 3.0, 'large': 9.0}
+
+
+def test_synchronized_command():
+    start_at = time.time() + 0.5
+    command = synchronized_command(Command(['echo', 'started'], stdout=True, timeout=10), start_at)
+    assert command.args[-2:] == ['echo', 'started']
+    assert command.timeout == 11
+
+    output = subprocess.check_output(command.args)
+    assert output.strip() == b'started'
+    assert time.time() >= start_at - 0.05
+
+
+def test_orchestrator_run(monkeypatch):
+    # Registered for this test only
+    monkeypatch.setattr(ClientFactory, '_registry', dict(ClientFactory._registry, fake={'sender': FakeSender}))
+    monkeypatch.setattr(ClientFactory, '_classes', dict(ClientFactory._classes))
+    FakeSender.sent = []
+    nodes = [FakeNode('node1'), FakeNode('node2')]
+    groups = [ClientGroup('fake', 'sender', 4, 'amqp://broker/queue', messages=100, message='body')]
+
+    orchestrator = LoadOrchestrator(nodes, lead=2.0, cpus={'node1': 2, 'node2': 2})
+    result = orchestrator.run(groups)
+
+    assert len(FakeSender.sent) == 4
+    assert len(set(start_at for _, _, start_at, _, _ in FakeSender.sent)) == 1
+    assert all(count == 100 and message == 'body' for _, _, _, count, message in FakeSender.sent)
+    assert result.clients_by_node() == {'node1': 2, 'node2': 2}
+    assert result.stats.completed == 4
+    assert result.groups['fake-sender'].messages == 400
+    assert result.synchronized and result.launch_time < 2.0
+
+
+class SlowSender(FakeSender):
+    """Launch takes 50 ms, concurrent launches are tracked by node"""
+    lock = threading.Lock()
+    launching = {}
+    max_launching = {}
+
+    def send(self, message):
+        hostname = self.node.hostname
+        with SlowSender.lock:
+            SlowSender.launching[hostname] = SlowSender.launching.get(hostname, 0) + 1
+            SlowSender.max_launching[hostname] = max(SlowSender.max_launching.get(hostname, 0),
+                                                     SlowSender.launching[hostname])
+        time.sleep(0.05)
+        with SlowSender.lock:
+            SlowSender.launching[hostname] -= 1
+        self.execution = FakeExecution()
+
+
+def test_orchestrator_launches(monkeypatch):
+    monkeypatch.setattr(ClientFactory, '_registry', dict(ClientFactory._registry, fake={'sender': SlowSender}))
+    monkeypatch.setattr(ClientFactory, '_classes', dict(ClientFactory._classes))
+    nodes = [FakeNode('node1'), FakeNode('node2')]
+    groups = [ClientGroup('fake', 'sender', 12, 'amqp://broker/queue', messages=100)]
+
+    orchestrator = LoadOrchestrator(nodes, lead=0.1, cpus={'node1': 2, 'node2': 2}, launches_per_node=2)
+    result = orchestrator.run(groups)
+
+    assert SlowSender.max_launching == {'node1': 2, 'node2': 2}
+    # 3 rounds of launches per node take longer than the lead
+    assert result.launch_time >= 0.15
+    assert not result.synchronized
+    assert 0 < len(result.late) < 12
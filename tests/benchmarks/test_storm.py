@@ -0,0 +1,67 @@
+from messaging_components.benchmarks.storm import ConnectionStorm, ResourceMonitor, StormDriver, find_knee
+
+
+class FakeDriver(StormDriver):
+    """Connect latency grows sharply above 300 connections, connections fail above 500."""
+    def __init__(self, storm_connections: list):
+        self.storm_connections = storm_connections
+        self.opened = 0
+        self.closed = False
+
+    def open(self, count):
+        latencies = []
+        failures = 0
+        for _ in range(count):
+            total = sum(self.storm_connections) + 1
+            if total > 500:
+                failures += 1
+                continue
+            self.storm_connections.append(1)
+            latencies.append(0.001 if total <= 300 else 0.001 * (total - 299))
+        return latencies, failures
+
+    def close(self):
+        self.closed = True
+
+
+class CountingMonitor(ResourceMonitor):
+    def __init__(self, storm_connections: list):
+        self.storm_connections = storm_connections
+
+    def sample(self):
+        return {'connections': len(self.storm_connections)}
+
+
+def test_find_knee():
+    assert find_knee([1, 2, 3, 4, 5], [1, 1, 1, 10, 20]) == 2
+    assert find_knee([1, 2, 3], [1, 1, 1]) is None
+    assert find_knee([1, 2], [1, 10]) is None
+
+
+def test_storm():
+    connections = []
+    drivers = [FakeDriver(connections), FakeDriver(connections)]
+    storm = ConnectionStorm(drivers, [100, 200, 300, 400, 500, 600, 700], [CountingMonitor(connections)],
+                            settle=0, stop_failure_rate=1.0)
+    report = storm.run()
+
+    assert all(driver.closed for driver in drivers)
+    assert [step.connections for step in report.steps] == [100, 200, 300, 400, 500, 500, 500]
+    assert [step.attempted for step in report.steps][:6] == [100, 100, 100, 100, 100, 100]
+    assert report.steps[5].failure_rate == 1.0
+    assert report.steps[2].latency.total == 100
+    assert report.steps[3].resources == {'connections': 400}
+    assert report.knee == 300
+
+    rows = report.rows()
+    assert rows[0]['target'] == 100
+    assert rows[0]['latency_p99'] == 0.001
+    assert rows[0]['connections'] == 100
+
+
+def test_storm_stops_on_failures():
+    connections = []
+    storm = ConnectionStorm([FakeDriver(connections)], [400, 800, 1200], settle=0)
+    report = storm.run()
+    assert [step.target for step in report.steps] == [400, 800]
+    assert report.knee == 400
@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+
+from messaging_components.benchmarks.transactions import TransactionConfig, TransactionSweep, format_table
+from messaging_components.clients.external.fleet import ClientFleet
+from messaging_components.clients.latency import LatencyHistogram
+
+
+class Options:
+    pass
+
+
+class FakeCommand:
+    def __init__(self):
+        self.control = Options()
+        self.transaction = Options()
+
+
+class FakeExecution:
+    def __init__(self, success=True):
+        self.success = success
+
+    def wait(self):
+        pass
+
+    def completed_successfully(self):
+        return self.success
+
+
+class FakeClient:
+    lock = threading.Lock()
+    received = 0
+
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        self.command = FakeCommand()
+        self.execution = None
+        self.runs = []
+
+    def send(self, message):
+        self.runs.append((self.command.transaction.tx_size, self.command.transaction.tx_action,
+                          self.command.control.count))
+        self.execution = FakeExecution(not self.fail)
+
+    def receive(self):
+        with FakeClient.lock:
+            FakeClient.received += self.command.control.count
+        self.execution = FakeExecution()
+
+
+def test_rollback_spread():
+    config = TransactionConfig(10, 0.25)
+    assert [config.rolls_back(index) for index in range(8)] == [False, False, False, True] * 2
+    assert not any(TransactionConfig(10).rolls_back(index) for index in range(8))
+
+
+def test_sweep():
+    senders = [FakeClient('sender-%d' % index) for index in range(4)]
+    receivers = [FakeClient('receiver-%d' % index) for index in range(3)]
+    sweep = TransactionSweep(ClientFleet(senders), ClientFleet(receivers), tx_sizes=[1, 10],
+                             rollback_ratios=[0.0, 0.5], messages_per_client=100)
+    report = sweep.run()
+
+    assert [(result.config.tx_size, result.config.rollback_ratio) for result in report.results] == \
+        [(1, 0.0), (1, 0.5), (10, 0.0), (10, 0.5)]
+    assert [result.committed for result in report.results] == [400, 200, 400, 200]
+    assert FakeClient.received == 1200
+    assert senders[1].runs[1] == (1, 'rollback', 100)
+    assert senders[0].runs[1] == (1, 'commit', 100)
+    assert receivers[0].command.transaction.tx_action == 'commit'
+    # External senders do not report their commits
+    assert report.results[2].commit_latency is None
+    assert report.rows()[2]['commit_p99'] is None
+    assert report.best() in report.results
+
+    table = report.table().splitlines()
+    assert len(table) == 6
+    assert table[0].split()[:2] == ['tx_size', 'rollback_ratio']
+
+
+def test_failed_senders_not_counted():
+    senders = [FakeClient('sender-0'), FakeClient('sender-1', fail=True), FakeClient('sender-2')]
+    sweep = TransactionSweep(ClientFleet(senders), tx_sizes=[10], messages_per_client=100)
+    result, = sweep.run().results
+
+    assert result.committed == 200
+    assert result.failed == 1
+
+
+class FakeHandler:
+    def __init__(self, committed, latencies, errors):
+        self.committed = committed
+        self.commit_latency = LatencyHistogram()
+        for latency in latencies:
+            self.commit_latency.record(latency)
+        self.stats = Options()
+        self.stats.errors = errors
+
+
+class FakeCoreSender:
+    """Core sender committing its transactions in 10 ms, or failing"""
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        self.execution = None
+        self.runs = []
+        self.waited = False
+
+    def send_transactions(self, message, count, tx_size, action, endloop_action):
+        self.runs.append((count, tx_size, action, endloop_action))
+        transactions = -(-count // tx_size)
+        return FakeHandler(count if action == 'commit' else 0, [0.01] * transactions,
+                           ['link: amqp:not-found'] if self.fail else [])
+
+    def wait(self, timeout=None):
+        self.waited = True
+
+
+def test_core_senders_commit_latency():
+    senders = [FakeCoreSender('sender-0'), FakeCoreSender('sender-1'), FakeCoreSender('sender-2', fail=True)]
+    sweep = TransactionSweep(ClientFleet(senders), tx_sizes=[10], rollback_ratios=[0.5], messages_per_client=100)
+    result, = sweep.run().results
+
+    assert senders[0].runs == [(100, 10, 'commit', 'commit')]
+    assert senders[1].runs == [(100, 10, 'rollback', 'rollback')]
+    assert all(sender.waited for sender in senders)
+    assert result.committed == 100
+    assert result.failed == 1
+    # Failed senders are timed too, all their transactions are discharged
+    assert result.commit_latency.total == 30
+    row = result.row()
+    assert row['commit_p50'] == row['commit_p99'] == pytest.approx(0.01, rel=0.01)
+
+
+def test_format_table():
+    assert format_table([{'a': 1, 'b': 0.5}, {'a': 100, 'b': 2.0}]).splitlines() == [
+        '  a      b', '---  -----', '  1  0.500', '100  2.000']
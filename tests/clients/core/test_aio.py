@@ -0,0 +1,218 @@
+import asyncio
+
+import proton
+import pytest
+from proton import Collector, Connection, Delivery, Event, Transport
+
+from messaging_components.clients.core.aio import AsyncConnection
+
+
+class LoopbackPeer:
+    """
+    Minimal AMQP peer on the proton engine: opens everything, accepts the messages
+    it receives and sends its outgoing messages to the receivers of the client.
+    """
+    def __init__(self, outgoing=()):
+        self.outgoing = list(outgoing)
+        self.received = []
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        return 'amqp://127.0.0.1:%d' % self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        transport = Transport(Transport.SERVER)
+        transport.sasl().allowed_mechs('ANONYMOUS')
+        connection = Connection()
+        collector = Collector()
+        connection.collect(collector)
+        transport.bind(connection)
+        try:
+            while True:
+                self.dispatch(collector)
+                pending = transport.pending()
+                while pending > 0:
+                    writer.write(transport.peek(pending))
+                    transport.pop(pending)
+                    pending = transport.pending()
+                await writer.drain()
+                capacity = transport.capacity()
+                if capacity < 0:
+                    break
+                data = await reader.read(max(capacity, 1))
+                if data:
+                    transport.push(data)
+                else:
+                    transport.close_tail()
+        finally:
+            writer.close()
+
+    def dispatch(self, collector):
+        event = collector.peek()
+        while event is not None:
+            if event.type == Event.CONNECTION_REMOTE_OPEN:
+                event.connection.open()
+            elif event.type == Event.CONNECTION_REMOTE_CLOSE:
+                event.connection.close()
+            elif event.type == Event.SESSION_REMOTE_OPEN:
+                event.session.open()
+            elif event.type == Event.LINK_REMOTE_OPEN:
+                link = event.link
+                link.source.copy(link.remote_source)
+                link.target.copy(link.remote_target)
+                link.open()
+                if link.is_receiver:
+                    link.flow(10)
+            elif event.type == Event.LINK_FLOW and event.link.is_sender:
+                self.send(event.link)
+            elif event.type == Event.DELIVERY and event.link.is_receiver:
+                delivery = event.delivery
+                if delivery.readable and not delivery.partial:
+                    message = proton.Message()
+                    message.decode(event.link.recv(delivery.pending))
+                    event.link.advance()
+                    self.deliver(delivery, message)
+                    delivery.settle()
+                    event.link.flow(1)
+            collector.pop()
+            event = collector.peek()
+
+    def deliver(self, delivery, message):
+        self.received.append(message)
+        delivery.update(Delivery.ACCEPTED)
+
+    def send(self, link):
+        while self.outgoing and link.credit > 0:
+            delivery = link.delivery(str(len(self.outgoing)).encode())
+            link.send(self.outgoing.pop(0).encode())
+            link.advance()
+            delivery.settle()
+
+
+def test_send_and_receive():
+    async def run():
+        peer = LoopbackPeer([proton.Message(body=index) for index in range(5)])
+        url = await peer.start()
+        connection = await AsyncConnection.connect(url, timeout=10)
+
+        sender = await connection.open_sender('queue', timeout=10)
+        outcome = await sender.send(proton.Message(body='hello'), timeout=10)
+        receiver = await connection.open_receiver('queue', credit=2, timeout=10)
+        bodies = [(await receiver.receive(timeout=10)).body for _ in range(5)]
+
+        await connection.close(timeout=10)
+        await peer.stop()
+        return outcome, bodies, peer.received, connection.closed
+
+    outcome, bodies, received, closed = asyncio.run(run())
+    assert outcome == Delivery.ACCEPTED
+    assert bodies == list(range(5))
+    assert [message.body for message in received] == ['hello']
+    assert closed
+
+
+def test_send_larger_than_frame():
+    async def run():
+        peer = LoopbackPeer()
+        url = await peer.start()
+        connection = await AsyncConnection.connect(url, timeout=10)
+        sender = await connection.open_sender('queue', timeout=10)
+        # Larger than the default max frame size, sent as several frames
+        outcome = await sender.send(proton.Message(body='x' * 100000), timeout=5)
+        await connection.close(timeout=10)
+        await peer.stop()
+        return outcome, peer.received
+
+    outcome, received = asyncio.run(run())
+    assert outcome == Delivery.ACCEPTED
+    assert [len(message.body) for message in received] == [100000]
+
+
+def test_connect_timeout():
+    async def run():
+        disconnected = asyncio.Event()
+
+        async def silent(reader, writer):
+            # Never answers, waits for the client to go away
+            await reader.read()
+            disconnected.set()
+
+        server = await asyncio.start_server(silent, '127.0.0.1', 0)
+        url = 'amqp://127.0.0.1:%d' % server.sockets[0].getsockname()[1]
+        with pytest.raises(asyncio.TimeoutError):
+            await AsyncConnection.connect(url, timeout=0.5)
+        await asyncio.wait_for(disconnected.wait(), 5)
+        server.close()
+        await server.wait_closed()
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+
+
+class FakeTransport:
+    """Input buffer is full for the first checks, then accepts data until closed."""
+    def __init__(self):
+        self.capacities = [0, 0, 10]
+        self.pushed = []
+        self.tail_closed = False
+
+    def capacity(self):
+        if self.tail_closed:
+            return -1
+        return self.capacities.pop(0) if len(self.capacities) > 1 else self.capacities[0]
+
+    def pending(self):
+        return -1 if self.tail_closed else 0
+
+    def tick(self, now):
+        return 0
+
+    def push(self, data):
+        self.pushed.append(data)
+
+    def close_tail(self):
+        self.tail_closed = True
+
+
+class FakeReader:
+    def __init__(self, transport):
+        self.transport = transport
+        self.reads = []
+        self.data = [b'data', b'']
+
+    async def read(self, size):
+        self.reads.append((size, list(self.transport.capacities)))
+        return self.data.pop(0)
+
+
+class FakeWriter:
+    closed = False
+
+    def write(self, data):
+        pass
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_full_input_capacity():
+    async def run():
+        transport = FakeTransport()
+        reader = FakeReader(transport)
+        connection = AsyncConnection('amqp://fake', reader, FakeWriter(), Connection(), transport)
+        await asyncio.wait_for(connection._run(), 5)
+        return transport, reader, connection
+
+    transport, reader, connection = asyncio.run(run())
+    # Nothing is read while the capacity is 0
+    assert [size for size, _ in reader.reads] == [10, 10]
+    assert transport.pushed == [b'data']
+    assert connection.closed and connection._writer.closed
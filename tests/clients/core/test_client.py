@@ -0,0 +1,47 @@
+import proton
+
+from messaging_components.clients.core.client import MessagePool, send_encoded
+from messaging_components.clients.payload import Payload
+
+
+class FakeLink:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(bytes(data))
+        return len(data)
+
+
+def decode(link: FakeLink) -> proton.Message:
+    message = proton.Message()
+    message.decode(b''.join(link.sent))
+    return message
+
+
+def test_send_encoded_message():
+    pool = MessagePool([proton.Message(body='hello', properties={'key': 'value'})])
+    link = FakeLink()
+    send_encoded(link, pool.next())
+
+    assert len(link.sent) == 1
+    message = decode(link)
+    assert message.body == 'hello'
+    assert message.properties == {'key': 'value'}
+
+
+def test_send_encoded_payload(tmpdir):
+    payload = Payload.generate(str(tmpdir.join('payload')), 10000, 'binary', seed=2)
+
+    class Message:
+        body = payload
+        subject = 'large'
+
+    link = FakeLink()
+    send_encoded(link, MessagePool([Message()]).next())
+
+    assert len(link.sent) == 3
+    message = decode(link)
+    assert message.subject == 'large'
+    assert payload.verify(message.body)
+    payload.close()
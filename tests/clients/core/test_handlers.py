@@ -0,0 +1,233 @@
+import asyncio
+import socket
+import time
+
+import proton
+from proton import Delivery, Described
+
+from messaging_components.clients.core.client import CoreRunner, MessagePool
+from messaging_components.clients.core.connector import ConnectorCore, ConnectorHandler
+from messaging_components.clients.core.receiver import ReceiverHandler
+from messaging_components.clients.core.sender import SenderHandler, TransactionSenderHandler
+from tests.clients.core.test_aio import LoopbackPeer
+
+
+class Event:
+    def __init__(self, context=None, delivery=None, message=None):
+        self.context = context
+        self.delivery = delivery
+        self.message = message
+
+
+class FakeConnection:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDelivery:
+    def __init__(self, tag=None):
+        self.tag = tag
+        self.settled = False
+
+    def settle(self):
+        self.settled = True
+
+
+class FakeSenderLink:
+    def __init__(self, credit):
+        self.credit = credit
+        self.deliveries = []
+        self.sent = []
+
+    def delivery(self, tag):
+        self.deliveries.append(FakeDelivery(tag))
+        return self.deliveries[-1]
+
+    def send(self, data):
+        self.sent.append(bytes(data))
+
+    def advance(self):
+        self.credit -= 1
+
+
+def started(handler, link=None):
+    handler.connection = FakeConnection()
+    handler.stats.started = time.time()
+    handler.sender = link
+    return handler
+
+
+def test_sender_window():
+    pool = MessagePool([proton.Message(body='message')])
+    handler = started(SenderHandler('amqp://localhost/queue', pool, 5, window=2), FakeSenderLink(credit=10))
+
+    handler.on_sendable(Event())
+    assert handler.stats.sent == 2
+
+    handler.on_settled(Event())
+    handler.on_settled(Event())
+    assert handler.stats.sent == 4
+    assert [delivery.tag for delivery in handler.sender.deliveries] == [b'0', b'1', b'2', b'3']
+
+    for _ in range(3):
+        handler.on_settled(Event())
+    assert handler.stats.sent == 5
+    assert handler.connection.closed and handler.stats.finished is not None
+
+
+def test_sender_presettled_credit():
+    pool = MessagePool([proton.Message(body='message')])
+    handler = started(SenderHandler('amqp://localhost/queue', pool, 5, presettled=True), FakeSenderLink(credit=3))
+
+    handler.on_sendable(Event())
+    assert handler.stats.sent == 3
+    assert all(delivery.settled for delivery in handler.sender.deliveries)
+    assert not handler.connection.closed
+
+    handler.sender.credit = 5
+    handler.on_sendable(Event())
+    assert handler.stats.sent == 5 and handler.connection.closed
+
+
+def test_receiver_settle_batches():
+    handler = started(ReceiverHandler('amqp://localhost/queue', count=5, settle_batch=2, max_messages=2))
+    accepted = []
+    handler.accept = accepted.append
+    handler.release = lambda delivery, delivered: accepted.append(('released', delivery))
+
+    for index in range(6):
+        handler.on_message(Event(delivery=index, message=proton.Message(body=index)))
+        if index == 2:
+            assert accepted == [0, 1]
+
+    # The last message was prefetched after the expected count
+    assert handler.stats.received == 5
+    assert accepted == [0, 1, 2, 3, 4, ('released', 5)]
+    assert [message.body for message in handler.messages] == [3, 4]
+    assert handler.connection.closed
+
+
+def test_receiver_kept_messages():
+    def receive(count, **kwargs):
+        handler = started(ReceiverHandler('amqp://localhost/queue', **kwargs))
+        handler.accept = lambda delivery: None
+        for index in range(count):
+            handler.on_message(Event(delivery=index, message=proton.Message(body=index)))
+        return handler
+
+    # Bounded by default, all messages are still counted
+    handler = receive(ReceiverHandler.MAX_MESSAGES + 10)
+    assert len(handler.messages) == ReceiverHandler.MAX_MESSAGES
+    assert handler.stats.received == ReceiverHandler.MAX_MESSAGES + 10
+
+    handler = receive(10, max_messages=0)
+    assert (len(handler.messages), handler.stats.received) == (0, 10)
+
+    # Opt-in to keep all of them
+    assert len(receive(1000, max_messages=None).messages) == 1000
+
+
+def test_transport_error():
+    handler = started(ConnectorHandler('amqp://localhost/queue'))
+    transport = proton.Transport()
+    transport.condition = proton.Condition('amqp:connection:framing-error', 'connection refused')
+
+    handler.on_transport_error(Event(context=transport))
+    assert handler.stats.errors == ['transport: %s' % transport.condition]
+    assert handler.ready.is_set()
+    assert handler.connection.closed and handler.stats.finished is not None
+
+
+def test_runner_failure():
+    class FailingHandler(ConnectorHandler):
+        def on_start(self, event):
+            raise RuntimeError('failed')
+
+    handler = FailingHandler('amqp://localhost/queue')
+    assert CoreRunner(handler).start().wait(10)
+    assert handler.stats.errors == ["container: RuntimeError('failed')"]
+    assert handler.ready.is_set() and handler.stats.finished is not None
+
+
+def test_connect_refused():
+    # Port without listener
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    port = listener.getsockname()[1]
+    listener.close()
+
+    connector = ConnectorCore('connector', None, None, url='amqp://127.0.0.1:%d/queue' % port)
+    assert not connector.connect()
+    assert connector.stats.errors
+    assert connector.wait(10)
+
+
+class TransactionalPeer(LoopbackPeer):
+    """
+    Peer acting as transaction coordinator: messages are kept when their transaction is committed.
+    """
+    DECLARED = 0x33
+
+    def __init__(self):
+        super(TransactionalPeer, self).__init__()
+        self.transactions = {}
+        self.discharges = []
+
+    def deliver(self, delivery, message):
+        body = message.body
+        if isinstance(body, Described) and body.descriptor == 'amqp:declare:list':
+            transaction_id = str(len(self.transactions)).encode()
+            self.transactions[transaction_id] = []
+            delivery.local.data = [transaction_id]
+            delivery.update(self.DECLARED)
+        elif isinstance(body, Described) and body.descriptor == 'amqp:discharge:list':
+            transaction_id, failed = body.value
+            self.discharges.append(failed)
+            if not failed:
+                self.received += self.transactions[bytes(transaction_id)]
+            delivery.update(Delivery.ACCEPTED)
+        else:
+            self.transactions[bytes(delivery.remote.data[0])].append(message)
+            delivery.update(Delivery.ACCEPTED)
+
+
+def run_transactions(handler: TransactionSenderHandler, peer: TransactionalPeer):
+    async def run():
+        url = await peer.start()
+        handler.url = url + '/queue'
+        runner = CoreRunner(handler).start()
+        completed = await asyncio.get_event_loop().run_in_executor(None, runner.wait, 20)
+        await peer.stop()
+        return completed
+
+    return asyncio.run(run())
+
+
+def test_transaction_sender():
+    pool = MessagePool([proton.Message(body=index) for index in range(25)])
+    handler = TransactionSenderHandler('amqp://127.0.0.1/queue', pool, 25, 10)
+    peer = TransactionalPeer()
+
+    assert run_transactions(handler, peer)
+    assert handler.stats.errors == []
+    assert (handler.stats.sent, handler.committed, handler.rolled_back) == (25, 25, 0)
+    # Two full transactions, and the last incomplete one
+    assert peer.discharges == [False, False, False]
+    assert [message.body for message in peer.received] == list(range(25))
+    assert handler.commit_latency.total == handler.transaction_time.total == 3
+    assert handler.commit_latency.max <= handler.transaction_time.max
+
+
+def test_transaction_sender_rollback():
+    pool = MessagePool([proton.Message(body='message')])
+    handler = TransactionSenderHandler('amqp://127.0.0.1/queue', pool, 20, 10, action='rollback',
+                                       endloop_action='rollback')
+    peer = TransactionalPeer()
+
+    assert run_transactions(handler, peer)
+    assert (handler.committed, handler.rolled_back) == (0, 20)
+    assert peer.discharges == [True, True]
+    assert peer.received == []
+    assert handler.commit_latency.total == 2
@@ -0,0 +1,127 @@
+import shlex
+
+import pytest
+from iqa_common.executor import Command
+from messaging_abstract.message import Message
+
+from messaging_components.clients.external.batch import batch_script
+from messaging_components.clients.external.java import SenderJava
+from messaging_components.clients.external.java.worker import JavaWorker
+from messaging_components.clients.load import ConstantRate, send_profile_external
+
+
+class FakeNode:
+    name = 'node-1'
+    executor = None
+
+
+class FakeExecution:
+    def __init__(self, success):
+        self.success = success
+        self.running = True
+
+    def wait(self):
+        self.running = False
+
+    def is_running(self):
+        return self.running
+
+    def completed_successfully(self):
+        return self.success
+
+
+class FakeExecutor:
+    """Records commands, ng commands succeed once the server is started."""
+    def __init__(self):
+        self.commands = []
+        self.server = None
+
+    def execute(self, command):
+        self.commands.append(command.args)
+        if command.args[0] == 'java':
+            self.server = FakeExecution(True)
+            return self.server
+        return FakeExecution(self.server is not None)
+
+
+def create_worker(executor=None) -> JavaWorker:
+    return JavaWorker(FakeNode(), executor, ['/opt/nailgun-server.jar', '/opt/cli-qpid-jms.jar'], port=1234)
+
+
+def test_wrap():
+    worker = create_worker()
+    command = Command(['cli-qpid-sender', '--count', 10], stdout=True, timeout=30)
+    wrapped = worker.wrap(command)
+    assert wrapped.args == ['ng', '--nailgun-server', '127.0.0.1', '--nailgun-port', '1234',
+                            'com.redhat.mqe.jms.Main', 'sender', '--count', '10']
+    assert (wrapped.stdout, wrapped.timeout) == (True, 30)
+
+    script = Command(['sh', '-c', 'cli-qpid-sender'])
+    assert worker.wrap(script) is script
+
+
+def test_lifecycle():
+    executor = FakeExecutor()
+    worker = create_worker(executor)
+    assert worker.start(timeout=5)
+    assert executor.commands[0] == ['java', '-cp', '/opt/nailgun-server.jar:/opt/cli-qpid-jms.jar',
+                                    'com.facebook.nailgun.NGServer', '127.0.0.1:1234']
+    assert executor.commands[-1][-1] == 'ng-version'
+
+    worker.stop()
+    assert executor.commands[-1][-1] == 'ng-stop'
+    assert not worker.running
+
+
+def test_for_node():
+    with pytest.raises(ValueError):
+        JavaWorker.for_node(FakeNode())
+
+    worker = JavaWorker.for_node(FakeNode(), classpath=['/opt/cli-qpid-jms.jar'])
+    try:
+        assert JavaWorker.for_node(FakeNode()) is worker
+    finally:
+        JavaWorker._workers.clear()
+
+
+class RecordingExecutor:
+    def __init__(self):
+        self.commands = []
+
+    def execute(self, command):
+        self.commands.append(command)
+        return FakeExecution(True)
+
+
+def create_sender(executor=None) -> SenderJava:
+    sender = SenderJava(name='sender', node=FakeNode(), executor=executor)
+    sender.set_url('amqp://127.0.0.1:5672/examples')
+    sender.use_worker(create_worker())
+    return sender
+
+
+def script_clients(script: str) -> list:
+    return [shlex.split(line) for line in script.splitlines() if line.startswith(('ng ', 'cli-'))]
+
+
+def test_batch_on_worker():
+    clients = script_clients(batch_script(create_sender(), [Message(body='body')] * 10))
+    assert len(clients) == 1
+    assert clients[0][:7] == ['ng', '--nailgun-server', '127.0.0.1', '--nailgun-port', '1234',
+                              'com.redhat.mqe.jms.Main', 'sender']
+    assert clients[0][clients[0].index('--count') + 1] == '10'
+
+
+def test_scheduled_on_worker():
+    executor = RecordingExecutor()
+    sender = create_sender(executor)
+    send_profile_external(sender, Message(body='body'), ConstantRate(10, 10), resolution=5.0)
+    clients = script_clients(executor.commands[-1].args[2])
+    assert len(clients) == 2
+    assert all(client[0] == 'ng' and client[6] == 'sender' for client in clients)
+
+    # Synchronized starts wait on the node, then run the client on the worker
+    sender.start_at = 0.0
+    sender.send(Message(body='body'))
+    args = executor.commands[-1].args
+    assert args[:2] == ['sh', '-c'] and args.index('ng') > args.index('iqa-start')
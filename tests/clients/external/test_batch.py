@@ -0,0 +1,91 @@
+import asyncio
+import json
+import shlex
+import sys
+
+from messaging_abstract.message import Message
+
+from messaging_components.clients.external.batch import batch_script, group_runs
+from messaging_components.clients.external.python import SenderPython
+from tests.clients.core.test_aio import LoopbackPeer
+
+
+class FakeNode:
+    hostname = 'fake'
+
+
+def create_sender():
+    sender = SenderPython(name='sender', node=FakeNode(), executor=None)
+    sender.set_url('amqp://127.0.0.1:5672/examples')
+    sender.command.message.msg_durable = 'yes'
+    return sender
+
+
+def test_group_runs():
+    messages = [Message(body='a'), Message(body='a'), Message(body='b'),
+                Message(body='b', application_properties={'key': 1}), Message(body='a')]
+    assert [count for _, count in group_runs(messages)] == [2, 1, 1, 1]
+
+
+def test_batch_script_equal_messages():
+    sender = create_sender()
+    args = list(sender.command.args)
+    script = batch_script(sender, [Message(body='x' * 2000, subject='large')] * 3)
+    lines = script.splitlines()
+
+    runs = [shlex.split(line) for line in lines if line.startswith('cli-proton-python-sender')]
+    assert len(runs) == 1
+    assert runs[0][runs[0].index('--count') + 1] == '3'
+    assert runs[0][runs[0].index('--msg-subject') + 1] == 'large'
+    assert '--msg-content' not in runs[0]
+    assert '--msg-content-from-file' in runs[0]
+    assert '--msg-durable' in runs[0]
+    assert lines[1].startswith('trap')
+
+    # Sender command is restored
+    assert sender.command.message.msg_subject is None
+    assert sender.command.message.msg_content_from_file is None
+    assert sender.command.message.msg_durable == 'yes'
+    assert sender.command.control.count == 1
+    assert list(sender.command.args) == args
+
+
+def test_batch_script_distinct_messages():
+    sender = create_sender()
+    messages = [Message(body='body-%d' % index, application_properties={'index': index}) for index in range(100)]
+    script = batch_script(sender, messages)
+
+    # A single process sends the whole batch
+    launches = [line for line in script.splitlines() if line.startswith(('python3', 'cli-'))]
+    assert len(launches) == 1
+    assert shlex.split(launches[0])[2] == 'amqp://127.0.0.1:5672/examples'
+
+    records = [json.loads(line) for line in script.splitlines() if line.startswith('{')]
+    assert records[1] == {'body': 'body-1', 'properties': {'index': 1}, 'durable': True}
+    assert [record['body'] for record in records] == ['body-%d' % index for index in range(100)]
+
+
+def test_batch_sender(tmpdir):
+    messages = [Message(body='first', subject='a'), Message(body='x\ny' * 1000),
+                Message(body='last', application_properties={'key': 'value'})]
+
+    async def run():
+        peer = LoopbackPeer()
+        url = await peer.start()
+        sender = create_sender()
+        sender.set_url(url + '/examples')
+        script = batch_script(sender, messages, content_dir=str(tmpdir), python=sys.executable)
+        process = await asyncio.create_subprocess_exec('sh', '-c', script, stdout=asyncio.subprocess.PIPE)
+        stdout, _ = await asyncio.wait_for(process.communicate(), 30)
+        await peer.stop()
+        return process.returncode, stdout, peer.received
+
+    returncode, stdout, received = asyncio.run(run())
+    assert returncode == 0
+    assert stdout.strip() == b'sent: 3, accepted: 3'
+    assert [message.body for message in received] == ['first', 'x\ny' * 1000, 'last']
+    assert received[0].subject == 'a'
+    assert received[2].properties == {'key': 'value'}
+    assert all(message.durable for message in received)
+    # Script and messages files are removed
+    assert tmpdir.listdir() == []
@@ -0,0 +1,30 @@
+from messaging_components.clients.external.python.command.python_commands import PythonSenderClientCommand
+
+
+def test_args_cached():
+    command = PythonSenderClientCommand()
+    command.control.broker_url = 'amqp://127.0.0.1:5672/examples'
+    args = command.args
+    assert command.args == args
+    assert command.args is not command.args
+
+    command.message.msg_content = 'test'
+    assert '--msg-content' in command.args
+    assert command.args != args
+
+
+def test_in_place_changes():
+    command = PythonSenderClientCommand()
+    command.message.msg_property = {'a': 1}
+    assert 'a=1' in command.args
+    command.message.msg_property['b'] = 2
+    command.message.touch()
+    assert 'b=2' in ' '.join(command.args)
+
+
+def test_to_dict_skips_private():
+    command = PythonSenderClientCommand()
+    command.message.msg_id = 'id'
+    options = command.message.to_dict()
+    assert options['msg-id'] == 'id'
+    assert not [name for name in options if name.startswith('-')]
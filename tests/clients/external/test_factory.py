@@ -0,0 +1,70 @@
+import subprocess
+import sys
+
+import pytest
+from messaging_abstract.component import Node
+
+from messaging_components.clients.external import ClientFactory, ClientExternal
+
+
+class SenderFake(ClientExternal):
+    implementation = 'fake'
+
+    def __init__(self, name, node, executor, **kwargs):
+        self.name = name
+        self.node = node
+        self.kwargs = kwargs
+
+
+def test_lazy_import():
+    # Importing the package must not import any client implementation
+    code = "import sys, messaging_components.clients; " \
+           "print(any(name.startswith('messaging_components.clients.external.') and " \
+           "name.split('.')[3] in ('python', 'java', 'nodejs') for name in sys.modules))"
+    output = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+    assert output.strip() == 'False'
+
+
+def test_star_import():
+    for package in ('messaging_components.clients', 'messaging_components.clients.external'):
+        namespace = {}
+        exec('from %s import *' % package, namespace)
+        assert {'ClientFactory', 'ClientExternal', 'SenderPython', 'ReceiverJava', 'ConnectorNodeJS',
+                'Node', 'Executor'} <= set(namespace)
+        assert namespace['SenderPython'] is ClientFactory.get_client_class('python', 'sender')
+
+
+def test_builtin_clients():
+    assert ClientFactory.get_available_implementations()[:3] == ['nodejs', 'python', 'java']
+    sender_class = ClientFactory.get_client_class('python', 'Sender')
+    assert sender_class.__name__ == 'SenderPython'
+    assert ClientFactory.get_client_class('python', 'sender') is sender_class
+
+    from messaging_components.clients.external import SenderPython
+    assert SenderPython is sender_class
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Registrations made by a test are dropped once it finishes"""
+    monkeypatch.setattr(ClientFactory, '_registry',
+                        {implementation: dict(clients) for implementation, clients in ClientFactory._registry.items()})
+    monkeypatch.setattr(ClientFactory, '_classes', dict(ClientFactory._classes))
+    yield
+    monkeypatch.undo()
+    assert 'fake' not in ClientFactory.get_available_implementations()
+
+
+def test_register(registry):
+    ClientFactory.register('fake', 'sender', SenderFake)
+    ClientFactory.register('fake', 'receiver', '%s:SenderFake' % __name__)
+    clients = ClientFactory.create_clients('fake', Node(hostname='host'), None, url='amqp://host/queue')
+    assert [client.name for client in clients] == ['fake-senderfake-host', 'fake-senderfake-host']
+    assert clients[0].kwargs == {'url': 'amqp://host/queue'}
+    assert 'fake' in ClientFactory.get_available_implementations()
+
+
+def test_invalid():
+    for implementation, client_type in (('unknown', 'sender'), ('python', 'unknown')):
+        with pytest.raises(ValueError):
+            ClientFactory.get_client_class(implementation, client_type)
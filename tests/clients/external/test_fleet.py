@@ -0,0 +1,66 @@
+import threading
+import time
+
+from messaging_components.clients.external.fleet import ClientFleet
+
+
+class FakeExecution:
+    def __init__(self, success):
+        self.success = success
+
+    def wait(self):
+        time.sleep(0.01)
+
+    def completed_successfully(self):
+        return self.success
+
+
+class FakeClient:
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def __init__(self, name, success=True):
+        self.name = name
+        self.success = success
+        self.execution = None
+
+    def start(self):
+        with FakeClient.lock:
+            FakeClient.running += 1
+            FakeClient.max_running = max(FakeClient.running, FakeClient.max_running)
+        self.execution = FakeExecution(self.success)
+
+    def finish(self):
+        with FakeClient.lock:
+            FakeClient.running -= 1
+
+
+def run_client(client):
+    client.start()
+    client.execution.wait()
+    client.finish()
+    if client.name == 'error':
+        raise RuntimeError('unable to start')
+
+
+def test_fleet():
+    clients = [FakeClient('client-%d' % index, success=index % 10 != 0) for index in range(40)]
+    clients.append(FakeClient('error'))
+    stats = ClientFleet(clients, concurrency=5).run(action=run_client, messages_per_client=100)
+
+    assert FakeClient.max_running <= 5
+    assert stats.total == 41
+    assert stats.completed == 36
+    assert stats.failed == 5
+    assert len(stats.errors) == 1
+    assert stats.messages == 3600
+    assert stats.messages_per_second > 0
+
+
+def test_stagger():
+    clients = [FakeClient('client-%d' % index) for index in range(3)]
+    stats = ClientFleet(clients, concurrency=3, stagger=0.05).run(action=lambda client: None)
+    starts = [result.started for result in stats.results]
+    assert starts[2] - starts[0] >= 0.09
+    assert stats.completed == 3
@@ -0,0 +1,80 @@
+import json
+import tempfile
+
+from messaging_components.clients.external.output import ClientOutputParser, parse_record
+
+PYTHON_RECORD = "{'address': 'examples', 'content': 'abc', 'durable': False, 'properties': {'n': 1}}"
+JSON_RECORD = '{"address": "examples", "content": "x", "durable": true}'
+
+
+class FakeExecution:
+    def __init__(self):
+        self.fh_stdout = tempfile.TemporaryFile()
+        self.running = True
+
+    def write(self, text):
+        self.fh_stdout.write(text.encode())
+        self.fh_stdout.flush()
+
+    def is_running(self):
+        return self.running
+
+
+def test_parse_record():
+    assert parse_record(PYTHON_RECORD)['properties'] == {'n': 1}
+    assert parse_record(JSON_RECORD)['durable'] is True
+    assert parse_record('Connection established') is None
+
+
+def test_feed_partial_lines():
+    parser = ClientOutputParser()
+    assert parser.feed(PYTHON_RECORD[:10]) == []
+    assert len(parser.feed(PYTHON_RECORD[10:] + '\nsome log line\n')) == 1
+    assert (parser.messages, parser.unparsed, parser.lines) == (1, 1, 2)
+
+
+def test_follow_execution(tmpdir):
+    execution = FakeExecution()
+    spill = str(tmpdir.join('records.jsonl'))
+    parser = ClientOutputParser(execution, keep=2, spill_path=spill)
+
+    execution.write((PYTHON_RECORD + '\n') * 3 + JSON_RECORD[:5])
+    assert len(parser.poll()) == 3
+    execution.write(JSON_RECORD[5:])
+    execution.running = False
+    records = list(parser.follow(interval=0))
+    parser.close()
+
+    assert records == [json.loads(JSON_RECORD)]
+    assert parser.messages == 4
+    assert len(parser.records) == 2
+    with open(spill) as stream:
+        assert len(stream.readlines()) == 4
+
+
+class FakeOutputExecution:
+    """Execution without a stdout file, providing its whole output only"""
+    def __init__(self, output):
+        self.output = output
+        self.running = True
+        self.reads = 0
+
+    def read_stdout(self):
+        self.reads += 1
+        return self.output
+
+    def is_running(self):
+        return self.running
+
+
+def test_follow_without_stdout_file():
+    execution = FakeOutputExecution((PYTHON_RECORD + '\n') * 2)
+    parser = ClientOutputParser(execution)
+    assert parser.poll() == []
+    assert execution.reads == 0
+
+    execution.output += JSON_RECORD
+    execution.running = False
+    assert len(list(parser.follow(interval=0))) == 3
+    assert parser.finish() == []
+    assert parser.messages == 3
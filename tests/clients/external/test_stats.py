@@ -0,0 +1,44 @@
+import pytest
+
+from messaging_components.clients.external.stats import StatsAggregator, find_outliers, normalize_stats
+
+
+def test_normalize():
+    assert normalize_stats({'timestamp': 1500000000.5, 'sender': {'sent': 10}}) == (1500000000.5, 10)
+    assert normalize_stats({'time': 1500000000500, 'msg-count': 3}) == (1500000000.5, 3)
+    assert normalize_stats({'count': 7}, received=12.0) == (12.0, 7)
+    assert normalize_stats({'address': 'q', 'body': 'x', 'properties': {'count': 1}}) is None
+    assert normalize_stats({'connection': {'state': 'open'}}) is None
+
+
+def test_aggregate():
+    aggregator = StatsAggregator()
+    for name, rate in (('a', 10), ('b', 20)):
+        output = '\n'.join("{'timestamp': %d, 'sent': %d}" % (100 + t, rate * t) for t in range(11))
+        aggregator.feed(name, output + '\nnot stats\n')
+
+    series = aggregator.series(interval=2.0)
+    assert len(series.combined) == 5
+    assert list(series.combined) == [30.0] * 5
+    assert list(series.rates['a']) == [10.0] * 5
+
+    report = aggregator.report()
+    assert report['messages'] == 300
+    assert report['messages_per_second'] == pytest.approx(30)
+    assert report['client_messages_per_second'] == {'a': 10, 'b': 20}
+
+
+def test_collector_interval_counts():
+    aggregator = StatsAggregator(cumulative=False)
+    collect = aggregator.collector('receiver')
+    for t in range(5):
+        collect({'ts': 10 + t, 'received': 4})
+    assert aggregator.client('receiver').total == 20
+    assert aggregator.client('receiver').messages_per_second == 4
+
+
+def test_outliers():
+    rates = {'client-%d' % index: 100.0 + index % 3 for index in range(20)}
+    rates['slow'] = 20.0
+    assert find_outliers(rates) == ['slow']
+    assert find_outliers({'a': 1.0, 'b': 1.0, 'c': 1.0}) == []
@@ -0,0 +1,44 @@
+import json
+
+from messaging_components.clients.latency import LatencyHistogram, message_latency, stamp_properties
+
+
+def create_histogram(values):
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record_value(value)
+    return histogram
+
+
+def test_percentiles():
+    histogram = create_histogram(range(1, 100001))
+    assert histogram.total == 100000
+    assert histogram.max == 100000
+    for percentile, expected in ((50, 50000), (99, 99000), (99.9, 99900)):
+        value = histogram.value_at_percentile(percentile)
+        assert expected <= value <= expected * 1.01
+    assert histogram.value_at_percentile(100) == 100000
+
+
+def test_precision_small_values():
+    histogram = create_histogram([3, 7, 7, 150])
+    assert histogram.value_at_percentile(50) == 7
+    assert histogram.summary()['max'] == 150e-6
+
+
+def test_merge_snapshot():
+    first = create_histogram(range(0, 1000))
+    second = create_histogram(range(1000, 2000))
+    merged = LatencyHistogram.merged([first, second])
+    assert merged.total == 2000
+    assert (merged.min, merged.max) == (0, 1999)
+
+    restored = LatencyHistogram.from_snapshot(json.loads(json.dumps(merged.snapshot())))
+    assert restored.summary() == merged.summary()
+
+
+def test_stamp():
+    properties = stamp_properties(5, {'key': 'value'})
+    assert properties['key'] == 'value'
+    assert 0 <= message_latency(properties) < 1
+    assert message_latency({'key': 'value'}) is None
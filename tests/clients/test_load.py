@@ -0,0 +1,52 @@
+import pytest
+
+from messaging_components.clients.load import ArrivalSchedule, Burst, ConstantRate, Ramp, Sine, Step, \
+    external_segments
+
+
+def test_profiles():
+    assert ConstantRate(100, 10).total_messages() == 1000
+    assert Ramp(0, 200, 10).total_messages() == 1000
+    step = Step(10, 10, 1, 3)
+    assert step.duration == 3
+    assert [step.rate(t) for t in (0.5, 1.5, 2.5)] == [10, 20, 30]
+    burst = Burst(10, 100, 2, 0.5, 4)
+    assert (burst.rate(0.2), burst.rate(1), burst.rate(2.1)) == (100, 10, 100)
+    assert Sine(100, 50, 1, 10).total_messages() == pytest.approx(1000, abs=1)
+
+
+def test_schedule_constant():
+    schedule = ArrivalSchedule(ConstantRate(100, 1))
+    assert schedule.count == 100
+    assert schedule.time_of(0) == 0
+    assert schedule.time_of(50) == pytest.approx(0.5)
+    assert schedule.time_of(100) is None
+
+
+def test_schedule_shared():
+    profile = Ramp(0, 200, 10)
+    schedules = [ArrivalSchedule(profile, index, 3) for index in range(3)]
+    assert sum(schedule.count for schedule in schedules) == schedules[0].total == 1000
+
+    assert [schedule.count for schedule in schedules] == [334, 333, 333]
+
+    # Senders take arrivals round robin, and the merged schedule follows the ramp:
+    # rate 20 * t, so arrival n is due when 10 * t^2 = n
+    times = [schedules[arrival % 3].time_of(arrival // 3) for arrival in range(1000)]
+    assert all(earlier < later for earlier, later in zip(times, times[1:]))
+    assert times == pytest.approx([(arrival / 10) ** 0.5 for arrival in range(1000)], abs=0.01)
+
+
+def test_schedule_idle_segments():
+    schedule = ArrivalSchedule(Burst(0, 100, 1, 0.5, 2))
+    assert schedule.count == 100
+    assert all(t % 1 < 0.5 for t in (schedule.time_of(n) for n in range(schedule.count)))
+
+
+def test_external_segments():
+    profile = Step(10, 10, 1, 3)
+    assert external_segments(profile) == [(10, 1), (20, 1), (30, 1)]
+
+    shares = [external_segments(profile, index, 4) for index in range(4)]
+    assert sum(count for share in shares for count, _ in share) == 60
+    assert external_segments(Burst(0, 10, 2, 1, 4)) == [(10, 1), (0, 1), (10, 1), (0, 1)]
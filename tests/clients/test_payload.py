@@ -0,0 +1,81 @@
+import os
+import struct
+
+import pytest
+
+from messaging_components.clients.payload import Payload, PayloadStore, PayloadVerifier, SizeDistribution, \
+    encode_with_payload, use_payload
+
+
+class FakeMessage:
+    """Encodes like proton: properties, then the body as an AMQP data section."""
+    def __init__(self):
+        self.body = 'ignored'
+        self.inferred = False
+
+    def encode(self):
+        assert self.inferred and self.body == b''
+        return b'properties' + b'\x00\x53\x75\xa0\x00'
+
+
+def test_generate(tmpdir):
+    first = Payload.generate(str(tmpdir.join('first')), 3 * 1024 * 1024 + 7, 'text', seed=1)
+    second = Payload.generate(str(tmpdir.join('second')), 3 * 1024 * 1024 + 7, 'text', seed=1)
+    assert first.checksum == second.checksum
+    assert os.path.getsize(first.path) == first.size
+
+    view = first.view()
+    assert bytes(view[:100]).isalnum()
+    assert first.verify(view)
+    assert not first.verify(bytes(view[:-1]) + b'!')
+    view.release()
+    first.close()
+
+    with pytest.raises(ValueError):
+        Payload.generate(str(tmpdir.join('invalid')), 10, 'unknown')
+
+
+def test_store_reuse(tmpdir):
+    store = PayloadStore(str(tmpdir))
+    payload = store.get(1000, 'binary')
+    assert store.get(1000, 'binary') is payload
+
+    reopened = PayloadStore(str(tmpdir))
+    mtime = os.path.getmtime(payload.path)
+    assert reopened.get(1000, 'binary').checksum == payload.checksum
+    assert os.path.getmtime(payload.path) == mtime
+
+    sizes = SizeDistribution.log_uniform(1024, 1024 * 1024, buckets=6)
+    assert sizes.sizes[0] == 1024 and sizes.sizes[-1] == 1024 * 1024
+    sample = reopened.sample(20, sizes, seed=3)
+    assert set(payload.size for payload in sample) <= set(sizes.sizes)
+    reopened.close()
+
+
+def test_encode_and_verify(tmpdir):
+    payload = Payload.generate(str(tmpdir.join('payload')), 5000, 'zeros')
+    message = FakeMessage()
+    chunks = encode_with_payload(message, payload)
+    assert message.body == 'ignored' and not message.inferred
+
+    encoded = b''.join(bytes(chunk) for chunk in chunks)
+    assert encoded == b'properties' + b'\x00\x53\x75\xb0' + struct.pack('>I', 5000) + bytes(5000)
+    assert isinstance(chunks[-1], memoryview)
+
+    verifier = PayloadVerifier([payload])
+    assert verifier.verify(bytes(5000))
+    assert not verifier.verify(bytes(4999))
+    assert not verifier.verify(b'\x01' * 5000)
+    assert (verifier.verified, verifier.corrupted) == (1, 2)
+    chunks[-1].release()
+    payload.close()
+
+
+def test_use_payload():
+    class Command:
+        class message:
+            msg_content = 'inline'
+            msg_content_from_file = None
+
+    use_payload(Command, Payload('/tmp/payload.bin', 10, 0))
+    assert (Command.message.msg_content, Command.message.msg_content_from_file) == (None, '/tmp/payload.bin')
@@ -0,0 +1,78 @@
+import random
+
+from messaging_components.clients.latency import SEQUENCE_PROPERTY
+from messaging_components.clients.verifier import MessageVerifier, RangeSet, record_sender, record_sequence
+
+
+def test_range_set():
+    numbers = list(range(1000))
+    random.Random(1).shuffle(numbers)
+    range_set = RangeSet()
+    for number in numbers[:700]:
+        assert range_set.add(number)
+    assert not range_set.add(numbers[0])
+    assert len(range_set) == 700
+    assert set(range_set) == set(numbers[:700])
+    assert all(number not in range_set for number in numbers[700:])
+
+    sequential = RangeSet()
+    for number in range(100000):
+        sequential.add(number)
+    assert sequential.ranges() == [(0, 100000)]
+
+
+def test_difference():
+    generator = random.Random(2)
+    first, second = RangeSet(), RangeSet()
+    first_numbers = set(generator.sample(range(500), 300))
+    second_numbers = set(generator.sample(range(500), 300))
+    for number in first_numbers:
+        first.add(number)
+    for number in second_numbers:
+        second.add(number)
+    assert set(first.difference(second)) == first_numbers - second_numbers
+    assert len(first.difference(second)) == len(first_numbers - second_numbers)
+
+
+def test_verifier():
+    verifier = MessageVerifier()
+    for sequence in range(100):
+        verifier.add_sent('queue', sequence, sender='s1')
+    for sequence in list(range(50)) + [49, 60, 55, 10] + list(range(61, 100)):
+        verifier.add_received('queue', sequence, sender='s1', receiver='r1')
+
+    report, = verifier.failures()
+    assert report.stream == ('queue', 's1', None)
+    assert report.lost.ranges() == [(50, 55), (56, 60)]
+    assert report.duplicates == 2
+    assert report.reordered == 1
+    assert len(report.unexpected) == 0
+
+
+def test_records():
+    verifier = MessageVerifier()
+    sent = {'address': 'queue', 'id': 'ID:sender-7', 'group-id': 'g1'}
+    verifier.add_sent_record(sent)
+    verifier.add_received_record(sent)
+    verifier.add_received_record({'address': 'queue', 'properties': {SEQUENCE_PROPERTY: 3}})
+    verifier.add_received_record({'address': 'queue', 'id': 'no-sequence'})
+
+    assert record_sequence(sent) == 7
+    assert verifier.unidentified == 1
+    assert [len(report.unexpected) for report in verifier.failures()] == [1]
+
+
+def test_records_by_sender():
+    verifier = MessageVerifier()
+    for sender in ('ID:a1-0:1:1:1-', 'ID:b2-0:1:1:1-'):
+        for sequence in range(1, 11):
+            verifier.add_sent_record({'address': 'queue', 'id': '%s%d' % (sender, sequence)}, sender='named')
+    # Both senders interleaved on one receiver, which does not know the senders
+    for sequence in range(1, 11):
+        for sender in ('ID:b2-0:1:1:1-', 'ID:a1-0:1:1:1-'):
+            verifier.add_received_record({'address': 'queue', 'id': '%s%d' % (sender, sequence)}, receiver='r1')
+
+    assert record_sender({'id': 'ID:a1-0:1:1:1-7'}) == 'ID:a1-0:1:1:1-'
+    assert [report.stream for report in verifier.report()] == [('queue', 'ID:a1-0:1:1:1-', None),
+                                                               ('queue', 'ID:b2-0:1:1:1-', None)]
+    assert verifier.failures() == []
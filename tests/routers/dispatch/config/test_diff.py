@@ -0,0 +1,61 @@
+from collections import namedtuple
+
+from messaging_components.routers.dispatch.config import Config
+from messaging_components.routers.dispatch.config.diff import ConfigDiff
+from messaging_components.routers.dispatch.config.sections import address, linkRoute, listener, log, router
+
+AddressRecord = namedtuple('AddressRecord', ['identity', 'name', 'prefix', 'distribution', 'waypoint'])
+LinkRouteRecord = namedtuple('LinkRouteRecord', ['identity', 'name', 'prefix', 'direction', 'containerId'])
+ListenerRecord = namedtuple('ListenerRecord', ['identity', 'name', 'host', 'port', 'role'])
+LogRecord = namedtuple('LogRecord', ['identity', 'name', 'module', 'enable'])
+RouterRecord = namedtuple('RouterRecord', ['identity', 'name', 'id', 'mode'])
+
+
+class TestConfigDiff:
+    live = {
+        'address': [AddressRecord('1', 'a1', 'closest', 'closest', False),
+                    AddressRecord('2', 'a2', 'multicast', 'multicast', False)],
+        'linkRoute': [LinkRouteRecord('3', 'l1', 'queue', 'in', 'broker')],
+        'listener': [ListenerRecord('4', 'listener/0.0.0.0:5672', '0.0.0.0', '5672', 'normal')],
+        'log': [LogRecord('5', 'log/DEFAULT', 'DEFAULT', 'info+'), LogRecord('6', 'log/ROUTER', 'ROUTER', 'info+')],
+        'router': [RouterRecord('7', 'router/R1', 'R1', 'interior')],
+    }
+
+    @staticmethod
+    def config(*sections):
+        config = Config()
+        for section in sections:
+            config.add_section(section)
+        return config
+
+    def test_unchanged(self):
+        config = self.config(router(id='R1', mode='interior'),
+                             listener(port=5672, role='normal'),
+                             address(prefix='closest', distribution='closest', waypoint='no'),
+                             address(prefix='multicast', distribution='multicast'),
+                             linkRoute(prefix='queue', dir='in', containerId='broker'))
+        diff = ConfigDiff.compute(config, self.live)
+        assert diff.empty
+
+    def test_runtime_changes(self):
+        config = self.config(router(id='R1', mode='interior'),
+                             listener(port=5672, role='normal'),
+                             address(prefix='closest', distribution='balanced'),
+                             address(prefix='new', distribution='closest'),
+                             log(module='ROUTER', enable='trace+'))
+        diff = ConfigDiff.compute(config, self.live)
+
+        assert not diff.restart_required
+        assert sorted(section.prefix.value for section in diff.create) == ['closest', 'new']
+        assert sorted(record.identity for _, record in diff.delete) == ['1', '2', '3']
+        assert [record.identity for _, record in diff.update] == ['6']
+
+    def test_restart_required(self):
+        config = self.config(router(id='R1', mode='standalone'),
+                             listener(port=5672, role='normal'),
+                             listener(port=5673, role='inter-router'))
+        diff = ConfigDiff.compute(config, self.live)
+
+        assert diff.restart_required
+        assert [section_name for section_name, _ in diff.restart] == ['router']
+        assert [section.port.value for section in diff.create] == [5673]
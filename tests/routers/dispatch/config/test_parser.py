@@ -0,0 +1,89 @@
+import pytest
+
+from messaging_components.routers.dispatch.config.parser import ConfigParseError, parse_file, parse_string
+from tests.routers.dispatch.config.test_render import EXPECTED, create_config
+
+QDROUTERD_CONF = '''
+# Stock configuration
+router {
+    mode: standalone
+    id: Router.A
+}
+
+listener {
+    host: 0.0.0.0
+    port: amqp
+    authenticatePeer: no
+    saslMechanisms: ANONYMOUS
+}
+
+linkRoute {
+    prefix: queue.
+    dir: in
+}
+'''
+
+
+VHOST_POLICY_CONF = '''
+router {
+    id: Router.A
+}
+
+vhost {
+    hostname: example.com
+    maxConnections: 10
+    groups: {
+        $default: {
+            users: *
+            allowDynamicSource: true
+        }
+    }
+}
+
+listener {
+    port: amqp
+}
+'''
+
+
+class TestParser:
+
+    def test_round_trip(self, tmpdir):
+        path = str(tmpdir.join('qdrouterd.conf'))
+        create_config().save(path)
+        assert parse_file(path).get_config() == EXPECTED
+
+    def test_qdrouterd_conf(self):
+        config = parse_string(QDROUTERD_CONF)
+
+        assert [section.section_name for section in config] == ['router', 'listener', 'linkRoute']
+        assert config[0].id.value == 'Router.A'
+        assert config[1].port.value == 'amqp'
+        assert config[2].prefix.value == 'queue.'
+
+    def test_strict(self):
+        with pytest.raises(ConfigParseError) as error:
+            parse_string(QDROUTERD_CONF, strict=True)
+        assert error.value.line_number == 12
+
+    def test_nested_blocks(self):
+        config = parse_string(VHOST_POLICY_CONF)
+        assert [section.section_name for section in config] == ['router', 'listener']
+        assert config[1].port.value == 'amqp'
+
+        with pytest.raises(ConfigParseError) as error:
+            parse_string('router {\n    id: R1\n    groups: {\n    }\n}\n', strict=True)
+        assert error.value.line_number == 3
+
+    def test_trailing_comments(self):
+        config = parse_string('router {   # main\n'
+                              '    mode: interior   # edge later\n'
+                              '    id: "Router#A #1"  # quoted\n'
+                              '}  # end\n')
+        assert config[0].mode.value == 'interior'
+        assert config[0].id.value == 'Router#A #1'
+
+    def test_unclosed_section(self):
+        with pytest.raises(ConfigParseError) as error:
+            parse_string('router {\n    id: R1\n\nlistener {\n}\n')
+        assert error.value.line_number == 4
@@ -0,0 +1,45 @@
+from messaging_components.routers.dispatch.config import Config, save_configs
+from messaging_components.routers.dispatch.config.sections import address, listener, router
+
+EXPECTED = '''router: {
+    id: R1
+    mode: interior
+}
+
+listener: {
+    host: 0.0.0.0
+    port: 5672
+    role: normal
+}
+
+address: {
+    prefix: closest
+    distribution: closest
+}
+'''
+
+
+def create_config(router_id='R1'):
+    config = Config()
+    config.add_section(router(id=router_id, mode='interior'))
+    config.add_section(listener(host='0.0.0.0', port=5672, role='normal'))
+    config.add_section(address(prefix='closest', distribution='closest'))
+    return config
+
+
+class TestRender:
+
+    def test_get_config(self):
+        assert create_config().get_config() == EXPECTED
+
+    def test_section_str(self):
+        assert str(address(prefix='closest', distribution='closest')) == EXPECTED.split('\n\n')[2]
+
+    def test_save_configs(self, tmpdir):
+        configs = {str(tmpdir.join('R%d.conf' % i)): create_config('R1') for i in range(4)}
+        paths = save_configs(configs, max_workers=2)
+
+        assert paths == list(configs.keys())
+        for path in paths:
+            with open(path) as conf:
+                assert conf.read() == EXPECTED
@@ -30,3 +30,51 @@ class Test1:
         section = TeSection()
         section.a = 0
         assert section.a.value == 0
+
+    def test_d(self):
+        section = TeSection()
+        attribute = section.b
+        section.b = 4321
+        assert attribute.value == 4321
+        attribute.value = None
+        assert section.b.value is None
+        assert section.to_dict() == {'d': 'ABCD'}
+
+    def test_slots(self):
+        assert TeSection._fields == ('a', 'b', 'c', 'd')
+        assert TeSection().__dict__ == {}
+
+
+class TeSubSection(TeSection):
+    """
+    Subclass overriding __init__
+    """
+    def __init__(self, tag=None, **kwargs):
+        super(TeSubSection, self).__init__(**kwargs)
+        self.tag = tag
+
+
+class TestSubclass:
+    def test_fields(self):
+        assert TeSubSection._fields == ('a', 'b', 'c', 'd', 'tag')
+        section = TeSubSection(tag='x', a=1, d=None)
+        assert (section.a.value, section.b.value, section.d.value, section.tag.value) == (1, 1234, None, 'x')
+        assert section.to_dict() == {'a': 1, 'b': 1234, 'tag': 'x'}
+
+
+class TestAttributes:
+    def test_undeclared(self):
+        section = TeSection()
+        section.e = _Attribute(name='e', value='extra')
+        assert section.e.value == 'extra'
+        section.e = 'changed'
+        assert section.e.value == 'changed'
+        assert section.to_dict() == {'b': 1234, 'd': 'ABCD', 'e': 'changed'}
+        assert '    e: changed\n' in section.get_config()
+
+    def test_name_override(self):
+        section = TeSection()
+        section.c = _Attribute(name='cName', value=5)
+        assert section.c.name == 'cName' and section.c.value == 5
+        assert section.to_dict() == {'b': 1234, 'cName': 5, 'd': 'ABCD'}
+        assert '    cName: 5\n' in section.get_config()
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from messaging_components.routers.dispatch.config.parser import parse_file
+from messaging_components.routers.dispatch.config.topology import FullMesh, HubAndSpoke, Ring, Tiered
+
+
+def connectors(config):
+    return [section for section in config if section.section_name == 'connector']
+
+
+def links(topology):
+    """Returns the set of (router, peer) pairs and checks connectors target peer listeners"""
+    listeners = {}
+    for router, config in topology.configs():
+        for section in config:
+            if section.section_name == 'listener':
+                listeners[(router.host, section.port.value)] = (router.id, section.role.value)
+    result = set()
+    for router, config in topology.configs():
+        for section in connectors(config):
+            peer, role = listeners[(section.host.value, section.port.value)]
+            assert role == section.role.value
+            assert (peer, router.id) not in result
+            result.add((router.id, peer))
+    return result
+
+
+def test_full_mesh():
+    topology = FullMesh(4, hosts=['h1', 'h2'], cost=10)
+    assert len(links(topology)) == 6
+    assert [router.port for router in topology.routers] == [5672, 5672, 5674, 5674]
+    _, config = list(topology.configs())[3]
+    assert [section.cost.value for section in connectors(config)] == [10, 10, 10]
+
+
+def test_ring():
+    assert len(links(Ring(5))) == 5
+    assert len(links(Ring(2))) == 1
+
+
+def test_hub_and_spoke():
+    topology = HubAndSpoke(10, hubs=2)
+    assert len(links(topology)) == 9
+    assert ('Router.Spoke9', 'Router.Hub1') in links(topology)
+
+    with pytest.raises(ValueError):
+        HubAndSpoke(3, hubs=0)
+
+
+def test_tiered():
+    topology = Tiered(3, 6, interior_ring=True, cost=lambda a, b: a.index + b.index)
+    result = links(topology)
+    assert len(result) == 9
+    assert ('Router.E4', 'Router.I1') in result
+    edge_config = topology.config(topology.routers[-1])
+    assert edge_config[0].mode.value == 'edge'
+    assert connectors(edge_config)[0].cost.value is None
+
+    with pytest.raises(ValueError):
+        Tiered(0, 2)
+    assert len(Tiered(0, 0).routers) == 0
+
+
+def test_save(tmpdir):
+    paths = Tiered(2, 2).save(str(tmpdir))
+    assert [os.path.basename(path) for path in paths] == ['Router.I0.conf', 'Router.I1.conf',
+                                                         'Router.E0.conf', 'Router.E1.conf']
+    config = parse_file(paths[1])
+    assert [section.role.value for section in config[1:]] == ['normal', 'inter-router', 'edge', 'inter-router']
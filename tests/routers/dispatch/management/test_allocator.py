@@ -0,0 +1,37 @@
+from collections import namedtuple
+
+from messaging_components.routers.dispatch.management.allocator import AllocatorProfiler, allocated_bytes
+
+Allocator = namedtuple('Allocator', ['typeName', 'typeSize', 'totalAllocFromHeap', 'totalFreeToHeap'])
+
+
+def create_profiler():
+    profiler = AllocatorProfiler()
+    for second in range(20):
+        profiler.sample([
+            Allocator('qd_message_t', 128, 1000 + second * 10, 1000),
+            Allocator('qd_buffer_t', 536, 500 + second % 2, 400),
+        ], timestamp=1000.0 + second)
+    return profiler
+
+
+def test_allocated_bytes():
+    assert allocated_bytes(Allocator('qd_message_t', 128, 10, 4)) == 768
+
+
+def test_trends():
+    profiler = create_profiler()
+    trends = profiler.trends()
+    assert trends[0].type_name == 'qd_message_t'
+    assert trends[0].slope == 1280.0
+    assert trends[0].growth == 128 * 190
+    assert [trend.type_name for trend in profiler.leaks()] == ['qd_message_t']
+
+
+def test_export_load():
+    profiler = create_profiler()
+    exported = profiler.export()
+    assert exported['types']['qd_message_t']['values'][1:3] == [1280, 1280]
+    loaded = AllocatorProfiler.load(exported)
+    assert list(loaded.series['qd_buffer_t'].values) == list(profiler.series['qd_buffer_t'].values)
+    assert list(loaded.series['qd_buffer_t'].times) == list(profiler.series['qd_buffer_t'].times)
@@ -0,0 +1,100 @@
+import importlib
+
+import proton
+from proton import Timeout
+
+from messaging_components.routers.dispatch.config.sections import address
+from messaging_components.routers.dispatch.management.qdmanage import QDManage
+
+qdmanage = importlib.import_module('messaging_components.routers.dispatch.management.qdmanage')
+
+
+class FakeConnection:
+    """
+    Management node replying to each request, in reverse order of arrival,
+    except to the requests whose correlation id is in drop.
+    """
+    drop = ()
+
+    def __init__(self, url, timeout=None, **options):
+        self.requests = []
+        self.responses = []
+        self.closed = False
+        FakeConnection.last = self
+
+    def create_receiver(self, address, dynamic=False, credit=None):
+        return FakeReceiver(self)
+
+    def create_sender(self, address, options=None):
+        return FakeSender(self)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSender:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def send(self, message):
+        self.connection.requests.append(message)
+        if message.correlation_id not in self.connection.drop:
+            status = 404 if message.properties.get('name') == 'missing' else 201
+            self.connection.responses.append(proton.Message(
+                correlation_id=message.correlation_id, body=message.body,
+                properties={'statusCode': status, 'statusDescription': 'status %d' % status}))
+
+
+class FakeReceiver:
+    class remote_source:
+        address = 'reply-queue'
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def receive(self, timeout=None):
+        if not self.connection.responses:
+            raise Timeout('no response')
+        return self.connection.responses.pop()
+
+    def accept(self):
+        pass
+
+
+def create_manage(monkeypatch, drop=()) -> QDManage:
+    monkeypatch.setattr(qdmanage, 'BlockingConnection', FakeConnection)
+    monkeypatch.setattr(FakeConnection, 'drop', drop)
+    return QDManage(window=3, timeout=1)
+
+
+def test_windows_and_correlation(monkeypatch):
+    manage = create_manage(monkeypatch)
+    results = manage.create_many([address(prefix='queue.%d' % index, distribution='balanced') for index in range(7)])
+
+    assert [result.status_code for result in results] == [201] * 7
+    assert [result.body['prefix'] for result in results] == ['queue.%d' % index for index in range(7)]
+    requests = FakeConnection.last.requests
+    assert [request.correlation_id for request in requests] == list(range(7))
+    assert requests[0].properties['type'] == 'org.apache.qpid.dispatch.router.config.address'
+    assert requests[0].reply_to == 'reply-queue'
+    assert FakeConnection.last.closed
+
+
+def test_timeout(monkeypatch):
+    manage = create_manage(monkeypatch, drop=(4,))
+    results = manage.create_many([{'prefix': 'queue.%d' % index} for index in range(8)], entity_type='address')
+
+    assert [result.success for result in results] == [True] * 3 + [True, False, True] + [False] * 2
+    assert results[4].status_description == 'Timed out waiting for response'
+    assert results[6].status_description.startswith('Not sent')
+    assert len(FakeConnection.last.requests) == 6
+
+
+def test_delete_many(monkeypatch):
+    manage = create_manage(monkeypatch)
+    results = manage.delete_many(['missing', {'name': 'named'}, {'identity': '7'}], entity_type='address')
+
+    assert [result.success for result in results] == [False, True, True]
+    properties = [request.properties for request in FakeConnection.last.requests]
+    assert properties[1]['name'] == 'named'
+    assert properties[2]['identity'] == '7' and 'name' not in properties[2]
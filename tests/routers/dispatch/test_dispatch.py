@@ -0,0 +1,47 @@
+import importlib
+
+import pytest
+
+from messaging_components.config.config import IQAConfigurationException
+from messaging_components.routers.dispatch.config import Config
+from messaging_components.routers.dispatch.config.sections import listener
+
+# The package exports the Dispatch class under the module name
+dispatch = importlib.import_module('messaging_components.routers.dispatch.dispatch')
+
+
+class FakeExecution:
+    def __init__(self, success):
+        self.success = success
+
+    def completed_successfully(self):
+        return self.success
+
+
+class FakeService:
+    restarts = 0
+
+    def restart(self):
+        self.restarts += 1
+
+
+class FakeNode:
+    hostname = 'router-node'
+
+    def get_ip(self):
+        return '127.0.0.1'
+
+
+def test_set_config_write_failure(monkeypatch):
+    router = dispatch.Dispatch('router', FakeNode(), None, FakeService())
+    previous = router.config
+    monkeypatch.setattr(router, '_get_management_client', lambda: None)
+    monkeypatch.setattr(dispatch, 'query_live_entities', lambda manage: {})
+    monkeypatch.setattr(dispatch, 'write_file', lambda node, path, content: FakeExecution(False))
+
+    config = Config()
+    config.add_section(listener(host='0.0.0.0', port=5672))
+    with pytest.raises(IQAConfigurationException):
+        router.set_config(config)
+    assert router.service.restarts == 0
+    assert router.config is previous
@@ -0,0 +1,90 @@
+from messaging_components.routers.dispatch.log import Log
+
+LINES = '''2019-03-07 10:12:34.123456 -0500 SERVER (info) Container Name: Router.A
+2019-03-07 10:12:34.200000 -0500 ROUTER (info) Router started in Interior mode
+2019-03-07 10:12:35.000000 -0500 SERVER (error) Connection to 10.0.0.2:5672 failed
+    backtrace line
+2019-03-07 10:12:36.000000 -0500 POLICY (info) Policy configured
+'''
+
+
+class FakeExecution:
+    def __init__(self, stdout):
+        self.stdout = stdout
+
+    def wait(self):
+        pass
+
+    def completed_successfully(self):
+        return True
+
+    def read_stdout(self):
+        return self.stdout
+
+
+class FakeNode:
+    hostname = 'fake'
+
+    def __init__(self, content):
+        self.content = content
+        self.scripts = []
+
+    def execute(self, command):
+        script = command.args[-1]
+        self.scripts.append(script)
+        if script.startswith('tail'):
+            offset = int(script.split()[2][1:]) - 1
+            return FakeExecution(self.content.encode()[offset:].decode())
+        return FakeExecution(self.content + '-- cursor: s=1\n')
+
+
+def test_parse():
+    log = Log()
+    records = log.feed(LINES.splitlines())
+    assert len(records) == 4
+    assert records[0].module == 'SERVER'
+    assert records[0].datetime.year == 2019
+    assert records[2].message.endswith('backtrace line')
+    assert log.count(module='SERVER') == 2
+    assert log.records(module='SERVER', level='error') == [records[2]]
+    assert log.find('Interior') == [records[1]]
+
+
+def test_bounded():
+    log = Log(max_records=2)
+    log.feed(LINES.splitlines())
+    assert [record.module for record in log.records()] == ['SERVER', 'POLICY']
+    assert log.count(module='ROUTER') == 0
+    assert log.count(level='info') == 1
+
+
+def test_refresh_file():
+    node = FakeNode(LINES + '2019-03-07 10:12:37.000000 -0500 SERVER (info) partial')
+    log = Log(node=node, path='/var/log/qdrouterd.log')
+    assert len(log.refresh()) == 4
+    assert log.offset == len(LINES)
+    assert log.refresh() == []
+    node.content += '\n'
+    assert [record.message for record in log.refresh()] == ['partial']
+    assert log.count() == 5
+
+
+def test_refresh_journal():
+    node = FakeNode(LINES)
+    log = Log(node=node)
+    assert len(log.refresh(store=False)) == 4
+    assert log.cursor == 's=1'
+    assert log.count() == 0
+    log.refresh()
+    assert "--after-cursor=s=1" in node.scripts[-1]
+
+
+def test_refresh_journal_markers():
+    node = FakeNode(LINES)
+    log = Log(node=node)
+    log.refresh()
+    assert ' -q ' in node.scripts[-1]
+
+    node.content = '-- No entries --\n'
+    assert log.refresh() == []
+    assert log.records()[-1].message == 'Policy configured'